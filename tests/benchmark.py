@@ -0,0 +1,278 @@
+"""
+Times each generation phase on synthetic timesheets and compares against a baseline recorded on this machine.
+
+    python -m tests.benchmark --update     # records this machine's baseline
+    python -m tests.benchmark              # fails when a phase regressed, warns without a baseline
+    python -m tests.benchmark --engine native --writer native
+
+Each phase is timed relative to a fixed calibration loop run alongside it, so a loaded or
+throttled machine slows both and the ratio holds. The baseline is kept out of version control,
+timings recorded on one machine say nothing about another.
+"""
+import argparse
+import configparser
+import json
+import logging
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from .context import TimecardGenerator, models
+from . import synthetic
+from timecardgenerator import components
+
+
+BASELINE = os.path.join( os.path.dirname( __file__ ), 'benchmark-baseline.json' )
+
+# Bumped whenever the calibration loop or the stored results change shape
+BASELINE_VERSION = 2
+
+# Synthetic workbooks benchmarked, by name
+CASES = {
+    'small': { 'employees': 50,   'weeks': 2, 'blank_density': 0.2 },
+    'large': { 'employees': 2000, 'weeks': 2, 'blank_density': 0.2 },
+    'wide':  { 'employees': 200,  'weeks': 8, 'blank_density': 0.5 }
+}
+
+# Timed phases, in run order
+PHASES = ( 'open', 'read', 'get_dates', 'get_employees', 'get_hours', 'database', 'generate' )
+
+# Output backends by writer engine
+WRITERS = {
+    'openpyxl': components.XlsxOutput,
+    'native':   components.StreamingXlsxOutput
+}
+
+# Phases faster than this are not compared, their timings are mostly noise
+MIN_SECONDS = 0.005
+
+
+
+def run_case( directory, name, options, engine='openpyxl', writer='openpyxl' ):
+    """
+    run_case( '/tmp', 'small', { 'employees': 50 } ) -> { 'open': 0.01, ... }
+
+    Runs every phase once on a synthetic workbook and database, returning seconds per phase
+
+    :param directory: str
+    :param name: str
+    :param options: dict of synthetic.write_timesheet options
+    :param engine: str, the spreadsheet reader engine
+    :param writer: str, the xlsx writer engine
+    :return: dict
+    """
+    file     = os.path.join( directory, '{0}.xlsx'.format( name ) )
+    database = os.path.join( directory, '{0}.sqlite'.format( name ) )
+
+    if not os.path.exists( file ):
+        ids = synthetic.write_timesheet( file, **options )
+        synthetic.create_sage_database( database, ids )
+
+    timings = {}
+    app     = TimecardGenerator()
+
+    app.config    = configparser.ConfigParser()
+    app.payperiod = 'BENCH'
+    app.db        = synthetic.SqlitePool( database )
+
+    def timed( phase, call ):
+        start = time.perf_counter()
+        result = call()
+        timings[phase] = time.perf_counter() - start
+        return result
+
+    app.spreadsheet = timed( 'open', lambda: models.Spreadsheet( file, engine=engine ) )
+
+    try:
+        timed( 'read', app.read_spreadsheet )
+        timed( 'get_dates', app.get_dates )
+        timed( 'get_employees', app.get_employees )
+        timed( 'get_hours', app.get_hours )
+        timed( 'database', app.query_employee_data )
+
+        output = WRITERS[writer]( os.path.join( directory, '{0}-output.xlsx'.format( name ) ) )
+        timed( 'generate', lambda: app.spreadsheet.generate( app.employees, output ) )
+    finally:
+        app.close_spreadsheet()
+        app.db.close()
+
+    return timings
+
+
+def calibrate( rounds=20000 ):
+    """
+    calibrate() -> 0.02
+
+    Times a fixed loop of the work generation is made of, formatting strings, hashing them
+    into dicts and sorting, to measure how fast this machine is running right now
+
+    :param rounds: int
+    :return: float, seconds
+    """
+    start  = time.perf_counter()
+    values = {}
+
+    for i in range( rounds ):
+        values['EMP{0:05d}'.format( i * 7919 % rounds )] = [ i, i * 0.25, str( i ) ]
+
+    sorted( values.items(), key=lambda item: item[1][1] )
+
+    return time.perf_counter() - start
+
+
+def measure( directory, name, options, repeat=5, engine='openpyxl', writer='openpyxl' ):
+    """
+    Returns the median seconds of each phase over repeated runs, the median of each phase
+    relative to the calibration loop timed before every run, and the peak traced memory of one run
+
+    :param directory: str
+    :param name: str
+    :param options: dict
+    :param repeat: int
+    :param engine: str
+    :param writer: str
+    :return: dict of 'seconds' and 'relative' results by phase, and 'peak_memory' in bytes
+    """
+    seconds  = {}
+    relative = {}
+
+    for _ in range( repeat ):
+        calibration = min( calibrate() for _ in range( 3 ) )
+
+        for phase, elapsed in run_case( directory, name, options, engine, writer ).items():
+            seconds.setdefault( phase, [] ).append( elapsed )
+            relative.setdefault( phase, [] ).append( elapsed / calibration )
+
+    results = {
+        'seconds':  { phase: statistics.median( values ) for phase, values in seconds.items() },
+        'relative': { phase: statistics.median( values ) for phase, values in relative.items() }
+    }
+
+    # Traced separately, tracing slows every allocation
+    tracemalloc.start()
+    try:
+        run_case( directory, name, options, engine, writer )
+        results['peak_memory'] = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return results
+
+
+def machine():
+    """
+    Describes the platform and interpreter, a baseline is only compared on the one it was recorded on.
+    The host name is left out, it says nothing about speed and would end up in shared baselines.
+
+    :return: str
+    """
+    return '{0} {1} python {2}'.format( platform.system(), platform.machine(), platform.python_version() )
+
+
+def compare( results, baseline, tolerance ):
+    """
+    Lists the relative measurements which exceed their baseline by more than the tolerance
+
+    :param results: dict of measure results by case
+    :param baseline: dict of relative results and peak memory by case
+    :param tolerance: float, allowed ratio over the baseline
+    :return: list of str
+    """
+    regressions = []
+
+    for name, measured in results.items():
+        expected = baseline.get( name, {} )
+
+        for key, value in measured['relative'].items():
+            if not key in expected:
+                continue
+
+            # Too short to time reliably
+            if measured['seconds'][key] < MIN_SECONDS:
+                continue
+
+            if value > expected[key] * tolerance:
+                regressions.append( '{0} {1}: {2:.4g}x > {3:.4g}x calibration baseline'.format( name, key, value, expected[key] ) )
+
+        if 'peak_memory' in expected and measured['peak_memory'] > expected['peak_memory'] * tolerance:
+            regressions.append( '{0} peak_memory: {1} > {2} bytes baseline'.format( name, measured['peak_memory'], expected['peak_memory'] ) )
+
+    return regressions
+
+
+def load_baseline( file ):
+    """
+    Loads the baseline recorded on this machine
+
+    :param file: str
+    :return: dict of relative results and peak memory by case, None when none was recorded here
+    """
+    if not os.path.exists( file ):
+        return
+
+    with open( file ) as handle:
+        stored = json.load( handle )
+
+    if not ( stored.get( 'version' ) == BASELINE_VERSION ) or not ( stored.get( 'machine' ) == machine() ):
+        return
+
+    return stored['cases']
+
+
+def main( argv=None ):
+    parser = argparse.ArgumentParser( prog='python -m tests.benchmark', description='Benchmarks the timecard generation phases.' )
+    parser.add_argument( '--update', action='store_true', help='store the results as the baseline of this machine' )
+    parser.add_argument( '--baseline', default=BASELINE, help='baseline file, defaults to tests/benchmark-baseline.json' )
+    parser.add_argument( '--tolerance', type=float, default=1.5, help='allowed ratio over the baseline, defaults to 1.5' )
+    parser.add_argument( '--repeat', type=int, default=5, help='runs per case, the median is kept' )
+    parser.add_argument( '--case', action='append', choices=sorted( CASES ), help='cases to run, defaults to all' )
+    parser.add_argument( '--engine', choices=models.ENGINES, default='openpyxl', help='spreadsheet reader engine, defaults to openpyxl' )
+    parser.add_argument( '--writer', choices=sorted( WRITERS ), default='openpyxl', help='xlsx writer engine, defaults to openpyxl' )
+    args = parser.parse_args( argv )
+
+    # Logging is not part of what is measured
+    logging.disable( logging.CRITICAL )
+
+    results = {}
+
+    with tempfile.TemporaryDirectory() as directory:
+        for name in args.case or sorted( CASES ):
+            results[name] = measure( directory, name, CASES[name], repeat=args.repeat, engine=args.engine, writer=args.writer )
+
+            print( name )
+            for phase in PHASES:
+                print( '    {0:<14} {1:9.4f}s {2:9.2f}x'.format( phase, results[name]['seconds'][phase], results[name]['relative'][phase] ) )
+            print( '    {0:<14} {1:9.1f}KB'.format( 'peak_memory', results[name]['peak_memory'] / 1024 ) )
+
+    baseline = load_baseline( args.baseline )
+
+    if args.update:
+        baseline = baseline or {}
+        baseline.update( { name: dict( measured['relative'], peak_memory=measured['peak_memory'] ) for name, measured in results.items() } )
+
+        with open( args.baseline, 'w' ) as handle:
+            json.dump( { 'version': BASELINE_VERSION, 'machine': machine(), 'cases': baseline }, handle, indent=4, sort_keys=True )
+
+        print( 'Stored baseline {0}'.format( args.baseline ) )
+        return 0
+
+    # Nothing to compare against is not a regression, a fresh checkout passes until one is recorded
+    if baseline == None:
+        print( 'Warning! No baseline recorded on this machine, run with --update to record one', file=sys.stderr )
+        return 0
+
+    regressions = compare( results, baseline, args.tolerance )
+
+    for regression in regressions:
+        print( 'Regression! {0}'.format( regression ), file=sys.stderr )
+
+    return 1 if regressions else 0
+
+
+
+if __name__ == '__main__':
+    sys.exit( main() )
@@ -2,4 +2,4 @@ import sys
 import os
 sys.path.insert( 0, os.path.abspath( os.path.join( os.path.dirname( __file__ ), '..' ) ) )
 
-from timecardgenerator import TimecardGenerator, models, tuples, helpers
+from timecardgenerator import TimecardGenerator, classifier, components, models, tuples, helpers
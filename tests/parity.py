@@ -0,0 +1,127 @@
+"""
+Checks the native spreadsheet reader classifies every cell as openpyxl does.
+
+    python -m tests.parity                 # the import template and synthetic timesheets
+    python -m tests.parity hours.xlsx      # given spreadsheets
+"""
+import argparse
+import datetime
+import logging
+import os
+import sys
+import tempfile
+
+from .context import models
+from . import synthetic
+from timecardgenerator import classifier
+
+
+TEMPLATE = os.path.join( os.path.dirname( __file__ ), '..', 'docs', 'Import Template Example.xlsx' )
+
+# Values openpyxl converts from serials, which the native reader leaves as numbers
+TEMPORAL = ( datetime.date, datetime.time, datetime.timedelta )
+
+# Synthetic workbooks compared, by name
+CASES = {
+    'quirks': { 'employees': 200, 'weeks': 4, 'blank_density': 0.3 },
+    'plain':  { 'employees': 200, 'weeks': 2, 'blank_density': 0.1, 'quirks': False }
+}
+
+
+
+def classified_cells( file, engine ):
+    """
+    classified_cells( 'hours.xlsx', 'native' ) -> ( [ ( 'A', 3, 1, 736463 ), ... ], 120, 40 )
+
+    Returns the classified cells of the first worksheet read by an engine, with the cells scanned and empty
+
+    :param file: str
+    :param engine: str
+    :return: tuple( list, int, int )
+    """
+    spreadsheet = models.Spreadsheet( file, engine=engine )
+    cells       = []
+
+    try:
+        epoch = spreadsheet.epoch
+
+        for coordinate, value, style in spreadsheet.stream_cells():
+            if style == classifier.NONE:
+                kind, classified = classifier.classify( value )
+            else:
+                kind, classified = classifier.classify_serial( value, style, epoch )
+
+            # Dates and times are compared by their classification, anything else as read
+            if kind == classifier.NONE and style == classifier.NONE and not isinstance( value, TEMPORAL ):
+                classified = value
+
+            cells.append( ( coordinate.column, coordinate.row, kind, classified ) )
+
+        return cells, spreadsheet.cells_scanned, spreadsheet.cells_empty
+    finally:
+        spreadsheet.close()
+
+
+def compare( file ):
+    """
+    Lists the differences between the cells read by openpyxl and the native reader
+
+    :param file: str
+    :return: list of str
+    """
+    expected, expected_scanned, expected_empty = classified_cells( file, 'openpyxl' )
+    found, found_scanned, found_empty          = classified_cells( file, 'native' )
+
+    differences = []
+
+    for cell, other in zip( expected, found ):
+        if not ( cell == other ):
+            differences.append( 'openpyxl {0} != native {1}'.format( cell, other ) )
+
+    if not ( len( expected ) == len( found ) ):
+        differences.append( 'openpyxl read {0} cells, native read {1}'.format( len( expected ), len( found ) ) )
+
+    if not ( ( expected_scanned, expected_empty ) == ( found_scanned, found_empty ) ):
+        differences.append( 'openpyxl scanned {0} ( {1} empty ), native scanned {2} ( {3} empty )'.format(
+            expected_scanned, expected_empty, found_scanned, found_empty
+        ) )
+
+    return differences
+
+
+def main( argv=None ):
+    parser = argparse.ArgumentParser( prog='python -m tests.parity', description='Compares the native spreadsheet reader against openpyxl.' )
+    parser.add_argument( 'files', nargs='*', help='spreadsheets to compare, defaults to the import template and synthetic timesheets' )
+    args = parser.parse_args( argv )
+
+    logging.disable( logging.CRITICAL )
+
+    failed = False
+
+    with tempfile.TemporaryDirectory() as directory:
+        files = args.files
+
+        if not files:
+            files = [ TEMPLATE ]
+
+            for name, options in sorted( CASES.items() ):
+                file = os.path.join( directory, '{0}.xlsx'.format( name ) )
+                synthetic.write_timesheet( file, **options )
+                files.append( file )
+
+        for file in files:
+            differences = compare( file )
+
+            print( '{0}: {1}'.format( os.path.basename( file ), 'differs' if differences else 'identical' ) )
+
+            for difference in differences[:20]:
+                print( '    {0}'.format( difference ), file=sys.stderr )
+
+            failed = failed or bool( differences )
+
+    return 1 if failed else 0
+
+
+
+if __name__ == '__main__':
+    sys.exit( main() )
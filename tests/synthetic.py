@@ -0,0 +1,195 @@
+import datetime
+import random
+import sqlite3
+import openpyxl
+
+from timecardgenerator import components
+
+
+# Weekday names written below the date headers, Sunday first as in docs/
+WEEKDAYS = [ 'SUNDAY', 'MONDAY', 'TUESDAY', 'WEDNESDAY', 'THURSDAY', 'FRIDAY', 'SATURDAY' ]
+
+# Time cell formats found in real timesheets
+TIME_FORMATS = [ 'h":"mm', 'h:mm' ]
+
+# First date column, column A holds ids and column B locations
+FIRST_COLUMN = 3
+
+
+
+def write_timesheet( file, employees=50, weeks=2, blank_density=0.2, locations=2, quirks=True, start=datetime.date( 2017, 5, 14 ), seed=0 ):
+    """
+    write_timesheet( 'synthetic.xlsx', employees=500, weeks=2 )
+
+    Writes a synthetic timesheet laid out like the docs/ sample, with date headers across
+    the first row, employee ids in column A and one time cell per employee and day.
+
+    Quirks found in real timesheets are added unless disabled: weekday name rows, location
+    rows, date headers repeated above some locations, employees listed at more than one
+    location, 00:00 and text times, mixed time formats and a styled blank cell far outside
+    the data, which inflates the sheet dimensions.
+
+    :param file: str
+    :param employees: int
+    :param weeks: int
+    :param blank_density: float, share of time cells left blank
+    :param locations: int
+    :param quirks: bool
+    :param start: datetime.date, a Sunday
+    :param seed: int
+    :return: list of employee ids
+    """
+    rng   = random.Random( seed )
+    days  = [ start + datetime.timedelta( days=day ) for day in range( weeks * 7 ) ]
+    ids   = [ 'EMP{0:05d}'.format( i ) for i in range( 1, employees + 1 ) ]
+
+    wb = openpyxl.Workbook()
+    ws = wb.active
+
+    row = _write_headers( ws, 1, days, quirks )
+    ws.cell( row=1, column=1, value='Employee ID\'s' )
+
+    per_location = max( 1, -( -employees // max( 1, locations ) ) )
+
+    for location in range( max( 1, locations ) ):
+        location_ids = ids[location * per_location:( location + 1 ) * per_location]
+
+        if not location_ids:
+            break
+
+        if quirks:
+            # Date headers repeated above every other location
+            if location > 0 and location % 2 == 0:
+                row = _write_headers( ws, row, days, quirks )
+
+            # An employee of the previous location also works here
+            if location > 0:
+                location_ids = [ ids[location * per_location - 1] ] + location_ids
+
+            ws.cell( row=row, column=2, value='Location {0}'.format( location + 1 ) )
+            row += 1
+
+        for id in location_ids:
+            ws.cell( row=row, column=1, value=id )
+
+            for column in range( FIRST_COLUMN, FIRST_COLUMN + len( days ) ):
+                if rng.random() < blank_density:
+                    continue
+
+                cell = ws.cell( row=row, column=column, value=_time_value( rng, quirks ) )
+                cell.number_format = rng.choice( TIME_FORMATS ) if quirks else TIME_FORMATS[0]
+
+            row += 1
+
+    # Styled but empty cell outside the data
+    if quirks:
+        ws.cell( row=row + 200, column=FIRST_COLUMN + len( days ) + 10 ).number_format = TIME_FORMATS[0]
+
+    wb.save( file )
+
+    return ids
+
+
+def _write_headers( ws, row, days, quirks ):
+    for column, day in enumerate( days, FIRST_COLUMN ):
+        cell = ws.cell( row=row, column=column, value=datetime.datetime.combine( day, datetime.time() ) )
+        cell.number_format = 'mm-dd-yy'
+
+        if quirks:
+            ws.cell( row=row + 1, column=column, value=WEEKDAYS[( day.weekday() + 1 ) % 7] )
+
+    return row + ( 2 if quirks else 1 )
+
+
+def _time_value( rng, quirks ):
+    if quirks:
+        roll = rng.random()
+
+        # Days off entered as 00:00
+        if roll < 0.1:
+            return datetime.time( 0, 0 )
+
+        # Times typed as text
+        if roll < 0.15:
+            return '{0}:{1:02d}'.format( rng.randint( 1, 10 ), rng.choice( [ 0, 15, 30, 45 ] ) )
+
+    return datetime.time( rng.randint( 1, 10 ), rng.choice( [ 0, 15, 30, 45 ] ) )
+
+
+
+#               #
+# SAGE DATABASE #
+#               #
+def create_sage_database( file, ids ):
+    """
+    create_sage_database( 'sage.sqlite', [ 'EMP00001' ] )
+
+    Creates a SQLite stand-in for the Sage 300 employee tables queried by the generator,
+    with one hourly distribution per employee
+
+    :param file: str
+    :param ids: list
+    """
+    db = sqlite3.connect( file )
+
+    with db:
+        db.executescript( """
+        DROP TABLE IF EXISTS CPEMPL;
+        DROP TABLE IF EXISTS CPEMPD;
+        DROP TABLE IF EXISTS CPDIST;
+        CREATE TABLE CPEMPL ( EMPLOYEE TEXT, OTSCHED TEXT, AUDTUSER TEXT, AUDTDATE INT, AUDTTIME INT );
+        CREATE TABLE CPEMPD ( EMPLOYEE TEXT, EARNDED TEXT, DISTCODE TEXT, CATEGORY TEXT, AUDTDATE INT, AUDTTIME INT );
+        CREATE TABLE CPDIST ( EARNDED TEXT, DISTCODE TEXT, EXPACCT TEXT, OTACCT TEXT, AUDTUSER TEXT, AUDTDATE INT, AUDTTIME INT );
+        """ )
+
+        db.executemany( 'INSERT INTO CPEMPL VALUES ( ?, ?, ?, 20170101, 0 )', [ ( id, 'OT 1', 'ADMIN' ) for id in ids ] )
+        db.executemany( 'INSERT INTO CPEMPD VALUES ( ?, ?, ?, ?, 20170101, 0 )', [ ( id, 'HRLY', 'D{0}'.format( id ), 'CAT-1' ) for id in ids ] )
+        db.executemany( 'INSERT INTO CPDIST VALUES ( ?, ?, ?, ?, ?, 20170101, 0 )', [ ( 'HRLY', 'D{0}'.format( id ), '5000-10', '5100-10', 'ADMIN' ) for id in ids ] )
+
+    db.close()
+
+
+
+class SqlitePool( components.ConnectionPool ):
+    """
+    Connection pool over a SQLite stand-in database instead of ODBC
+    """
+
+    def _connect( self ):
+        return _Connection( sqlite3.connect( self._connection_string, check_same_thread=False ) )
+
+
+
+class _Connection( object ):
+
+    def __init__( self, connection ):
+        self._connection = connection
+
+
+    def cursor( self ):
+        return _Cursor( self._connection.cursor() )
+
+
+    def close( self ):
+        self._connection.close()
+
+
+
+class _Cursor( object ):
+
+    def __init__( self, cursor ):
+        self._cursor = cursor
+
+
+    def execute( self, sql, *params ):
+        # pyodbc takes parameters as arguments, sqlite3 as a sequence
+        self._cursor.execute( sql, params )
+        return self
+
+
+    def fetchall( self ):
+        return self._cursor.fetchall()
+
+
+    def close( self ):
+        self._cursor.close()
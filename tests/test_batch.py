@@ -0,0 +1,164 @@
+import configparser
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import openpyxl
+
+from .context import TimecardGenerator
+from timecardgenerator import __main__
+from . import synthetic
+
+
+def _load_config( app ):
+    # Defaults only, whatever user-settings.ini sits in the working directory
+    app.config = configparser.ConfigParser()
+
+
+
+class TestBatchRuns( unittest.TestCase ):
+
+    def setUp( self ):
+        self.directory = tempfile.TemporaryDirectory()
+        self.north     = self._path( 'north.xlsx' )
+        self.south     = self._path( 'south.xlsx' )
+        self.database  = self._path( 'sage.sqlite' )
+
+        self.ids = synthetic.write_timesheet( self.north, employees=20, weeks=1, seed=1 )
+        synthetic.write_timesheet( self.south, employees=10, weeks=1, seed=2 )
+        synthetic.create_sage_database( self.database, self.ids )
+
+
+    def tearDown( self ):
+        self.directory.cleanup()
+
+
+    def _path( self, name ):
+        return os.path.join( self.directory.name, name )
+
+
+    def _batch( self, files, **options ):
+        """
+        Runs a combined batch, returning the application and whether it succeeded
+        """
+        app = TimecardGenerator()
+        app.db = synthetic.SqlitePool( self.database )
+
+        try:
+            with mock.patch.object( TimecardGenerator, 'load_config', _load_config ):
+                success = app.run_batch( files, 'PP01', output=self._path( 'timecards.xlsx' ), workers=2, **options )
+        finally:
+            app.db.close()
+
+        return app, success
+
+
+    def _shifts( self, app ):
+        return dict( [ ( id, sorted( employee.get_shifts() ) ) for id, employee in app.employees.items() ] )
+
+
+    def test_employees_at_many_sites_are_merged( self ):
+        north, _ = self._batch( [ self.north ] )
+        south, _ = self._batch( [ self.south ] )
+        both, success = self._batch( [ self.north, self.south ] )
+
+        self.assertTrue( success )
+        self.assertEqual( list( both.employees ), list( north.employees ) )
+
+        north, south = self._shifts( north ), self._shifts( south )
+        for id, shifts in self._shifts( both ).items():
+            self.assertEqual( shifts, sorted( north[id] + south.get( id, [] ) ) )
+
+
+    def test_employees_are_merged_ignoring_padding_and_case( self ):
+        upper = self._path( 'upper.xlsx' )
+        shutil.copy( self.south, upper )
+
+        # The south site enters ids in lower case, some padded
+        wb = openpyxl.load_workbook( self.south )
+        for cell in wb.active['A']:
+            if type( cell.value ) == str and cell.value.startswith( 'EMP' ):
+                cell.value = ' {0}'.format( cell.value.lower() ) if cell.row % 2 else cell.value.lower()
+        wb.save( self.south )
+
+        expected, _ = self._batch( [ self.north, upper ] )
+        both, success = self._batch( [ self.north, self.south ] )
+
+        self.assertTrue( success )
+        self.assertEqual( both.errors, [] )
+        self.assertEqual( self._shifts( both ), self._shifts( expected ) )
+
+
+    def test_workbooks_listed_twice_are_parsed_once( self ):
+        once, _ = self._batch( [ self.north ] )
+        twice, success = self._batch( [ self.north, os.path.join( self.directory.name, '.', 'north.xlsx' ), self.north ] )
+
+        self.assertTrue( success )
+        self.assertEqual( twice.errors, [] )
+        self.assertEqual( self._shifts( twice ), self._shifts( once ) )
+
+
+    def _combine( self, file ):
+        """
+        Copies the north and south sites into worksheets of a single workbook
+        """
+        wb = openpyxl.Workbook()
+        wb.remove( wb.active )
+
+        for title, source in ( ( 'Kitchen', self.north ), ( 'Front', self.south ) ):
+            ws = wb.create_sheet( title )
+
+            for row in openpyxl.load_workbook( source ).active.iter_rows():
+                for cell in row:
+                    if not ( cell.value == None ):
+                        ws.cell( row=cell.row, column=cell.column, value=cell.value ).number_format = cell.number_format
+
+        wb.save( file )
+
+
+    def _headless( self, file, sheets ):
+        """
+        Runs a single workbook as from the command line, returning the application and whether it succeeded
+        """
+        app = TimecardGenerator()
+        app.db = synthetic.SqlitePool( self.database )
+
+        try:
+            with mock.patch.object( TimecardGenerator, 'load_config', _load_config ):
+                success = app.run_headless( file, 'PP01', output=self._path( 'timecards.xlsx' ), sheets=sheets )
+        finally:
+            app.db.close()
+
+        return app, success
+
+
+    def test_all_worksheets_match_separate_workbooks( self ):
+        combined = self._path( 'combined.xlsx' )
+        self._combine( combined )
+
+        expected, _ = self._batch( [ self.north, self.south ] )
+        sheets, success = self._headless( combined, 'all' )
+
+        self.assertTrue( success )
+        self.assertEqual( self._shifts( sheets ), self._shifts( expected ) )
+
+
+    def test_given_worksheets_are_read( self ):
+        combined = self._path( 'combined.xlsx' )
+        self._combine( combined )
+
+        expected, _ = self._batch( [ self.south ] )
+        sheets, success = self._headless( combined, __main__.sheets( ' Front, ' ) )
+
+        self.assertTrue( success )
+        self.assertEqual( self._shifts( sheets ), self._shifts( expected ) )
+
+
+    def test_missing_worksheet_fails( self ):
+        app, success = self._headless( self.north, [ 'Missing' ] )
+
+        self.assertFalse( success )
+        self.assertEqual( len( app.errors ), 1 )
+        self.assertIn( 'north.xlsx [Missing]', app.errors[0] )
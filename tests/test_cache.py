@@ -0,0 +1,147 @@
+import configparser
+import os
+import sqlite3
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+import pyodbc
+
+from .context import TimecardGenerator, components, models, tuples
+from . import synthetic
+
+
+ROW = ( 'OT 1', 'CAT-1', 'HRLY', 'DEMP00001', '5000-10', '5100-10' )
+
+
+class TestEmployeeCache( unittest.TestCase ):
+
+    def setUp( self ):
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache     = components.EmployeeCache( os.path.join( self.directory.name, 'cache.sqlite' ), ttl=60 )
+
+
+    def tearDown( self ):
+        self.cache.close()
+        self.directory.cleanup()
+
+
+    def test_rows_are_stored( self ):
+        self.cache.put_many( { 'EMP00001': ROW } )
+
+        self.assertEqual( self.cache.get_many( [ 'EMP00001', 'EMP00002' ] ), { 'EMP00001': ROW } )
+
+
+    def test_expired_rows_are_skipped_unless_stale( self ):
+        self.cache.put_many( { 'EMP00001': ROW } )
+
+        with mock.patch( 'time.time', return_value=time.time() + 61 ):
+            self.assertEqual( self.cache.get_many( [ 'EMP00001' ] ), {} )
+            self.assertEqual( self.cache.get_many( [ 'EMP00001' ], stale=True ), { 'EMP00001': ROW } )
+
+
+    def test_rows_are_looked_up_in_chunks( self ):
+        ids = [ 'EMP{0:05d}'.format( i ) for i in range( 7 ) ]
+        self.cache.put_many( dict( [ ( id, ROW ) for id in ids ] ) )
+
+        self.assertEqual( sorted( self.cache.get_many( ids, chunk_size=3 ) ), ids )
+
+
+    def test_stamp( self ):
+        self.assertEqual( self.cache.get_stamp(), None )
+
+        self.cache.set_stamp( '1:2' )
+        self.assertEqual( self.cache.get_stamp(), '1:2' )
+
+
+
+class _UnreachablePool( synthetic.SqlitePool ):
+    """
+    Connection pool whose database has gone away
+    """
+
+    def query( self, sql, *params ):
+        raise pyodbc.OperationalError( '08S01', 'Communication link failure' )
+
+
+
+class TestCachedEmployeeQueries( unittest.TestCase ):
+
+    IDS = [ 'EMP{0:05d}'.format( i ) for i in range( 1, 6 ) ]
+
+
+    def setUp( self ):
+        self.directory = tempfile.TemporaryDirectory()
+        self.database  = os.path.join( self.directory.name, 'sage.sqlite' )
+
+        synthetic.create_sage_database( self.database, self.IDS )
+
+
+    def tearDown( self ):
+        self.directory.cleanup()
+
+
+    def _query( self, db, ttl=86400 ):
+        """
+        Queries all employees through the employee cache, returning the application
+        """
+        app = TimecardGenerator()
+        app.config = configparser.ConfigParser()
+        app.config.read_dict( { 'CACHE': {
+            'ENABLED': 'yes',
+            'FILE':    os.path.join( self.directory.name, 'cache.sqlite' ),
+            'TTL':     str( ttl )
+        } } )
+        app.db = db
+
+        employees = [ models.Employee( id, tuples.Coordinate( column='A', row=row ) ) for row, id in enumerate( self.IDS, 2 ) ]
+
+        try:
+            app.query_employee_data( employees )
+        finally:
+            app.cache.close()
+            app.db.close()
+
+        return app, employees
+
+
+    def test_cached_employees_are_not_queried_again( self ):
+        first, _ = self._query( synthetic.SqlitePool( self.database ) )
+        again, _ = self._query( synthetic.SqlitePool( self.database ) )
+
+        # The audit stamp and the employees, then only the audit stamp
+        self.assertEqual( first.round_trips, 2 )
+        self.assertEqual( again.round_trips, 1 )
+
+
+    def test_changed_audit_stamp_clears_the_cache( self ):
+        self._query( synthetic.SqlitePool( self.database ) )
+
+        db = sqlite3.connect( self.database )
+        with db:
+            db.execute( 'UPDATE CPDIST SET EXPACCT = ?, AUDTDATE = 20170102 WHERE DISTCODE = ?', ( '6000-10', 'DEMP00003' ) )
+        db.close()
+
+        app, employees = self._query( synthetic.SqlitePool( self.database ) )
+
+        self.assertEqual( app.round_trips, 2 )
+        self.assertEqual( employees[2].data.get_value( 'T' ), '600010' )
+
+
+    def test_expired_employees_are_used_when_the_database_is_unreachable( self ):
+        self._query( synthetic.SqlitePool( self.database ), ttl=0 )
+
+        app, employees = self._query( _UnreachablePool( self.database ), ttl=0 )
+
+        self.assertEqual( app.errors, [] )
+
+        for employee in employees:
+            self.assertEqual( employee.data.get_value( 'F' ), 'HRLY' )
+
+
+    def test_unreachable_database_without_cached_employees_is_reported( self ):
+        app, _ = self._query( _UnreachablePool( self.database ) )
+
+        self.assertEqual( len( app.errors ), 1 )
+        self.assertIn( 'EMP00001', app.errors[0] )
@@ -0,0 +1,100 @@
+import datetime
+import unittest
+
+from openpyxl.utils.datetime import from_excel, MAC_EPOCH
+
+from .context import classifier
+
+
+DURATION = classifier.DURATION
+DATE     = classifier.DATE
+NOTHING  = ( classifier.NONE, None )
+
+
+class TestClassify( unittest.TestCase ):
+
+    def test_text_times( self ):
+        self.assertEqual( classifier.classify( '8:30' ), ( DURATION, 510 ) )
+        self.assertEqual( classifier.classify( ' 10:05 ' ), ( DURATION, 605 ) )
+        self.assertEqual( classifier.classify( '8:30:00' ), ( DURATION, 510 ) )
+        self.assertEqual( classifier.classify( '26:15' ), ( DURATION, 1575 ) )
+
+
+    def test_text_which_is_not_a_time( self ):
+        for value in ( '', 'SUNDAY', '8', '8:75', '8:30 am', '-1:30', '1:2:3:4' ):
+            self.assertEqual( classifier.classify( value ), NOTHING, value )
+
+
+    def test_days_off_entered_as_midnight( self ):
+        self.assertEqual( classifier.classify( '0:00' ), NOTHING )
+        self.assertEqual( classifier.classify( '00:00' ), NOTHING )
+        self.assertEqual( classifier.classify( datetime.time( 0, 0 ) ), NOTHING )
+        self.assertEqual( classifier.classify( datetime.timedelta( 0 ) ), NOTHING )
+        self.assertEqual( classifier.classify( datetime.datetime( 1899, 12, 30 ) ), NOTHING )
+        self.assertEqual( classifier.classify( 0.0 ), NOTHING )
+
+
+    def test_times( self ):
+        self.assertEqual( classifier.classify( datetime.time( 8, 30 ) ), ( DURATION, 510 ) )
+        self.assertEqual( classifier.classify( datetime.time( 8, 30, 59 ) ), ( DURATION, 510 ) )
+        self.assertEqual( classifier.classify( datetime.timedelta( hours=26 ) ), ( DURATION, 1560 ) )
+        self.assertEqual( classifier.classify( datetime.datetime( 1899, 12, 30, 7, 45 ) ), ( DURATION, 465 ) )
+        self.assertEqual( classifier.classify( 0.5 ), ( DURATION, 720 ) )
+
+
+    def test_dates( self ):
+        day = datetime.date( 2017, 5, 14 )
+
+        self.assertEqual( classifier.classify( day ), ( DATE, day.toordinal() ) )
+        self.assertEqual( classifier.classify( datetime.datetime( 2017, 5, 14, 9, 0 ) ), ( DATE, day.toordinal() ) )
+
+
+    def test_other_types( self ):
+        for value in ( None, 8, 1.5, -0.5, True ):
+            self.assertEqual( classifier.classify( value ), NOTHING, value )
+
+
+
+class TestClassifySerial( unittest.TestCase ):
+
+    # Serials of dates, times, midnight and values around the 1900-02-29 Excel counts
+    SERIALS = ( 0, 0.0, 0.25, 0.5, 0.9999999, 1, 1.5, 59, 60, 60.5, 61, 42869, 42869.0, 42869.375, 2958465.5 )
+
+
+    def test_midnight( self ):
+        self.assertEqual( classifier.classify_serial( 0, classifier.DATE ), NOTHING )
+        self.assertEqual( classifier.classify_serial( 0.0, classifier.DATE ), NOTHING )
+        self.assertEqual( classifier.classify_serial( 0.0, classifier.DURATION ), NOTHING )
+
+
+    def test_past_the_last_date( self ):
+        self.assertEqual( classifier.classify_serial( 2958466, classifier.DATE ), NOTHING )
+        self.assertEqual( classifier.classify_serial( 2958465, classifier.DATE, epoch=MAC_EPOCH ), NOTHING )
+
+
+    def test_matches_openpyxl_dates( self ):
+        for value in self.SERIALS:
+            self.assertEqual(
+                classifier.classify_serial( value, classifier.DATE ),
+                classifier.classify( from_excel( value ) ),
+                value
+            )
+
+
+    def test_matches_openpyxl_1904_dates( self ):
+        # The last serial is past the last date from 1904
+        for value in self.SERIALS[:-1]:
+            self.assertEqual(
+                classifier.classify_serial( value, classifier.DATE, epoch=MAC_EPOCH ),
+                classifier.classify( from_excel( value, epoch=MAC_EPOCH ) ),
+                value
+            )
+
+
+    def test_matches_openpyxl_durations( self ):
+        for value in self.SERIALS:
+            self.assertEqual(
+                classifier.classify_serial( value, classifier.DURATION ),
+                classifier.classify( from_excel( value, timedelta=True ) ),
+                value
+            )
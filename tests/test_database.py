@@ -0,0 +1,69 @@
+import configparser
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from .context import TimecardGenerator, models, tuples
+from . import synthetic
+
+
+class TestEmployeeQueries( unittest.TestCase ):
+
+    IDS = [ 'EMP{0:05d}'.format( i ) for i in range( 1, 11 ) ]
+
+
+    def setUp( self ):
+        self.directory = tempfile.TemporaryDirectory()
+        database       = os.path.join( self.directory.name, 'sage.sqlite' )
+
+        synthetic.create_sage_database( database, self.IDS )
+
+        # A second hourly distribution, only the first found is used
+        db = sqlite3.connect( database )
+        with db:
+            db.execute( 'INSERT INTO CPEMPD VALUES ( ?, ?, ?, ?, 20170101, 0 )', ( 'EMP00002', 'HRLY', 'DLATER', 'CAT-2' ) )
+            db.execute( 'INSERT INTO CPDIST VALUES ( ?, ?, ?, ?, ?, 20170101, 0 )', ( 'HRLY', 'DLATER', '9000-10', '9100-10', 'ADMIN' ) )
+        db.close()
+
+        self.app = TimecardGenerator()
+        self.app.config = configparser.ConfigParser()
+        self.app.db     = synthetic.SqlitePool( database )
+
+        # Small chunks, so ten employees take several queries
+        self.app.QUERY_CHUNK_SIZE = 3
+
+
+    def tearDown( self ):
+        self.app.db.close()
+        self.directory.cleanup()
+
+
+    def test_rows_are_mapped_across_chunks( self ):
+        rows = self.app._query_employee_rows( self.IDS + [ 'MISSING' ] )
+
+        self.assertEqual( self.app.round_trips, 4 )
+        self.assertEqual( sorted( rows ), self.IDS )
+
+        for id in self.IDS:
+            self.assertEqual( rows[id], ( 'OT 1', 'CAT-1', 'HRLY', 'D{0}'.format( id ), '5000-10', '5100-10' ) )
+
+
+    def test_first_distribution_is_used( self ):
+        rows = self.app._query_employee_rows( [ 'EMP00002' ] )
+
+        self.assertEqual( rows['EMP00002'][3], 'DEMP00002' )
+
+
+    def test_employees_are_matched_ignoring_padding_and_case( self ):
+        employees = [ models.Employee( id, tuples.Coordinate( column='A', row=row ) ) for row, id in enumerate( ( ' emp00001', 'EMP00004 ', 'EMP00009', 'EMP99999' ), 2 ) ]
+
+        self.app.query_employee_data( employees )
+
+        for employee in employees[:3]:
+            self.assertEqual( employee.data.get_value( 'F' ), 'HRLY' )
+            self.assertEqual( employee.data.get_value( 'T' ), '500010' )
+            self.assertEqual( employee.data.get_value( 'V' ), '510010' )
+
+        self.assertEqual( len( self.app.errors ), 1 )
+        self.assertIn( 'EMP99999', self.app.errors[0] )
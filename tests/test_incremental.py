@@ -0,0 +1,113 @@
+import configparser
+import datetime
+import os
+import shutil
+import tempfile
+import unittest
+
+import openpyxl
+
+from .context import TimecardGenerator, models
+from . import synthetic
+
+
+class TestIncrementalRuns( unittest.TestCase ):
+
+    def setUp( self ):
+        self.directory = tempfile.TemporaryDirectory()
+        self.file      = self._path( 'hours.xlsx' )
+        self.original  = self._path( 'original.xlsx' )
+        self.database  = self._path( 'sage.sqlite' )
+
+        self.ids = synthetic.write_timesheet( self.original, employees=40, weeks=2, seed=1 )
+        synthetic.create_sage_database( self.database, self.ids )
+
+
+    def tearDown( self ):
+        self.directory.cleanup()
+
+
+    def _path( self, name ):
+        return os.path.join( self.directory.name, name )
+
+
+    def _reset( self ):
+        """
+        Restores the timesheet as written, each engine starts from the same workbook
+        """
+        shutil.copy( self.original, self.file )
+
+
+    def _generate( self, output, engine, incremental=True ):
+        """
+        Generates the timesheet headless, returning the application once done
+        """
+        app = TimecardGenerator()
+        app.config = configparser.ConfigParser()
+        app.config.read_dict( { 'INCREMENTAL': {
+            'ENABLED': 'yes' if incremental else 'no',
+            'FILE':    self._path( '{0}-state.pickle'.format( engine ) )
+        } } )
+
+        app.db          = synthetic.SqlitePool( self.database )
+        app.payperiod   = 'PP01'
+        app.output      = self._path( output )
+        app.spreadsheet = models.Spreadsheet( self.file, engine=engine )
+
+        try:
+            self.assertTrue( app.generate() )
+        finally:
+            app.close_spreadsheet()
+            app.db.close()
+
+        return app
+
+
+    def _read( self, output ):
+        wb = openpyxl.load_workbook( self._path( output ) )
+        return dict( [ ( ws.title, [ list( row ) for row in ws.iter_rows( values_only=True ) ] ) for ws in wb.worksheets ] )
+
+
+    def _change_employee( self, id ):
+        """
+        Changes the first time cell of an employee, resaving the whole workbook
+        """
+        wb = openpyxl.load_workbook( self.file )
+        ws = wb.active
+
+        row = [ cell.row for cell in ws['A'] if cell.value == id ][0]
+        ws.cell( row=row, column=synthetic.FIRST_COLUMN, value=datetime.time( 3, 15 ) )
+
+        wb.save( self.file )
+
+
+    def test_restored_run_matches_full_run( self ):
+        for engine in models.ENGINES:
+            with self.subTest( engine=engine ):
+                self._reset()
+
+                first = self._generate( '{0}-first.xlsx'.format( engine ), engine )
+                again = self._generate( '{0}-again.xlsx'.format( engine ), engine )
+
+                self.assertEqual( first.restored, set() )
+                self.assertEqual( again.restored, set( again.employees ) )
+                self.assertEqual( again.errors, first.errors )
+                self.assertEqual( self._read( '{0}-again.xlsx'.format( engine ) ), self._read( '{0}-first.xlsx'.format( engine ) ) )
+
+
+    def test_changed_employee_is_parsed_again( self ):
+        for engine in models.ENGINES:
+            with self.subTest( engine=engine ):
+                self._reset()
+                self._generate( '{0}-first.xlsx'.format( engine ), engine )
+
+                changed = self.ids[5]
+                self._change_employee( changed )
+
+                restored = self._generate( '{0}-restored.xlsx'.format( engine ), engine )
+                full     = self._generate( '{0}-full.xlsx'.format( engine ), engine, incremental=False )
+
+                self.assertNotIn( changed, restored.restored )
+                self.assertEqual( restored.restored, set( restored.employees ) - set( [ changed ] ) )
+                self.assertEqual( restored.errors, full.errors )
+                self.assertEqual( self._read( '{0}-restored.xlsx'.format( engine ) ), self._read( '{0}-full.xlsx'.format( engine ) ) )
@@ -0,0 +1,257 @@
+import configparser
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+import urllib.error
+import urllib.request
+from unittest import mock
+
+from .context import TimecardGenerator, components
+from timecardgenerator import core
+from . import synthetic
+
+
+def _load_config( app ):
+    # Defaults only, whatever user-settings.ini sits in the working directory
+    app.config = configparser.ConfigParser()
+
+
+# Kept aside from the patched module
+_parse_workbook = core.parse_workbook
+
+
+def _parse_or_die( file, payperiod, sheet=None, engine='openpyxl' ):
+    # Kills its worker process for jobs of the CRASH payperiod, as a native crash in a reader would
+    if payperiod == 'CRASH':
+        os._exit( 1 )
+
+    return _parse_workbook( file, payperiod, sheet, engine )
+
+
+
+class TestJobQueue( unittest.TestCase ):
+
+    def setUp( self ):
+        self.directory = tempfile.TemporaryDirectory()
+        self.release   = threading.Event()
+
+
+    def tearDown( self ):
+        self.release.set()
+        self.directory.cleanup()
+
+
+    def _job( self ):
+        return components.Job( 'PP01', self.directory.name )
+
+
+    def _wait( self, job, status ):
+        for _ in range( 500 ):
+            if job.status == status:
+                return
+
+            time.sleep( 0.01 )
+
+        self.fail( 'Job {0} never {1}'.format( job.id, status ) )
+
+
+    def test_jobs_past_the_limit_are_refused( self ):
+        jobs = components.JobQueue( lambda job: self.release.wait( 5 ), workers=1, max_queued=2 )
+
+        running = self._job()
+        jobs.submit( running )
+        self._wait( running, components.Job.RUNNING )
+
+        waiting = [ self._job(), self._job() ]
+        for job in waiting:
+            jobs.submit( job )
+
+        refused = self._job()
+        with self.assertRaises( components.JobQueueFull ):
+            jobs.submit( refused )
+
+        self.assertEqual( jobs.get( refused.id ), None )
+        self.assertEqual( [ job.status for job in waiting ], [ components.Job.QUEUED ] * 2 )
+
+        self.release.set()
+        jobs.stop()
+
+        self.assertEqual( [ job.status for job in jobs.list() ], [ components.Job.DONE ] * 3 )
+
+
+    def test_failed_jobs_keep_their_errors( self ):
+        def run( job ):
+            raise ValueError( 'Spreadsheet must be set' )
+
+        jobs = components.JobQueue( run, workers=1 )
+        job  = self._job()
+
+        jobs.submit( job )
+        jobs.stop()
+
+        self.assertEqual( job.status, components.Job.FAILED )
+        self.assertEqual( job.errors, [ 'Generate Error! Spreadsheet must be set' ] )
+
+
+    def test_oldest_finished_jobs_are_removed( self ):
+        jobs = components.JobQueue( lambda job: None, workers=1, keep=2 )
+        submitted = []
+
+        for _ in range( 4 ):
+            job = self._job()
+            jobs.submit( job )
+            self._wait( job, components.Job.DONE )
+
+            submitted.append( job )
+
+        jobs.submit( self._job() )
+        jobs.stop()
+
+        self.assertEqual( [ job.id for job in jobs.list()[:1] ], [ submitted[3].id ] )
+        self.assertEqual( len( jobs.list() ), 2 )
+
+        for job in submitted[:3]:
+            self.assertEqual( jobs.get( job.id ), None )
+            self.assertFalse( os.path.exists( job.directory ) )
+
+
+
+class _Service( unittest.TestCase ):
+    """
+    Uploads spreadsheets to a server on a free local port
+    """
+
+    def _url( self, path ):
+        return 'http://{0}:{1}{2}'.format( *self.server.server_address[:2], path )
+
+
+    def _upload( self, file, payperiod='PP01' ):
+        """
+        Returns the status and JSON body of an upload
+        """
+        with open( file, 'rb' ) as handle:
+            request = urllib.request.Request( self._url( '/jobs?payperiod={0}'.format( payperiod ) ), data=handle.read(), method='POST' )
+
+        try:
+            with urllib.request.urlopen( request ) as response:
+                return response.status, json.load( response )
+        except urllib.error.HTTPError as error:
+            return error.code, json.load( error )
+
+
+    def _poll( self, id ):
+        for _ in range( 1000 ):
+            with urllib.request.urlopen( self._url( '/jobs/{0}'.format( id ) ) ) as response:
+                job = json.load( response )
+
+            if job['status'] in ( components.Job.DONE, components.Job.FAILED ):
+                return job
+
+            time.sleep( 0.01 )
+
+        self.fail( 'Job {0} never finished'.format( id ) )
+
+
+
+class TestJobServer( _Service ):
+
+    def setUp( self ):
+        self.directory = tempfile.TemporaryDirectory()
+        self.file      = os.path.join( self.directory.name, 'hours.xlsx' )
+        self.release   = threading.Event()
+
+        synthetic.write_timesheet( self.file, employees=5, weeks=1 )
+
+        self.jobs   = components.JobQueue( lambda job: self.release.wait( 5 ), workers=1, max_queued=1 )
+        self.server = components.JobServer( self.jobs, os.path.join( self.directory.name, 'jobs' ), port=0 )
+
+        threading.Thread( target=self.server.serve_forever, daemon=True ).start()
+
+
+    def tearDown( self ):
+        self.release.set()
+        self.server.shutdown()
+        self.server.server_close()
+        self.jobs.stop()
+        self.directory.cleanup()
+
+
+    def test_uploads_are_refused_once_the_queue_is_full( self ):
+        status, running = self._upload( self.file )
+        self.assertEqual( status, 202 )
+
+        # Taken by the only worker, one more may wait
+        for _ in range( 500 ):
+            if self.jobs.get( running['id'] ).status == components.Job.RUNNING:
+                break
+            time.sleep( 0.01 )
+
+        status, _ = self._upload( self.file )
+        self.assertEqual( status, 202 )
+
+        status, refused = self._upload( self.file )
+        self.assertEqual( status, 503 )
+        self.assertIn( 'already waiting', refused['error'] )
+
+        # Refused uploads leave nothing behind
+        self.assertEqual( len( os.listdir( self.server.directory ) ), 2 )
+
+
+    def test_results_wait_for_their_job( self ):
+        _, job = self._upload( self.file )
+
+        with self.assertRaises( urllib.error.HTTPError ) as raised:
+            urllib.request.urlopen( self._url( '/jobs/{0}/result'.format( job['id'] ) ) )
+
+        self.assertEqual( raised.exception.code, 409 )
+        raised.exception.close()
+
+
+
+class TestJobService( _Service ):
+
+    def setUp( self ):
+        self.directory = tempfile.TemporaryDirectory()
+        self.file      = os.path.join( self.directory.name, 'hours.xlsx' )
+        self.database  = os.path.join( self.directory.name, 'sage.sqlite' )
+
+        synthetic.create_sage_database( self.database, synthetic.write_timesheet( self.file, employees=5, weeks=1 ) )
+
+        self.app = TimecardGenerator()
+        self.app.db = synthetic.SqlitePool( self.database )
+
+        patchers = [ mock.patch.object( TimecardGenerator, 'load_config', _load_config ), mock.patch.object( core, 'parse_workbook', _parse_or_die ) ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup( patcher.stop )
+
+        self.thread = threading.Thread( target=self.app.run_service, kwargs={ 'port': 0, 'workers': 1, 'directory': os.path.join( self.directory.name, 'jobs' ) } )
+        self.thread.start()
+
+        for _ in range( 500 ):
+            if not ( self.app.server == None ):
+                break
+            time.sleep( 0.01 )
+
+        self.server = self.app.server
+
+
+    def tearDown( self ):
+        self.app.stop_service()
+        self.thread.join( 30 )
+        self.app.db.close()
+        self.directory.cleanup()
+
+
+    def test_dead_worker_process_restarts_the_pool( self ):
+        _, crashed = self._upload( self.file, payperiod='CRASH' )
+        crashed    = self._poll( crashed['id'] )
+
+        self.assertEqual( crashed['status'], components.Job.FAILED )
+        self.assertEqual( len( crashed['errors'] ), 1 )
+
+        _, job = self._upload( self.file )
+        self.assertEqual( self._poll( job['id'] )['status'], components.Job.DONE )
@@ -0,0 +1,131 @@
+import csv
+import datetime
+import decimal
+import os
+import tempfile
+import unittest
+
+import openpyxl
+
+from .context import components
+
+
+def _read( file ):
+    """
+    Returns the cell values and date flags of each sheet, with the defined names of a workbook
+    """
+    wb = openpyxl.load_workbook( file )
+
+    sheets = {}
+    for ws in wb.worksheets:
+        sheets[ws.title] = [ [ ( cell.value, cell.is_date ) for cell in row ] for row in ws.iter_rows() ]
+
+    if hasattr( wb.defined_names, 'values' ):
+        names = wb.defined_names.values()
+    else:
+        names = wb.defined_names.definedName
+
+    return sheets, sorted( ( name.name, name.attr_text ) for name in names )
+
+
+
+class TestStreamingXlsxOutput( unittest.TestCase ):
+
+    HEADER = [
+        [ 'EMPLOYEE', 'PEREND', 'TIMECARD', 'TCARDDESC', 'CREGHRS' ],
+        [ 'EMP01', datetime.date( 2017, 5, 27 ), 'PP01', ' Padded & <escaped> ', 0 ],
+        [ 'EMP02', datetime.datetime( 2017, 5, 27, 16, 30 ), 'PP01', None, 37.5 ]
+    ]
+
+    DETAIL = [
+        [ 'EMPLOYEE', 'LINENUM', 'EARNDEDDATE', 'HOURS', 'START', 'ELAPSED', 'AMOUNT', 'ACTIVE' ],
+        [ 'EMP01', 1000, datetime.date( 2017, 5, 14 ), 8.5, datetime.time( 8, 30 ), datetime.timedelta( hours=26, minutes=15 ), decimal.Decimal( '12.50' ), True ],
+        [ 'EMP01', 2000, datetime.date( 1900, 2, 28 ), 7.25, datetime.time( 0, 0 ), datetime.timedelta( 0 ), decimal.Decimal( '0' ), False ],
+        [ 'EMP02', 1000, None, 0.1, None, None, None, None ]
+    ]
+
+
+    def setUp( self ):
+        self.directory = tempfile.TemporaryDirectory()
+
+
+    def tearDown( self ):
+        self.directory.cleanup()
+
+
+    def _write( self, output ):
+        output.write( iter( self.HEADER ), iter( self.DETAIL ) )
+        return output
+
+
+    def test_matches_openpyxl_output( self ):
+        expected = self._write( components.XlsxOutput( os.path.join( self.directory.name, 'openpyxl.xlsx' ) ) )
+        streamed = self._write( components.StreamingXlsxOutput( os.path.join( self.directory.name, 'native.xlsx' ) ) )
+
+        self.assertEqual( _read( streamed.file ), _read( expected.file ) )
+        self.assertEqual( streamed.rows, expected.rows )
+
+
+    def test_named_ranges( self ):
+        output = self._write( components.StreamingXlsxOutput( os.path.join( self.directory.name, 'native.xlsx' ) ) )
+
+        self.assertEqual( _read( output.file )[1], [
+            ( 'Timecard_Detail', '\'Timecard_Detail\'!A1:H4' ),
+            ( 'Timecard_Header', '\'Timecard_Header\'!A1:E3' )
+        ] )
+
+
+    def test_illegal_characters( self ):
+        output = components.StreamingXlsxOutput( os.path.join( self.directory.name, 'illegal.xlsx' ) )
+
+        with self.assertRaises( openpyxl.utils.exceptions.IllegalCharacterError ):
+            output.write( [ [ 'EMPLOYEE' ], [ 'EMP\x0101' ] ], [ [ 'EMPLOYEE' ] ] )
+
+
+
+class TestBytesOutput( unittest.TestCase ):
+
+    def test_matches_file_output( self ):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup( directory.cleanup )
+
+        expected = components.XlsxOutput( os.path.join( directory.name, 'timecards.xlsx' ) )
+        expected.write( iter( TestStreamingXlsxOutput.HEADER ), iter( TestStreamingXlsxOutput.DETAIL ) )
+
+        output = components.BytesOutput()
+        output.write( iter( TestStreamingXlsxOutput.HEADER ), iter( TestStreamingXlsxOutput.DETAIL ) )
+
+        self.assertEqual( output.rows, 7 )
+        self.assertEqual( output.size, len( output.getvalue() ) )
+        self.assertEqual( output.file.tell(), 0 )
+
+        self.assertEqual( _read( output.file ), _read( expected.file ) )
+
+
+
+class TestCsvOutput( unittest.TestCase ):
+
+    def setUp( self ):
+        self.directory = tempfile.TemporaryDirectory()
+
+
+    def tearDown( self ):
+        self.directory.cleanup()
+
+
+    def test_one_file_per_sheet( self ):
+        output = components.CsvOutput( os.path.join( self.directory.name, 'timecards.xlsx' ) )
+        output.write(
+            iter( [ [ 'EMPLOYEE', 'PEREND' ], [ 'EMP01', datetime.date( 2017, 5, 27 ) ] ] ),
+            iter( [ [ 'EMPLOYEE', 'EARNDEDDATE', 'HOURS' ], [ 'EMP01', datetime.datetime( 2017, 5, 14, 8, 30 ), 8.5 ], [ 'EMP01', None, 7.25 ] ] )
+        )
+
+        self.assertEqual( [ os.path.basename( file ) for file in output.files ], [ 'timecards-Timecard_Header.csv', 'timecards-Timecard_Detail.csv' ] )
+        self.assertEqual( output.rows, 5 )
+        self.assertEqual( output.size, sum( [ os.path.getsize( file ) for file in output.files ] ) )
+
+        with open( output.files[0], newline='' ) as handle:
+            self.assertEqual( list( csv.reader( handle ) ), [ [ 'EMPLOYEE', 'PEREND' ], [ 'EMP01', '2017-05-27' ] ] )
+
+        with open( output.files[1], newline='' ) as handle:
+            self.assertEqual( list( csv.reader( handle ) ), [ [ 'EMPLOYEE', 'EARNDEDDATE', 'HOURS' ], [ 'EMP01', '2017-05-14T08:30:00', '8.5' ], [ 'EMP01', '', '7.25' ] ] )
@@ -0,0 +1,113 @@
+import unittest
+from unittest import mock
+
+import pyodbc
+
+from .context import components
+
+
+class _Connection( object ):
+
+    def __init__( self, healthy=True ):
+        self.healthy = healthy
+        self.closed  = False
+
+
+    def cursor( self ):
+        return _Cursor( self )
+
+
+    def close( self ):
+        self.closed = True
+
+
+
+class _Cursor( object ):
+
+    def __init__( self, connection ):
+        self._connection = connection
+
+
+    def execute( self, sql, *params ):
+        if not self._connection.healthy:
+            raise pyodbc.OperationalError( '08S01', 'Communication link failure' )
+
+        return self
+
+
+    def fetchall( self ):
+        return [ ( 1, ) ]
+
+
+    def close( self ):
+        pass
+
+
+
+class TestConnectionPool( unittest.TestCase ):
+
+    def setUp( self ):
+        self.pool = components.ConnectionPool( 'DSN=sage', retries=3, backoff=0.5, idle_check=30 )
+
+
+    def test_connect_retries_with_backoff( self ):
+        connection = _Connection()
+        failure    = pyodbc.OperationalError( '08001', 'Server not found' )
+
+        with mock.patch( 'pyodbc.connect', side_effect=[ failure, failure, connection ] ) as connect, mock.patch( 'time.sleep' ) as sleep:
+            self.assertIs( self.pool._connect(), connection )
+
+        self.assertEqual( connect.call_count, 3 )
+        self.assertEqual( [ call.args[0] for call in sleep.call_args_list ], [ 0.5, 1.0 ] )
+
+
+    def test_connect_gives_up_after_retries( self ):
+        failure = pyodbc.OperationalError( '08001', 'Server not found' )
+
+        with mock.patch( 'pyodbc.connect', side_effect=failure ) as connect, mock.patch( 'time.sleep' ) as sleep:
+            with self.assertRaises( pyodbc.OperationalError ):
+                self.pool._connect()
+
+        self.assertEqual( connect.call_count, 4 )
+        self.assertEqual( [ call.args[0] for call in sleep.call_args_list ], [ 0.5, 1.0, 2.0 ] )
+
+
+    def test_recently_used_connections_are_not_checked( self ):
+        connection = _Connection( healthy=False )
+        self.pool._idle.put( ( connection, 1000 ) )
+
+        with mock.patch( 'time.time', return_value=1010 ), mock.patch.object( self.pool, '_connect' ) as connect:
+            self.assertIs( self.pool._acquire(), connection )
+
+        connect.assert_not_called()
+
+
+    def test_idle_connections_are_checked( self ):
+        healthy = _Connection()
+        self.pool._idle.put( ( healthy, 1000 ) )
+
+        with mock.patch( 'time.time', return_value=1060 ):
+            self.assertIs( self.pool._acquire(), healthy )
+
+
+    def test_dropped_idle_connections_are_replaced( self ):
+        dropped = _Connection( healthy=False )
+        fresh   = _Connection()
+        self.pool._idle.put( ( dropped, 1000 ) )
+
+        with mock.patch( 'time.time', return_value=1060 ), mock.patch.object( self.pool, '_connect', return_value=fresh ):
+            self.assertIs( self.pool._acquire(), fresh )
+
+        self.assertTrue( dropped.closed )
+
+
+    def test_query_reconnects_once_when_the_connection_dropped( self ):
+        dropped = _Connection( healthy=False )
+        fresh   = _Connection()
+
+        with mock.patch.object( self.pool, '_connect', side_effect=[ dropped, fresh ] ):
+            self.assertEqual( self.pool.query( 'SELECT 1' ), [ ( 1, ) ] )
+
+        self.assertTrue( dropped.closed )
+        self.assertEqual( self.pool.queries, 2 )
+        self.assertIs( self.pool._idle.get_nowait()[0], fresh )
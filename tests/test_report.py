@@ -0,0 +1,92 @@
+import configparser
+import json
+import os
+import tempfile
+import unittest
+
+import openpyxl
+
+from .context import TimecardGenerator, components, models
+from . import synthetic
+
+
+class TestRunReport( unittest.TestCase ):
+
+    def test_counters_add_up( self ):
+        report = components.RunReport()
+        report.count( 'employees', 24 )
+        report.count( 'employees', 6 )
+        report.count( 'rows_written' )
+
+        self.assertEqual( report.counters, { 'employees': 30, 'rows_written': 1 } )
+
+
+    def test_phases_run_more_than_once_add_up( self ):
+        report = components.RunReport()
+
+        for phase in ( 'hours', 'database', 'hours' ):
+            report.start( phase )
+        report.stop()
+
+        self.assertEqual( list( report.phases ), [ 'hours', 'database' ] )
+        self.assertEqual( report._phase, None )
+
+
+    def test_disabled_report_ignores_everything( self ):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup( directory.cleanup )
+
+        report = components.RunReport( enabled=False )
+        report.start( 'hours' )
+        report.count( 'employees', 24 )
+        report.save( os.path.join( directory.name, 'report.json' ) )
+
+        self.assertEqual( report.to_dict(), { 'phases': {}, 'counters': {} } )
+        self.assertEqual( os.listdir( directory.name ), [] )
+
+
+
+class TestGeneratedReport( unittest.TestCase ):
+
+    def setUp( self ):
+        self.directory = tempfile.TemporaryDirectory()
+        self.file      = os.path.join( self.directory.name, 'hours.xlsx' )
+        self.database  = os.path.join( self.directory.name, 'sage.sqlite' )
+
+        synthetic.create_sage_database( self.database, synthetic.write_timesheet( self.file, employees=30, weeks=1, seed=3 ) )
+
+
+    def tearDown( self ):
+        self.directory.cleanup()
+
+
+    def test_counts_match_the_run( self ):
+        app = TimecardGenerator()
+        app.config = configparser.ConfigParser()
+        app.config.read_dict( { 'REPORT': { 'ENABLED': 'yes' } } )
+
+        app.db          = synthetic.SqlitePool( self.database )
+        app.payperiod   = 'PP01'
+        app.output      = os.path.join( self.directory.name, 'timecards.xlsx' )
+        app.spreadsheet = models.Spreadsheet( self.file )
+
+        try:
+            self.assertTrue( app.generate() )
+        finally:
+            app.close_spreadsheet()
+            app.db.close()
+
+        with open( os.path.join( self.directory.name, 'timecards-report.json' ) ) as handle:
+            report = json.load( handle )
+
+        counters = report['counters']
+        rows     = sum( [ ws.max_row for ws in openpyxl.load_workbook( app.output ).worksheets ] )
+
+        self.assertEqual( list( report['phases'] ), list( TimecardGenerator.PHASES ) )
+        self.assertEqual( counters['employees'], len( app.employees ) )
+        self.assertEqual( counters['employees_reused'], 0 )
+        self.assertEqual( counters['time_cells_classified'], sum( [ employee.get_shift_count() for employee in app.employees.values() ] ) )
+        self.assertEqual( counters['database_round_trips'], app.round_trips )
+        self.assertEqual( counters['rows_written'], rows )
+        self.assertEqual( counters['bytes_saved'], os.path.getsize( app.output ) )
+        self.assertGreaterEqual( counters['cells_scanned'], counters['time_cells_classified'] )
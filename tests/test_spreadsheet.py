@@ -0,0 +1,56 @@
+import configparser
+import datetime
+import os
+import tempfile
+import unittest
+
+import openpyxl
+
+from .context import TimecardGenerator, models
+from . import synthetic
+
+
+class TestSpreadsheet( unittest.TestCase ):
+
+    def setUp( self ):
+        self.directory = tempfile.TemporaryDirectory()
+        self.file      = os.path.join( self.directory.name, 'hours.xlsx' )
+
+        synthetic.write_timesheet( self.file, employees=10, weeks=1 )
+
+
+    def tearDown( self ):
+        self.directory.cleanup()
+
+
+    def _parse( self, spreadsheet ):
+        app = TimecardGenerator()
+        app.config      = configparser.ConfigParser()
+        app.payperiod   = 'PP01'
+        app.spreadsheet = spreadsheet
+        app.parse_spreadsheet()
+
+        return app
+
+
+    def test_closed_spreadsheet_reopens_once_saved_again( self ):
+        for engine in models.ENGINES:
+            with self.subTest( engine=engine ):
+                spreadsheet = models.Spreadsheet( self.file, engine=engine )
+
+                try:
+                    before = self._parse( spreadsheet )
+                    spreadsheet.close()
+
+                    # The spreadsheet is fixed and saved between runs
+                    wb = openpyxl.load_workbook( self.file )
+                    wb.active.cell( row=4, column=synthetic.FIRST_COLUMN, value=datetime.time( 11, 45 ) )
+                    wb.save( self.file )
+
+                    after = self._parse( spreadsheet )
+                finally:
+                    spreadsheet.close()
+
+                self.assertEqual( set( after.employees ), set( before.employees ) )
+                hours = dict( [ ( ( coordinate.column, coordinate.row ), minutes ) for coordinate, minutes in after.sheet_data.hours ] )
+                self.assertEqual( hours[( 'C', 4 )], 11 * 60 + 45 )
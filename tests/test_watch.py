@@ -0,0 +1,192 @@
+import configparser
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from .context import TimecardGenerator, components
+from timecardgenerator import core
+from . import synthetic
+
+
+def _load_config( app ):
+    # Defaults only, whatever user-settings.ini sits in the working directory
+    app.config = configparser.ConfigParser()
+
+
+# Kept aside from the patched module
+_parse_workbook = core.parse_workbook
+
+
+def _parse_or_die( file, payperiod, sheet=None, engine='openpyxl' ):
+    # Kills its worker process for spreadsheets named to crash, as a native crash in a reader would
+    if 'crash' in os.path.basename( file ):
+        os._exit( 1 )
+
+    return _parse_workbook( file, payperiod, sheet, engine )
+
+
+
+class TestFolderWatcher( unittest.TestCase ):
+
+    def setUp( self ):
+        self.directory = tempfile.TemporaryDirectory()
+        self.file      = os.path.join( self.directory.name, 'north.xlsx' )
+        self.now       = 1000.0
+
+        patcher = mock.patch( 'time.monotonic', side_effect=lambda: self.now )
+        patcher.start()
+        self.addCleanup( patcher.stop )
+
+        self.watcher = components.FolderWatcher( self.directory.name, settle=2.0 )
+
+
+    def tearDown( self ):
+        self.directory.cleanup()
+
+
+    def _save( self, data ):
+        with open( self.file, 'wb' ) as handle:
+            handle.write( data )
+
+        # Each save is seen as a change, however coarse the file system clock
+        self.now += 1
+        os.utime( self.file, ns=( int( self.now * 10**9 ), int( self.now * 10**9 ) ) )
+
+
+    def _poll( self, seconds=0 ):
+        self.now += seconds
+        return self.watcher.poll()
+
+
+    def test_files_are_reported_once_settled( self ):
+        self._save( b'saved' )
+
+        self.assertEqual( self._poll(), [] )
+        self.assertTrue( self.watcher.waiting() )
+        self.assertEqual( self._poll( 1 ), [] )
+        self.assertEqual( self._poll( 1 ), [ self.file ] )
+        self.assertFalse( self.watcher.waiting() )
+
+        # Unchanged files are reported once
+        self.assertEqual( self._poll( 10 ), [] )
+
+
+    def test_settling_restarts_while_still_written( self ):
+        self._save( b'part' )
+        self.assertEqual( self._poll(), [] )
+
+        self._save( b'partly saved' )
+        self.assertEqual( self._poll( 1.5 ), [] )
+        self.assertEqual( self._poll( 1.5 ), [] )
+        self.assertEqual( self._poll( 0.5 ), [ self.file ] )
+
+
+    def test_changed_files_are_reported_again( self ):
+        self._save( b'saved' )
+        self._poll()
+        self.assertEqual( self._poll( 2 ), [ self.file ] )
+
+        self._save( b'saved again' )
+        self._poll()
+        self.assertEqual( self._poll( 2 ), [ self.file ] )
+
+
+    def test_forgotten_files_are_reported_again( self ):
+        self._save( b'saved' )
+        self._poll()
+        self.assertEqual( self._poll( 2 ), [ self.file ] )
+
+        self.watcher.forget( self.file )
+        self._poll()
+        self.assertEqual( self._poll( 2 ), [ self.file ] )
+
+
+    def test_other_files_are_ignored( self ):
+        for name in ( '~$north.xlsx', 'notes.txt' ):
+            with open( os.path.join( self.directory.name, name ), 'w' ) as handle:
+                handle.write( 'ignored' )
+
+        os.makedirs( os.path.join( self.directory.name, 'outbox.xlsx' ) )
+
+        self._poll()
+        self.assertEqual( self._poll( 2 ), [] )
+        self.assertFalse( self.watcher.waiting() )
+
+
+
+class TestWatchFolder( unittest.TestCase ):
+
+    def setUp( self ):
+        self.directory = tempfile.TemporaryDirectory()
+        self.inbox     = self._path( 'inbox' )
+        self.database  = self._path( 'sage.sqlite' )
+
+        os.makedirs( self.inbox )
+
+        ids = synthetic.write_timesheet( os.path.join( self.inbox, 'north.xlsx' ), employees=10, weeks=1, seed=1 )
+        synthetic.create_sage_database( self.database, ids )
+
+
+    def tearDown( self ):
+        self.directory.cleanup()
+
+
+    def _path( self, *names ):
+        return os.path.join( self.directory.name, *names )
+
+
+    def _watch( self, app=None ):
+        """
+        Watches the inbox until it is empty, returning the application and whether every spreadsheet generated
+        """
+        app = app or TimecardGenerator()
+        app.db = synthetic.SqlitePool( self.database )
+
+        try:
+            with mock.patch.object( TimecardGenerator, 'load_config', _load_config ):
+                success = app.run_watch( self.inbox, 'PP01', workers=2, interval=0.05, settle=0, once=True )
+        finally:
+            app.db.close()
+
+        return app, success
+
+
+    def _listed( self, *names ):
+        return sorted( os.listdir( os.path.join( self.inbox, *names ) ) )
+
+
+    def test_spreadsheets_are_moved_to_the_outbox( self ):
+        _, success = self._watch()
+
+        self.assertTrue( success )
+        self.assertEqual( self._listed(), [ 'failed', 'outbox' ] )
+        self.assertEqual( self._listed( 'outbox' ), [ 'north-TIMECARDS.xlsx', 'north.xlsx' ] )
+
+
+    def test_spreadsheets_which_cannot_be_moved_stay_in_the_inbox( self ):
+        app = TimecardGenerator()
+
+        with mock.patch.object( app, '_move_watched', side_effect=PermissionError( 13, 'Permission denied' ) ):
+            _, success = self._watch( app )
+
+        self.assertFalse( success )
+        self.assertIn( 'north.xlsx', self._listed() )
+
+        # Moved once the spreadsheet is released
+        _, success = self._watch()
+
+        self.assertTrue( success )
+        self.assertNotIn( 'north.xlsx', self._listed() )
+        self.assertIn( 'north.xlsx', self._listed( 'outbox' ) )
+
+
+    def test_dead_worker_process_restarts_the_pool( self ):
+        synthetic.write_timesheet( os.path.join( self.inbox, 'crash.xlsx' ), employees=5, weeks=1, seed=2 )
+
+        with mock.patch.object( core, 'parse_workbook', _parse_or_die ):
+            _, success = self._watch()
+
+        self.assertFalse( success )
+        self.assertIn( 'north.xlsx', self._listed( 'outbox' ) )
+        self.assertEqual( self._listed( 'failed' ), [ 'crash-errors.txt', 'crash.xlsx' ] )
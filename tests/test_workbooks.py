@@ -0,0 +1,92 @@
+import os
+import tempfile
+import unittest
+
+from .context import components
+
+
+class TestWorkbookCache( unittest.TestCase ):
+
+    def setUp( self ):
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache     = components.WorkbookCache( os.path.join( self.directory.name, 'parsed' ) )
+
+
+    def tearDown( self ):
+        self.directory.cleanup()
+
+
+    def _size( self, key ):
+        return os.path.getsize( self.cache._file( key ) )
+
+
+    def _age( self, key, seconds ):
+        """
+        Marks an entry as last used the given seconds ago, mtimes being too coarse to order quick puts
+        """
+        used = os.path.getmtime( self.cache._file( key ) ) - seconds
+        os.utime( self.cache._file( key ), ( used, used ) )
+
+
+    def test_key_follows_content_and_parts( self ):
+        file = os.path.join( self.directory.name, 'hours.xlsx' )
+
+        with open( file, 'wb' ) as handle:
+            handle.write( b'first' )
+        first = self.cache.key( file, 'Sheet1', 'openpyxl', 2 )
+
+        self.assertEqual( self.cache.key( file, 'Sheet1', 'openpyxl', 2 ), first )
+        self.assertNotEqual( self.cache.key( file, 'Sheet1', 'native', 2 ), first )
+        self.assertNotEqual( self.cache.key( file, 'Sheet1', 'openpyxl', 3 ), first )
+
+        with open( file, 'wb' ) as handle:
+            handle.write( b'second' )
+
+        self.assertNotEqual( self.cache.key( file, 'Sheet1', 'openpyxl', 2 ), first )
+
+
+    def test_entries_are_stored( self ):
+        self.cache.put( 'a', { 'id_column': 'A', 'rows': [ 1, 2 ] } )
+
+        self.assertEqual( self.cache.get( 'a' ), { 'id_column': 'A', 'rows': [ 1, 2 ] } )
+        self.assertEqual( self.cache.get( 'missing' ), None )
+
+
+    def test_least_recently_used_entries_are_evicted( self ):
+        # Random bytes do not compress, so each entry is about the same size
+        for key in ( 'a', 'b' ):
+            self.cache.put( key, os.urandom( 4096 ) )
+
+        self._age( 'a', 20 )
+        self._age( 'b', 10 )
+
+        # Reading an entry makes it the most recently used
+        self.assertNotEqual( self.cache.get( 'a' ), None )
+
+        self.cache.max_size = self._size( 'a' ) * 2 + self._size( 'a' ) // 2
+        self.cache.put( 'c', os.urandom( 4096 ) )
+
+        self.assertNotEqual( self.cache.get( 'a' ), None )
+        self.assertEqual( self.cache.get( 'b' ), None )
+        self.assertNotEqual( self.cache.get( 'c' ), None )
+
+
+    def test_unreadable_entries_are_ignored( self ):
+        for key, data in ( ( 'garbage', b'not a parsed workbook' ), ( 'empty', b'' ) ):
+            with open( self.cache._file( key ), 'wb' ) as handle:
+                handle.write( data )
+
+            with self.assertLogs( level='WARNING' ):
+                self.assertEqual( self.cache.get( key ), None )
+
+        # Truncated while written by a process which was killed
+        self.cache.put( 'truncated', list( range( 1000 ) ) )
+        with open( self.cache._file( 'truncated' ), 'r+b' ) as handle:
+            handle.truncate( self._size( 'truncated' ) // 2 )
+
+        with self.assertLogs( level='WARNING' ):
+            self.assertEqual( self.cache.get( 'truncated' ), None )
+
+        # Parsed again, the entry is replaced
+        self.cache.put( 'truncated', list( range( 1000 ) ) )
+        self.assertEqual( self.cache.get( 'truncated' ), list( range( 1000 ) ) )
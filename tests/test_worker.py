@@ -0,0 +1,87 @@
+import threading
+import unittest
+
+from .context import components
+
+
+class TestWorker( unittest.TestCase ):
+
+    def _finish( self, worker ):
+        """
+        Waits for the task to end, returning all messages it queued
+        """
+        worker._thread.join( 5 )
+        self.assertFalse( worker.is_alive() )
+
+        return list( worker.messages() )
+
+
+    def test_progress_then_result( self ):
+        def task( worker ):
+            worker.report( 'hours' )
+            worker.report( 'database' )
+            return 'generated'
+
+        worker = components.Worker( task )
+        worker.start()
+
+        self.assertEqual( self._finish( worker ), [ ( 'progress', 'hours' ), ( 'progress', 'database' ), ( 'done', 'generated' ) ] )
+
+
+    def test_errors_are_passed_back( self ):
+        error = ValueError( 'Spreadsheet must be set' )
+
+        def task( worker ):
+            raise error
+
+        worker = components.Worker( task )
+        worker.start()
+
+        self.assertEqual( self._finish( worker ), [ ( 'error', error ) ] )
+
+
+    def test_messages_are_polled_without_blocking( self ):
+        reported = threading.Event()
+        resume   = threading.Event()
+
+        def task( worker ):
+            worker.report( 'hours' )
+            reported.set()
+            resume.wait( 5 )
+
+        worker = components.Worker( task )
+        worker.start()
+        reported.wait( 5 )
+
+        # Polling drains what is queued so far and returns while the task still runs
+        self.assertEqual( list( worker.messages() ), [ ( 'progress', 'hours' ) ] )
+        self.assertEqual( list( worker.messages() ), [] )
+        self.assertTrue( worker.is_alive() )
+
+        resume.set()
+        self.assertEqual( self._finish( worker ), [ ( 'done', None ) ] )
+
+
+    def test_cancel_stops_at_the_next_report( self ):
+        reported = threading.Event()
+        resume   = threading.Event()
+        phases   = []
+
+        def task( worker ):
+            worker.report( 'hours' )
+            phases.append( 'hours' )
+            reported.set()
+            resume.wait( 5 )
+
+            worker.report( 'database' )
+            phases.append( 'database' )
+
+        worker = components.Worker( task )
+        worker.start()
+        reported.wait( 5 )
+
+        worker.cancel()
+        resume.set()
+
+        self.assertEqual( self._finish( worker ), [ ( 'progress', 'hours' ), ( 'cancelled', None ) ] )
+        self.assertEqual( phases, [ 'hours' ] )
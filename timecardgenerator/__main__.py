@@ -1,17 +1,106 @@
 import sys
+import argparse
+import multiprocessing
 
-from timecardgenerator import TimecardGenerator
+from timecardgenerator import TimecardGenerator, helpers
+
+def sheets( value ):
+    """Parses a comma separated list of worksheet titles, or 'all'."""
+    if value == 'all':
+        return value
+
+    return [ title.strip() for title in value.split( ',' ) if title.strip() ]
 
 def main( args=None ):
     """The main routine."""
     if args is None:
         args = sys.argv[1:]
 
+    parser = argparse.ArgumentParser( prog='timecardgenerator', description='Sage 300 Timecard Generator' )
+    commands = parser.add_subparsers( dest='command' )
+
+    generate = commands.add_parser( 'generate', help='Generate a timecard import spreadsheet without the GUI' )
+    generate.add_argument( '--input', required=True, help='Employee hours spreadsheet' )
+    generate.add_argument( '--payperiod', required=True, help='Timecard payperiod title' )
+    generate.add_argument( '--out', default='GENERATED-TIMECARDS.xlsx', help='Generated spreadsheet path, a .csv path writes one csv file per sheet' )
+    generate.add_argument( '--sheets', type=sheets, default=None, help='Comma separated worksheets to read in parallel, or all, defaults to the first worksheet' )
+    generate.add_argument( '--profile', action='store_true', help='Save a profile of each phase next to the generated spreadsheet' )
+
+    batch = commands.add_parser( 'batch', help='Generate timecards from many employee hours spreadsheets at once' )
+    batch.add_argument( '--input', required=True, help='Directory or glob of employee hours spreadsheets' )
+    batch.add_argument( '--payperiod', required=True, help='Timecard payperiod title' )
+    batch.add_argument( '--out', default='GENERATED-TIMECARDS.xlsx', help='Generated spreadsheet path, suffixed by site with --per-site' )
+    batch.add_argument( '--per-site', action='store_true', help='Write one generated spreadsheet per input spreadsheet' )
+    batch.add_argument( '--workers', type=int, default=None, help='Parsing processes, defaults to the number of processors' )
+    batch.add_argument( '--sheets', type=sheets, default=None, help='Comma separated worksheets to read, or all, defaults to the first worksheet' )
+    batch.add_argument( '--profile', action='store_true', help='Save a profile of each phase next to the generated spreadsheet' )
+
+    watch = commands.add_parser( 'watch', help='Generate timecards for every spreadsheet saved to an inbox folder until stopped' )
+    watch.add_argument( '--inbox', required=True, help='Folder watched for employee hours spreadsheets' )
+    watch.add_argument( '--payperiod', required=True, help='Timecard payperiod title' )
+    watch.add_argument( '--outbox', default=None, help='Folder for generated spreadsheets and their sources, defaults to inbox/outbox' )
+    watch.add_argument( '--failed', default=None, help='Folder for spreadsheets which failed and their errors, defaults to inbox/failed' )
+    watch.add_argument( '--workers', type=int, default=None, help='Parsing processes, defaults to the number of processors' )
+    watch.add_argument( '--interval', type=float, default=2.0, help='Seconds between inbox checks' )
+    watch.add_argument( '--settle', type=float, default=2.0, help='Seconds a spreadsheet must stay unchanged before it is processed' )
+    watch.add_argument( '--once', action='store_true', help='Stop once the inbox is empty' )
+
+    serve = commands.add_parser( 'serve', help='Generate timecards for spreadsheets uploaded over HTTP until stopped' )
+    serve.add_argument( '--host', default='127.0.0.1', help='Address to listen on, defaults to this machine only' )
+    serve.add_argument( '--port', type=int, default=8300, help='Port to listen on' )
+    serve.add_argument( '--workers', type=int, default=None, help='Jobs generated at once, defaults to the number of processors' )
+    serve.add_argument( '--max-queued', type=int, default=16, help='Jobs waiting before uploads are refused' )
+    serve.add_argument( '--jobs', default='jobs', help='Folder where each job keeps its spreadsheet, timecards and report' )
+
+    options = parser.parse_args( args )
+
     # Run Application
     app = TimecardGenerator()
 
-    app.run()
+    if options.command == 'generate':
+        success = app.run_headless( file=options.input, payperiod=options.payperiod, output=options.out, sheets=options.sheets, profile=options.profile )
+
+    elif options.command == 'batch':
+        files = helpers.find_workbooks( options.input )
+
+        if not files:
+            sys.stderr.write( 'No spreadsheets found at {0}\n'.format( options.input ) )
+            return 1
+
+        success = app.run_batch( files=files, payperiod=options.payperiod, output=options.out, per_site=options.per_site, workers=options.workers, sheets=options.sheets, profile=options.profile )
+
+    elif options.command == 'watch':
+        try:
+            success = app.run_watch(
+                inbox=options.inbox, payperiod=options.payperiod, outbox=options.outbox, failed=options.failed,
+                workers=options.workers, interval=options.interval, settle=options.settle, once=options.once
+            )
+        except KeyboardInterrupt:
+            return 0
+
+        # Errors of each spreadsheet are saved next to it
+        return 0 if success else 1
+
+    elif options.command == 'serve':
+        try:
+            app.run_service( host=options.host, port=options.port, workers=options.workers, max_queued=options.max_queued, directory=options.jobs )
+        except KeyboardInterrupt:
+            pass
+
+        # Errors of each job are served with its status
+        return 0
+
+    else:
+        app.run()
+        return 0
+
+    for error in app.errors:
+        sys.stderr.write( '{0}\n'.format( error ) )
+
+    return 0 if success and not app.errors else 1
 
 
 if __name__ == '__main__':
-    main()
+    # Required for worker processes in frozen Windows builds
+    multiprocessing.freeze_support()
+    sys.exit( main() )
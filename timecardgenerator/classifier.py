@@ -0,0 +1,172 @@
+import datetime
+import functools
+
+
+#            #
+# CELL KINDS #
+#            #
+NONE     = 0
+DATE     = 1
+DURATION = 2
+
+WEEKDAYS = ( 'Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday' )
+
+# Excel stores times as datetimes relative to its 1899-12-30 epoch,
+# anything past 1899-12-31 is a calendar date
+EXCEL_EPOCH      = datetime.datetime( 1899, 12, 30 )
+EXCEL_DATE_START = datetime.datetime( 1899, 12, 31 )
+MINUTE           = datetime.timedelta( minutes=1 )
+MINUTES_PER_DAY  = 24 * 60
+MS_PER_DAY       = MINUTES_PER_DAY * 60 * 1000
+MS_PER_MINUTE    = 60 * 1000
+MAX_ORDINAL      = datetime.date.max.toordinal()
+
+_NOTHING = ( NONE, None )
+
+
+
+def classify( value ):
+    """
+    classify( datetime.time( 8, 30 ) ) -> ( DURATION, 510 )
+
+    Classifies a raw cell value by its python type, normalising dates
+    into ordinals and durations into integer minutes
+
+    :param value: any
+    :return: tuple( int, int )
+    """
+    handler = _HANDLERS.get( type( value ) )
+
+    if handler == None:
+        return _NOTHING
+
+    return handler( value )
+
+
+def classify_serial( value, style, epoch=EXCEL_EPOCH ):
+    """
+    classify_serial( 0.5, DATE ) -> ( DURATION, 720 )
+
+    Classifies an Excel serial read from a date or elapsed time formatted cell, giving
+    the same result as classifying the value openpyxl converts the serial into
+
+    :param value: int or float
+    :param style: int, DATE or DURATION
+    :param epoch: datetime.datetime, the workbook date epoch
+    :return: tuple( int, int )
+    """
+    if style == DURATION:
+        try:
+            return _classify_timedelta( _serial_timedelta( value ) )
+
+        # Serials past the longest timedelta are unreadable
+        except OverflowError:
+            return _NOTHING
+
+    day, fraction = divmod( value, 1 )
+    milliseconds  = round( fraction * MS_PER_DAY )
+
+    # Fractions of a day are times
+    if 0 <= value < 1 and milliseconds < MS_PER_DAY:
+        return _duration( milliseconds // MS_PER_MINUTE )
+
+    # Excel counts the 1900-02-29 which never was
+    if 0 < value < 60 and epoch == EXCEL_EPOCH:
+        day += 1
+
+    # Milliseconds past the Excel epoch
+    elapsed = ( ( epoch - EXCEL_EPOCH ).days + int( day ) ) * MS_PER_DAY + milliseconds
+
+    if elapsed > MS_PER_DAY:
+        ordinal = EXCEL_EPOCH.toordinal() + elapsed // MS_PER_DAY
+
+        # Serials past the last date are unreadable
+        if ordinal > MAX_ORDINAL:
+            return _NOTHING
+
+        return ( DATE, ordinal )
+
+    return _duration( elapsed // MS_PER_MINUTE )
+
+
+def minutes_to_hours( minutes ):
+    """
+    minutes_to_hours( 510 ) -> 8.5
+
+    :param minutes: int
+    :return: float
+    """
+    return ( minutes // 60 ) + ( ( minutes % 60 ) / 60 )
+
+
+
+#          #
+# HANDLERS #
+#          #
+def _duration( minutes ):
+    if minutes <= 0:
+        return _NOTHING
+
+    return ( DURATION, minutes )
+
+
+def _classify_datetime( value ):
+    if value > EXCEL_DATE_START:
+        return ( DATE, value.toordinal() )
+
+    return _duration( ( value - EXCEL_EPOCH ) // MINUTE )
+
+
+def _classify_date( value ):
+    return ( DATE, value.toordinal() )
+
+
+def _classify_time( value ):
+    return _duration( value.hour * 60 + value.minute )
+
+
+def _classify_timedelta( value ):
+    return _duration( value // MINUTE )
+
+
+def _serial_timedelta( value ):
+    # Rounded to the millisecond, as openpyxl reads elapsed times
+    delta = datetime.timedelta( days=value )
+
+    if delta.microseconds:
+        delta = datetime.timedelta( seconds=delta.total_seconds() // 1, microseconds=round( delta.microseconds, -3 ) )
+
+    return delta
+
+
+def _classify_float( value ):
+    # Unformatted serials are only trusted as a fraction of a day
+    if not ( 0 < value < 1 ):
+        return _NOTHING
+
+    return _duration( int( round( value * MINUTES_PER_DAY ) ) )
+
+
+@functools.lru_cache( maxsize=1024 )
+def _classify_str( value ):
+    parts = value.strip().split( ':' )
+
+    if not ( 2 <= len( parts ) <= 3 ) or not all( part.isdigit() for part in parts ):
+        return _NOTHING
+
+    hours, minutes = int( parts[0] ), int( parts[1] )
+
+    if minutes >= 60:
+        return _NOTHING
+
+    return _duration( hours * 60 + minutes )
+
+
+_HANDLERS = {
+    datetime.datetime:  _classify_datetime,
+    datetime.date:      _classify_date,
+    datetime.time:      _classify_time,
+    datetime.timedelta: _classify_timedelta,
+    float:              _classify_float,
+    str:                _classify_str
+}
@@ -1,2 +1,13 @@
+from .cache import EmployeeCache
 from .data import Data
+from .database import ConnectionPool
 from .gui import GUI
+from .jobs import Job, JobQueue, JobQueueFull
+from .output import Output, XlsxOutput, StreamingXlsxOutput, CsvOutput, BytesOutput
+from .profiler import PhaseProfiler
+from .report import RunReport
+from .server import JobServer
+from .state import IncrementalState
+from .watcher import FolderWatcher
+from .worker import Worker, WorkerCancelled
+from .workbooks import WorkbookCache
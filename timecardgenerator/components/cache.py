@@ -0,0 +1,124 @@
+import json
+import logging
+import sqlite3
+import time
+
+
+class EmployeeCache( object ):
+
+    def __init__( self, file, ttl=86400 ):
+        assert type( file ) == str, 'file must be a valid string path'
+
+        self.file = file
+        self.ttl  = ttl
+
+        # Runs may happen on a background worker thread
+        self._db = sqlite3.connect( file, check_same_thread=False )
+        self._db.executescript( """
+        CREATE TABLE IF NOT EXISTS employees (
+            id      TEXT PRIMARY KEY,
+            data    TEXT NOT NULL,
+            cached  REAL NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS meta (
+            key     TEXT PRIMARY KEY,
+            value   TEXT
+        );
+        """ )
+
+        logging.info( 'EmployeeCache opened at {0}'.format( file ) )
+
+
+    def close( self ):
+        """
+        Closes the cache database
+        """
+        self._db.close()
+
+
+
+    #           #
+    # EMPLOYEES #
+    #           #
+    def get_many( self, ids, stale=False, chunk_size=500 ):
+        """
+        get_many( [ 'EMP01', 'EMP02' ] )
+
+        Retrieves cached employee rows by id in chunked lookups, skipping entries older than the ttl unless stale
+
+        :param ids: list
+        :param stale: bool
+        :param chunk_size: int, ids looked up per query, below the SQLite limit of 999 parameters
+        :return: dict
+        """
+        oldest = 0 if stale else time.time() - self.ttl
+        ids    = list( ids )
+        rows   = {}
+
+        for i in range( 0, len( ids ), chunk_size ):
+            chunk = ids[i:i + chunk_size]
+
+            for id, data in self._db.execute(
+                'SELECT id, data FROM employees WHERE cached >= ? AND id IN ( {0} )'.format( ', '.join( [ '?' ] * len( chunk ) ) ),
+                ( oldest, *chunk )
+            ):
+                rows[id] = tuple( json.loads( data ) )
+
+        logging.info( 'Found {0} of {1} employees in cache'.format( len( rows ), len( ids ) ) )
+
+        return rows
+
+
+    def put_many( self, rows ):
+        """
+        put_many( { 'EMP01': ( 'OT1', 'CAT1', ... ) } )
+
+        Stores employee rows by id
+
+        :param rows: dict
+        """
+        now = time.time()
+
+        with self._db:
+            self._db.executemany(
+                'INSERT OR REPLACE INTO employees ( id, data, cached ) VALUES ( ?, ?, ? )',
+                [ ( id, json.dumps( list( row ), default=str ), now ) for id, row in rows.items() ]
+            )
+
+
+    def clear( self ):
+        """
+        Removes all cached employees
+        """
+        logging.info( 'Clearing employee cache' )
+
+        with self._db:
+            self._db.execute( 'DELETE FROM employees' )
+
+
+
+    #      #
+    # META #
+    #      #
+    def get_stamp( self ):
+        """
+        Retrieves the database change stamp the cache was filled against
+
+        :return: str
+        """
+        found = self._db.execute( 'SELECT value FROM meta WHERE key = ?', ( 'stamp', ) ).fetchone()
+
+        if found == None:
+            return
+
+        return found[0]
+
+
+    def set_stamp( self, stamp ):
+        """
+        Stores the database change stamp the cache is filled against
+
+        :param stamp: str
+        """
+        with self._db:
+            self._db.execute( 'INSERT OR REPLACE INTO meta ( key, value ) VALUES ( ?, ? )', ( 'stamp', stamp ) )
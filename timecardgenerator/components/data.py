@@ -1,83 +1,169 @@
-import logging
+#        #
+# SCHEMA #
+#        #
+# Output column and key of every employee property written to Timecard_Detail
+SCHEMA = (
+    ( 'A',  'id' ),
+    ( 'B',  'periodend' ),
+    ( 'C',  'payperiod' ),
+    ( 'E',  'CATEGORY' ),
+    ( 'F',  'EARNDED' ),
+    ( 'T',  'EXPACCT' ),
+    ( 'V',  'OTACCT' ),
+    ( 'Y',  'OTSCHED' ),
+    ( 'AV', 'DAYS' ),
+    ( 'BB', 'DISTCODE' )
+)
+
+
+def _column_index( column ):
+    index = 0
+    for letter in column:
+        index = index * 26 + ( ord( letter ) - 64 )
+
+    return index - 1
+
+
+# Precompiled slot and zero based output column index of each schema column
+_SLOTS   = dict( [ ( column, slot ) for slot, ( column, _ ) in enumerate( SCHEMA ) ] )
+_INDICES = tuple( [ _column_index( column ) for column, _ in SCHEMA ] )
+_WIDTH   = max( _INDICES ) + 1
+
+class _Unset( object ):
+
+    # Unpickles to the module singleton, so records survive worker processes
+    def __reduce__( self ):
+        return '_UNSET'
+
+
+_UNSET = _Unset()
+
 
 
 class Data( object ):
 
+    __slots__ = ( '_values', )
+
+
     def __init__( self ):
-        self._data = {}
+        self._values = [ _UNSET ] * len( SCHEMA )
 
 
 
     #      #
     # DATA #
     #      #
+    def set( self, column, value ):
+        """
+        set( 'A', 'EMP01' )
+
+        Stores a value in its schema column, without the checks of add
+
+        :param column: str
+        :param value: any
+        """
+        self._values[_SLOTS[column]] = value
+
+
+    def get_value( self, column ):
+        """
+        get_value( 'A' )
+
+        Retrieves the value of a schema column, None when unset
+
+        :param column: str
+        :return: any
+        """
+        value = self._values[_SLOTS[column]]
+
+        if value is _UNSET:
+            return
+
+        return value
+
+
+    def get_row( self, width=0 ):
+        """
+        get_row( 66 )
+
+        Returns the set values laid out by output column index
+
+        :param width: int, minimum length of the row
+        :return: list
+        """
+        row = [ None ] * max( width, _WIDTH )
+
+        for index, value in zip( _INDICES, self._values ):
+            if not ( value is _UNSET ):
+                row[index] = value
+
+        return row
+
+
     def add( self, key, data ):
         """
-        add( 'name', 'John' )
+        add( 'A', { 'key': 'id', 'value': 'EMP01' } )
 
         Store a new piece of data in the Employee's data
 
         :param key: str
-        :param data: any
-        :return: any
+        :param data: dict
+        :return: dict
         """
         assert not self.data_exists( key ), 'Key \'{0}\' already exists in data'.format( key )
 
-        logging.info( 'Adding data at key \'{0}\' of type {1}'.format( key, type( data ) ) )
-
-        self._data[key] = data
+        self.set( key, data['value'] )
 
-        return self._data[key]
+        return self.get( key )
 
 
     def data_exists( self, key ):
         """
-        data_exists( 'name' )
+        data_exists( 'A' )
 
-        Returns if the given key exists in the data dictionary
+        Returns if the given key exists in the data
 
         :param key: str
         :return: bool
         """
-        assert type( key ) == str, 'Key expected type {0}, got {1}'.format( str, type( key ) )
+        assert key in _SLOTS, 'Key \'{0}\' is not a schema column'.format( key )
 
-        return key in self._data
+        return not ( self._values[_SLOTS[key]] is _UNSET )
 
 
     def get( self, key ):
         """
-        get( 'name' )
+        get( 'A' )
 
-        Retrieves a piece of data from dictionary by key
+        Retrieves a piece of data by key
 
-        :param key: str 
-        :return: any
+        :param key: str
+        :return: dict
         """
         assert self.data_exists( key ), 'Key \'{0}\' does not exists in data'.format( key )
 
-        logging.info( 'Retrieving data at key \'{0}\''.format( key ) )
-
-        return self._data[key]
+        return {
+            'key': SCHEMA[_SLOTS[key]][1],
+            'value': self._values[_SLOTS[key]]
+        }
 
 
     def get_all( self ):
         """
-        Retrieves the data dictionary on the instance
+        Retrieves all set data by key
         :return: dict
         """
-        return self._data
+        return dict( [ ( column, self.get( column ) ) for column, _ in SCHEMA if self.data_exists( column ) ] )
 
 
     def remove( self, key ):
         """
-        remove( 'name' )
+        remove( 'A' )
 
-        Removes a piece of data from dictionary by key
+        Removes a piece of data by key
 
         :param key: str
         """
         assert self.data_exists( key ), 'Key \'{0}\' does not exists in data'.format( key )
 
-        logging.info( 'Removing data at key \'{0}\''.format( key ) )
-
-        del self._data[key]
+        self._values[_SLOTS[key]] = _UNSET
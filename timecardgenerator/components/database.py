@@ -0,0 +1,193 @@
+import contextlib
+import logging
+import queue
+import threading
+import time
+import pyodbc
+
+
+class ConnectionPool( object ):
+
+    # Errors which indicate the connection itself is unusable
+    _connection_errors = ( pyodbc.OperationalError, pyodbc.InterfaceError )
+
+
+    def __init__( self, connection_string, size=4, retries=3, backoff=0.5, idle_check=30 ):
+        assert size > 0, 'Pool size must be at least 1'
+
+        self._connection_string = connection_string
+
+        self.size       = size
+        self.retries    = retries
+        self.backoff    = backoff
+        self.idle_check = idle_check
+
+        # Database round trips made through query
+        self.queries = 0
+
+        # Idle connections paired with their last use, handed out newest first
+        self._idle  = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore( size )
+
+        logging.info( 'ConnectionPool instantiated' )
+
+
+    def close( self ):
+        """
+        Closes all idle connections
+        """
+        while True:
+            try:
+                connection, _ = self._idle.get_nowait()
+            except queue.Empty:
+                break
+
+            self._discard( connection )
+
+        logging.info( 'ConnectionPool closed' )
+
+
+
+    #             #
+    # CONNECTIONS #
+    #             #
+    @contextlib.contextmanager
+    def connection( self ):
+        """
+        with pool.connection() as connection: ...
+
+        Borrows a healthy connection from the pool, connecting on first use
+
+        :return: pyodbc.Connection
+        """
+        self._slots.acquire()
+        connection = None
+
+        try:
+            connection = self._acquire()
+            yield connection
+
+        except self._connection_errors:
+            self._discard( connection )
+            connection = None
+            raise
+
+        finally:
+            if not ( connection == None ):
+                self._idle.put( ( connection, time.time() ) )
+
+            self._slots.release()
+
+
+    @contextlib.contextmanager
+    def cursor( self ):
+        """
+        with pool.cursor() as cursor: cursor.execute( 'SELECT 1' )
+
+        Opens an independent cursor on a borrowed connection
+
+        :return: pyodbc.Cursor
+        """
+        with self.connection() as connection:
+            cursor = connection.cursor()
+
+            try:
+                yield cursor
+            finally:
+                cursor.close()
+
+
+    def query( self, sql, *params ):
+        """
+        query( 'SELECT * FROM CPEMPL WHERE EMPLOYEE = ?', 'EMP01' )
+
+        Executes a query and fetches all rows, reconnecting once if the connection dropped
+
+        :param sql: str
+        :param params: any
+        :return: list
+        """
+        for attempt in range( 2 ):
+            try:
+                with self.cursor() as cursor:
+                    self.queries += 1
+                    cursor.execute( sql, *params )
+                    return cursor.fetchall()
+
+            except self._connection_errors as error:
+                if attempt > 0:
+                    raise
+
+                logging.warning( 'Database connection lost, reconnecting: {0}'.format( error ) )
+
+
+    def _acquire( self ):
+        """
+        Returns an idle connection which passes a health check, or a new one
+
+        :return: pyodbc.Connection
+        """
+        while True:
+            try:
+                connection, used = self._idle.get_nowait()
+            except queue.Empty:
+                return self._connect()
+
+            # Only connections idle for a while are checked, to save round trips
+            if ( time.time() - used < self.idle_check ) or self._is_healthy( connection ):
+                return connection
+
+            self._discard( connection )
+
+
+    def _connect( self ):
+        """
+        Opens a new connection, retrying with exponential backoff
+
+        :return: pyodbc.Connection
+        """
+        for attempt in range( self.retries + 1 ):
+            try:
+                logging.info( 'Connecting to Database...' )
+                return pyodbc.connect( self._connection_string )
+
+            except pyodbc.Error as error:
+                if attempt == self.retries:
+                    raise
+
+                delay = self.backoff * ( 2 ** attempt )
+                logging.warning( 'Database connection failed, retrying in {0}s: {1}'.format( delay, error ) )
+                time.sleep( delay )
+
+
+    def _discard( self, connection ):
+        """
+        Closes a connection, ignoring errors from connections which already dropped
+
+        :param connection: pyodbc.Connection
+        """
+        if connection == None:
+            return
+
+        try:
+            connection.close()
+        except pyodbc.Error:
+            pass
+
+
+    def _is_healthy( self, connection ):
+        """
+        Return if the connection can still execute a query
+
+        :param connection: pyodbc.Connection
+        :return: bool
+        """
+        try:
+            cursor = connection.cursor()
+            cursor.execute( 'SELECT 1' )
+            cursor.fetchall()
+            cursor.close()
+        except pyodbc.Error:
+            return False
+
+        return True
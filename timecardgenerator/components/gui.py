@@ -3,13 +3,14 @@ import logging
 import tkinter
 from tkinter import filedialog
 from tkinter import messagebox
+from tkinter import ttk
 from timecardgenerator import tuples
 
 
 
 class GUI( object ):
 
-    _tkinter_classlist = dict( [ ( name, cls ) for name, cls in tkinter.__dict__.items() if isinstance( cls, type ) ] )
+    _tkinter_classlist = [ cls for module in ( tkinter, ttk ) for cls in module.__dict__.values() if isinstance( cls, type ) ]
 
 
     def __init__( self, title='', geometry=tuples.Geometry( width=0, height=0 ), grid=tuples.Grid( rows=1, columns=1 ) ):
@@ -96,6 +97,18 @@ class GUI( object ):
         self._tk.mainloop()
 
 
+    def after( self, delay, callback ):
+        """
+        after( 100, callback )
+
+        Schedules a callback on the tkinter mainloop after delay milliseconds
+
+        :param delay: int
+        :param callback: callable
+        """
+        self._tk.after( delay, callback )
+
+
     def load_file( self, filetypes=( ( 'All files', '*.*' ) ) ):
         """        
         Opens the file dialogue prompt
@@ -206,7 +219,7 @@ class GUI( object ):
         :param widget: tkinter widget 
         :return: bool
         """
-        for _, classname in self._tkinter_classlist.items():
+        for classname in self._tkinter_classlist:
 
             if ( type( widget ) == classname ):
                 return True
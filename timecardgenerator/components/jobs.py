@@ -0,0 +1,192 @@
+import collections
+import logging
+import os
+import queue
+import shutil
+import threading
+import time
+import uuid
+
+
+class JobQueueFull( Exception ):
+    """Raised when a job is submitted while the queue holds as many waiting jobs as it allows"""
+
+
+
+class Job( object ):
+    """
+    A queued timecard generation, kept in its own directory with the uploaded
+    spreadsheet, the generated import file and the run report
+    """
+
+    # Statuses, in order
+    QUEUED  = 'queued'
+    RUNNING = 'running'
+    DONE    = 'done'
+    FAILED  = 'failed'
+
+
+    def __init__( self, payperiod, directory ):
+        self.id        = uuid.uuid4().hex
+        self.payperiod = payperiod
+        self.directory = os.path.join( directory, self.id )
+
+        self.upload      = os.path.join( self.directory, 'upload.xlsx' )
+        self.output      = os.path.join( self.directory, 'GENERATED-TIMECARDS.xlsx' )
+        self.report_file = os.path.join( self.directory, 'GENERATED-TIMECARDS-report.json' )
+
+        self.status   = self.QUEUED
+        self.phase    = None
+        self.errors   = []
+        self.created  = time.time()
+        self.started  = None
+        self.finished = None
+
+        os.makedirs( self.directory, exist_ok=True )
+
+
+    def report( self, phase ):
+        """
+        report( 'hours' )
+
+        Called from the generation to publish its running phase, as a Worker is
+
+        :param phase: str
+        """
+        self.phase = phase
+
+
+    def to_dict( self ):
+        """
+        :return: dict
+        """
+        return {
+            'id': self.id,
+            'payperiod': self.payperiod,
+            'status': self.status,
+            'phase': self.phase,
+            'errors': self.errors,
+            'created': self.created,
+            'started': self.started,
+            'finished': self.finished
+        }
+
+
+
+class JobQueue( object ):
+    """
+    Runs submitted jobs on a fixed number of worker threads, refusing jobs once too many are waiting
+    and removing the oldest finished jobs, with their files, past the number kept
+    """
+
+    def __init__( self, run, workers=2, max_queued=16, keep=100 ):
+        assert callable( run ), 'run must be a callable'
+        assert workers > 0, 'workers must be at least 1'
+
+        self._run  = run
+        self.keep  = keep
+        self.jobs  = collections.OrderedDict()
+
+        self._queue   = queue.Queue( maxsize=max_queued )
+        self._lock    = threading.Lock()
+        self._threads = [ threading.Thread( target=self._work, daemon=True ) for _ in range( workers ) ]
+
+        for thread in self._threads:
+            thread.start()
+
+        logging.info( 'JobQueue started with {0} workers'.format( workers ) )
+
+
+    def submit( self, job ):
+        """
+        submit( Job( 'PP01', 'jobs' ) )
+
+        Queues a job, raising JobQueueFull when too many jobs are waiting
+
+        :param job: Job
+        """
+        with self._lock:
+            try:
+                self._queue.put_nowait( job )
+            except queue.Full:
+                raise JobQueueFull( '{0} jobs are already waiting'.format( self._queue.maxsize ) )
+
+            self.jobs[job.id] = job
+            self._evict()
+
+        logging.info( 'Queued job {0}'.format( job.id ) )
+
+
+    def get( self, id ):
+        """
+        get( '3f0a...' )
+
+        :param id: str
+        :return: Job, None when unknown
+        """
+        with self._lock:
+            return self.jobs.get( id )
+
+
+    def list( self ):
+        """
+        Returns every kept job, oldest first
+
+        :return: list of Job
+        """
+        with self._lock:
+            return list( self.jobs.values() )
+
+
+    def stop( self ):
+        """
+        Stops the worker threads once the jobs already queued are finished
+        """
+        for _ in self._threads:
+            self._queue.put( None )
+
+        for thread in self._threads:
+            thread.join()
+
+        logging.info( 'JobQueue stopped' )
+
+
+
+    #         #
+    # WORKERS #
+    #         #
+    def _work( self ):
+        while True:
+            job = self._queue.get()
+
+            if job == None:
+                return
+
+            job.status  = Job.RUNNING
+            job.started = time.time()
+
+            try:
+                self._run( job )
+            except Exception as error:
+                logging.exception( 'Job {0} failed'.format( job.id ) )
+
+                job.errors.append( 'Generate Error! {0}'.format( error ) )
+                job.status = Job.FAILED
+            else:
+                job.status = Job.DONE
+
+            job.phase    = None
+            job.finished = time.time()
+
+
+    def _evict( self ):
+        """
+        Removes the oldest finished jobs and their files past the number kept
+        """
+        finished = [ job for job in self.jobs.values() if not ( job.finished == None ) ]
+
+        for job in finished[:max( 0, len( self.jobs ) - self.keep )]:
+            del self.jobs[job.id]
+            shutil.rmtree( job.directory, ignore_errors=True )
+
+            logging.info( 'Removed job {0}'.format( job.id ) )
@@ -0,0 +1,428 @@
+import csv
+import datetime
+import decimal
+import functools
+import io
+import logging
+import os
+import zipfile
+import openpyxl
+import openpyxl.utils as utils
+from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+from openpyxl.utils.exceptions import IllegalCharacterError
+from openpyxl.workbook.defined_name import DefinedName
+from xml.sax.saxutils import escape
+
+
+# Excel counts dates from 1899-12-30, reading 1900-02-29 which never was
+EXCEL_EPOCH = datetime.datetime( 1899, 12, 30 )
+SECONDS_PER_DAY = 24 * 60 * 60
+
+
+class Output( object ):
+    """
+    Base output backend, receives the Timecard_Header and Timecard_Detail rows,
+    each starting with its column headings
+    """
+
+    # Rows and bytes written by the last write
+    rows = 0
+    size = 0
+
+    def write( self, header, detail ):
+        """
+        write( [ [ 'EMPLOYEE', ... ], [ 'EMP01', ... ] ], [ ... ] )
+
+        :param header: iterable of lists
+        :param detail: iterable of lists
+        """
+        raise NotImplementedError( '{0} must implement write'.format( type( self ).__name__ ) )
+
+
+
+class XlsxOutput( Output ):
+
+    def __init__( self, file='GENERATED-TIMECARDS.xlsx' ):
+        self.file = file
+
+
+    def write( self, header, detail ):
+        """
+        Streams rows through a write-only workbook with a named range per sheet
+        """
+        wb = openpyxl.Workbook( write_only=True )
+        self.rows = 0
+
+        for title, rows in ( ( 'Timecard_Header', header ), ( 'Timecard_Detail', detail ) ):
+            sheet = wb.create_sheet( title )
+
+            count = 0
+            width = 0
+            for row in rows:
+                sheet.append( row )
+
+                count += 1
+                width  = max( width, len( row ) )
+
+            self._define_range( wb, title, 'A1:{0}{1}'.format( utils.get_column_letter( width ), count ) )
+            self.rows += count
+
+        wb.save( self.file )
+
+        if type( self.file ) == str:
+            self.size = os.path.getsize( self.file )
+
+        logging.info( 'Saved xlsx output' )
+
+
+    def _define_range( self, wb, title, cells ):
+        """
+        _define_range( wb, 'Timecard_Header', 'A1:E10' )
+
+        Names the range of a sheet after it, as the Sage import expects
+
+        :param wb: openpyxl.Workbook
+        :param title: str
+        :param cells: str
+        """
+        defined = DefinedName( name=title, attr_text='{0}!{1}'.format( utils.quote_sheetname( title ), cells ) )
+
+        # openpyxl 3.1 keeps defined names in a dict, earlier versions in a list
+        if hasattr( wb.defined_names, 'add' ):
+            wb.defined_names.add( defined )
+        else:
+            wb.defined_names.append( defined )
+
+
+
+class StreamingXlsxOutput( Output ):
+    """
+    Writes the SpreadsheetML parts of the import template straight into the zip archive,
+    row by row with inline strings, without building a workbook
+    """
+
+    # Sheet titles, in workbook order
+    TITLES = ( 'Timecard_Header', 'Timecard_Detail' )
+
+    # Rows encoded together before each write into the archive
+    CHUNK_SIZE = 1000
+
+
+    def __init__( self, file='GENERATED-TIMECARDS.xlsx' ):
+        self.file = file
+
+
+    def write( self, header, detail ):
+        """
+        Streams each sheet into its archive entry, then writes the workbook parts with its named ranges
+        """
+        self.rows = 0
+        ranges    = []
+
+        with zipfile.ZipFile( self.file, 'w', compression=zipfile.ZIP_DEFLATED ) as archive:
+            for index, rows in enumerate( ( header, detail ), 1 ):
+                count, width = self._write_sheet( archive, 'xl/worksheets/sheet{0}.xml'.format( index ), rows )
+
+                ranges.append( 'A1:{0}{1}'.format( utils.get_column_letter( max( width, 1 ) ), max( count, 1 ) ) )
+                self.rows += count
+
+            archive.writestr( '[Content_Types].xml', _CONTENT_TYPES )
+            archive.writestr( '_rels/.rels', _ROOT_RELATIONSHIPS )
+            archive.writestr( 'xl/_rels/workbook.xml.rels', _WORKBOOK_RELATIONSHIPS )
+            archive.writestr( 'xl/styles.xml', _STYLES )
+            archive.writestr( 'xl/workbook.xml', _WORKBOOK.format( names=''.join( [
+                '<definedName name="{0}">\'{0}\'!{1}</definedName>'.format( title, cells ) for title, cells in zip( self.TITLES, ranges )
+            ] ) ) )
+
+        if type( self.file ) == str:
+            self.size = os.path.getsize( self.file )
+
+        logging.info( 'Saved streamed xlsx output' )
+
+
+    def _write_sheet( self, archive, path, rows ):
+        """
+        Writes the rows of a sheet into an archive entry in chunks, the first row being its column headings
+
+        :param archive: zipfile.ZipFile
+        :param path: str
+        :param rows: iterable of lists
+        :return: tuple( int rows, int width )
+        """
+        count  = 0
+        width  = 0
+        buffer = []
+
+        with archive.open( path, 'w' ) as handle:
+            handle.write( _SHEET_START )
+
+            for count, row in enumerate( rows, 1 ):
+                width = max( width, len( row ) )
+
+                if count == 1:
+                    buffer.append( _heading_xml( tuple( row ) ) )
+                else:
+                    buffer.append( _row_xml( count, row ) )
+
+                if len( buffer ) >= self.CHUNK_SIZE:
+                    handle.write( ''.join( buffer ).encode( 'utf-8' ) )
+                    buffer = []
+
+            handle.write( ''.join( buffer ).encode( 'utf-8' ) )
+            handle.write( _SHEET_END )
+
+        return count, width
+
+
+
+class BytesOutput( XlsxOutput ):
+
+    def __init__( self ):
+        self.file = io.BytesIO()
+
+
+    def write( self, header, detail ):
+        """
+        Writes the xlsx output into an in-memory buffer instead of a file
+        """
+        super().write( header, detail )
+        self.file.seek( 0 )
+
+        self.size = len( self.file.getvalue() )
+
+
+    def getvalue( self ):
+        """
+        Returns the generated xlsx file contents
+
+        :return: bytes
+        """
+        return self.file.getvalue()
+
+
+
+class CsvOutput( Output ):
+
+    def __init__( self, file='GENERATED-TIMECARDS' ):
+        # Each sheet is written to its own file, suffixed by sheet title
+        self.file  = os.path.splitext( file )[0]
+        self.files = []
+
+
+    def write( self, header, detail ):
+        """
+        Writes each sheet to a separate csv file, with dates in ISO format
+        """
+        self.files = []
+        self.rows  = 0
+        self.size  = 0
+
+        for title, rows in ( ( 'Timecard_Header', header ), ( 'Timecard_Detail', detail ) ):
+            file = '{0}-{1}.csv'.format( self.file, title )
+
+            with open( file, 'w', newline='' ) as handle:
+                writer = csv.writer( handle )
+
+                for row in rows:
+                    writer.writerow( [ self._format( value ) for value in row ] )
+                    self.rows += 1
+
+            self.files.append( file )
+            self.size += os.path.getsize( file )
+
+        logging.info( 'Saved csv output' )
+
+
+    def _format( self, value ):
+        if isinstance( value, ( datetime.date, datetime.datetime ) ):
+            return value.isoformat()
+
+        return value
+
+
+
+#             #
+# SPREADSHEET #
+#             #
+_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet2.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '<Override PartName="/xl/styles.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+    '</Types>'
+)
+
+_ROOT_RELATIONSHIPS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+
+_WORKBOOK_RELATIONSHIPS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet1.xml"/>'
+    '<Relationship Id="rId2" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet2.xml"/>'
+    '<Relationship Id="rId3" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" Target="styles.xml"/>'
+    '</Relationships>'
+)
+
+_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets>'
+    '<sheet name="Timecard_Header" sheetId="1" r:id="rId1"/>'
+    '<sheet name="Timecard_Detail" sheetId="2" r:id="rId2"/>'
+    '</sheets>'
+    '<definedNames>{names}</definedNames>'
+    '</workbook>'
+)
+
+# Cell styles by index: general, date, date and time, time, elapsed time
+_STYLES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    '<numFmts count="3">'
+    '<numFmt numFmtId="164" formatCode="yyyy-mm-dd"/>'
+    '<numFmt numFmtId="165" formatCode="yyyy-mm-dd h:mm:ss"/>'
+    '<numFmt numFmtId="166" formatCode="[hh]:mm:ss"/>'
+    '</numFmts>'
+    '<fonts count="1"><font><sz val="11"/><name val="Calibri"/><family val="2"/></font></fonts>'
+    '<fills count="2"><fill><patternFill patternType="none"/></fill><fill><patternFill patternType="gray125"/></fill></fills>'
+    '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+    '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+    '<cellXfs count="5">'
+    '<xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+    '<xf numFmtId="164" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+    '<xf numFmtId="165" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+    '<xf numFmtId="21" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+    '<xf numFmtId="166" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+    '</cellXfs>'
+    '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+    '</styleSheet>'
+)
+
+_SHEET_START = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+).encode( 'utf-8' )
+
+_SHEET_END = '</sheetData></worksheet>'.encode( 'utf-8' )
+
+# Column letters by zero based index, A to ZZ, never changed so output threads may share it
+_LETTERS = tuple( [ utils.get_column_letter( column ) for column in range( 1, 703 ) ] )
+
+
+
+def _row_xml( number, row ):
+    """
+    _row_xml( 2, [ 'EMP01', 42882 ] ) -> '<row r="2"><c r="A2" t="inlineStr">...</c>...</row>'
+
+    :param number: int
+    :param row: list
+    :return: str
+    """
+    letters = _LETTERS
+
+    # Wider than any import template row
+    if len( row ) > len( letters ):
+        letters = [ utils.get_column_letter( column ) for column in range( 1, len( row ) + 1 ) ]
+
+    number = str( number )
+    cells  = []
+
+    for letter, value in zip( letters, row ):
+        # Skip Empty Cells
+        if value == None:
+            continue
+
+        writer = _CELL_WRITERS.get( type( value ), _text_cell )
+        cells.append( writer( letter + number, value ) )
+
+    return '<row r="{0}">{1}</row>'.format( number, ''.join( cells ) )
+
+
+@functools.lru_cache( maxsize=16 )
+def _heading_xml( row ):
+    # Column headings are the same on every run, encoded once
+    return _row_xml( 1, row )
+
+
+
+#              #
+# CELL WRITERS #
+#              #
+def _text_cell( reference, value ):
+    return '<c r="{0}" t="inlineStr">{1}</c>'.format( reference, _inline_string( str( value ) ) )
+
+
+@functools.lru_cache( maxsize=4096 )
+def _inline_string( value ):
+    # Ids and codes repeat on every shift line, escaped once
+    if ILLEGAL_CHARACTERS_RE.search( value ):
+        raise IllegalCharacterError( '{0} cannot be used in worksheets.'.format( value ) )
+
+    # Surrounding whitespace is kept only when marked as preserved
+    space = ' xml:space="preserve"' if value.strip() != value else ''
+
+    return '<is><t{0}>{1}</t></is>'.format( space, escape( value ) )
+
+
+def _number_cell( reference, value ):
+    return '<c r="{0}"><v>{1}</v></c>'.format( reference, value )
+
+
+def _bool_cell( reference, value ):
+    return '<c r="{0}" t="b"><v>{1:d}</v></c>'.format( reference, value )
+
+
+def _date_cell( reference, value ):
+    return _serial_cell( reference, 1, _serial_days( value ) )
+
+
+def _datetime_cell( reference, value ):
+    return _serial_cell( reference, 2, _serial_days( value.date() ) + _seconds( value ) / SECONDS_PER_DAY )
+
+
+def _time_cell( reference, value ):
+    return _serial_cell( reference, 3, _seconds( value ) / SECONDS_PER_DAY )
+
+
+def _timedelta_cell( reference, value ):
+    return _serial_cell( reference, 4, value.total_seconds() / SECONDS_PER_DAY )
+
+
+def _serial_cell( reference, style, serial ):
+    return '<c r="{0}" s="{1}"><v>{2}</v></c>'.format( reference, style, serial )
+
+
+def _serial_days( value ):
+    days = ( value - EXCEL_EPOCH.date() ).days
+
+    # Serials before 1900-03-01 skip the day Excel adds for 1900-02-29
+    if 0 < days <= 60:
+        days -= 1
+
+    return days
+
+
+def _seconds( value ):
+    return value.hour * 3600 + value.minute * 60 + value.second + value.microsecond / 10**6
+
+
+_CELL_WRITERS = {
+    str:                _text_cell,
+    int:                _number_cell,
+    float:              _number_cell,
+    decimal.Decimal:    _number_cell,
+    bool:               _bool_cell,
+    datetime.date:      _date_cell,
+    datetime.datetime:  _datetime_cell,
+    datetime.time:      _time_cell,
+    datetime.timedelta: _timedelta_cell
+}
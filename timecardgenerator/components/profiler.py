@@ -0,0 +1,76 @@
+import cProfile
+import io
+import logging
+import pstats
+
+
+class PhaseProfiler( object ):
+    """
+    Profiles each generation phase separately, saving one .pstats file per phase
+    and a summary of the slowest functions of every phase
+    """
+
+    def __init__( self, prefix, top=25 ):
+        self.prefix = prefix
+        self.top    = top
+        self.files  = []
+
+        # Running phase and its profile
+        self._phase   = None
+        self._profile = None
+
+
+    def start( self, phase ):
+        """
+        start( 'hours' )
+
+        Starts profiling a phase, saving the running phase
+
+        :param phase: str
+        """
+        self.stop()
+
+        self._phase   = phase
+        self._profile = cProfile.Profile()
+        self._profile.enable()
+
+
+    def stop( self ):
+        """
+        Stops profiling the running phase and saves its .pstats file
+        """
+        if self._profile == None:
+            return
+
+        self._profile.disable()
+
+        file = '{0}-{1}.pstats'.format( self.prefix, self._phase )
+        self._profile.dump_stats( file )
+        self.files.append( file )
+
+        self._phase   = None
+        self._profile = None
+
+
+    def save( self ):
+        """
+        Stops the running phase and writes the top functions of every phase by cumulative time
+
+        :return: str, the summary file
+        """
+        self.stop()
+
+        file = '{0}-summary.txt'.format( self.prefix )
+
+        with open( file, 'w' ) as handle:
+            for stats_file in self.files:
+                stream = io.StringIO()
+
+                stats = pstats.Stats( stats_file, stream=stream )
+                stats.sort_stats( 'cumulative' ).print_stats( self.top )
+
+                handle.write( '{0}\n{1}\n\n'.format( stats_file, stream.getvalue().strip() ) )
+
+        logging.info( 'Saved profile summary {0}'.format( file ) )
+
+        return file
@@ -0,0 +1,119 @@
+import collections
+import json
+import logging
+import time
+
+
+class RunReport( object ):
+    """
+    Collects the wall and CPU time of each generation phase, and run counters.
+    A disabled report ignores every call, so it costs nothing to leave in place.
+    """
+
+    def __init__( self, enabled=True ):
+        self.enabled  = enabled
+        self.phases   = collections.OrderedDict()
+        self.counters = collections.OrderedDict()
+
+        # Running phase and its start times
+        self._phase = None
+        self._wall  = 0
+        self._cpu   = 0
+
+
+
+    #        #
+    # PHASES #
+    #        #
+    def start( self, phase ):
+        """
+        start( 'hours' )
+
+        Starts timing a phase, stopping the running phase
+
+        :param phase: str
+        """
+        if not self.enabled:
+            return
+
+        self.stop()
+
+        self._phase = phase
+        self._wall  = time.perf_counter()
+        self._cpu   = time.process_time()
+
+
+    def stop( self ):
+        """
+        Stops timing the running phase, adding to its totals when run more than once
+        """
+        if not self.enabled or self._phase == None:
+            return
+
+        timing = self.phases.setdefault( self._phase, { 'wall': 0.0, 'cpu': 0.0 } )
+        timing['wall'] += time.perf_counter() - self._wall
+        timing['cpu']  += time.process_time() - self._cpu
+
+        self._phase = None
+
+
+
+    #          #
+    # COUNTERS #
+    #          #
+    def count( self, counter, amount=1 ):
+        """
+        count( 'employees', 24 )
+
+        :param counter: str
+        :param amount: int
+        """
+        if not self.enabled:
+            return
+
+        self.counters[counter] = self.counters.get( counter, 0 ) + amount
+
+
+
+    #        #
+    # OUTPUT #
+    #        #
+    def to_dict( self ):
+        """
+        :return: dict
+        """
+        return {
+            'phases': self.phases,
+            'counters': self.counters
+        }
+
+
+    def summary( self ):
+        """
+        Returns a readable summary of phase timings and counters
+
+        :return: str
+        """
+        lines = [ '{0}: {1:.3f}s wall, {2:.3f}s cpu'.format( phase, timing['wall'], timing['cpu'] ) for phase, timing in self.phases.items() ]
+        lines.extend( [ '{0}: {1}'.format( counter.replace( '_', ' ' ).capitalize(), value ) for counter, value in self.counters.items() ] )
+
+        return '\n'.join( lines )
+
+
+    def save( self, file ):
+        """
+        save( 'GENERATED-TIMECARDS-report.json' )
+
+        Writes the report as JSON, stopping the running phase
+
+        :param file: str
+        """
+        if not self.enabled:
+            return
+
+        self.stop()
+
+        with open( file, 'w' ) as handle:
+            json.dump( self.to_dict(), handle, indent=4 )
+
+        logging.info( 'Saved run report {0}'.format( file ) )
@@ -0,0 +1,158 @@
+import http.server
+import json
+import logging
+import os
+import shutil
+import urllib.parse
+
+from .jobs import Job, JobQueueFull
+
+
+class JobServer( http.server.ThreadingHTTPServer ):
+    """
+    Serves timecard generation jobs over HTTP, for intranet tools to upload
+    spreadsheets, poll their jobs and download the generated files
+
+        POST /jobs?payperiod=PP01      the spreadsheet as the request body
+        GET  /jobs                     every kept job
+        GET  /jobs/<id>                the status of a job
+        GET  /jobs/<id>/result         the generated import file
+        GET  /jobs/<id>/report         the run report
+    """
+
+    # Workbooks are zip archives
+    XLSX_SIGNATURE = b'PK\x03\x04'
+
+    XLSX_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+
+    def __init__( self, jobs, directory, host='127.0.0.1', port=8300, max_upload=50 * 1024 * 1024 ):
+        assert type( directory ) == str, 'directory must be a valid string path'
+
+        self.jobs       = jobs
+        self.directory  = directory
+        self.max_upload = max_upload
+
+        os.makedirs( directory, exist_ok=True )
+
+        super().__init__( ( host, port ), _JobHandler )
+
+        logging.info( 'JobServer listening on http://{0}:{1}'.format( *self.server_address[:2] ) )
+
+
+
+class _JobHandler( http.server.BaseHTTPRequestHandler ):
+
+    def do_GET( self ):
+        parts = self._path()
+
+        if parts == [ 'jobs' ]:
+            return self._send_json( 200, [ job.to_dict() for job in self.server.jobs.list() ] )
+
+        if not ( len( parts ) in ( 2, 3 ) ) or not ( parts[0] == 'jobs' ):
+            return self._send_error( 404, 'Not found' )
+
+        job = self.server.jobs.get( parts[1] )
+
+        if job == None:
+            return self._send_error( 404, 'Job {0} does not exist'.format( parts[1] ) )
+
+        if len( parts ) == 2:
+            return self._send_json( 200, job.to_dict() )
+
+        files = {
+            'result': ( job.output, JobServer.XLSX_TYPE ),
+            'report': ( job.report_file, 'application/json' )
+        }
+
+        if not parts[2] in files:
+            return self._send_error( 404, 'Not found' )
+
+        if not ( job.status == Job.DONE ):
+            return self._send_error( 409, 'Job {0} is {1}'.format( job.id, job.status ) )
+
+        self._send_file( *files[parts[2]] )
+
+
+    def do_POST( self ):
+        if not ( self._path() == [ 'jobs' ] ):
+            return self._send_error( 404, 'Not found' )
+
+        query     = urllib.parse.parse_qs( urllib.parse.urlsplit( self.path ).query )
+        payperiod = query.get( 'payperiod', [ '' ] )[0].strip()
+
+        if not payperiod:
+            return self._send_error( 400, 'A payperiod is required' )
+
+        length = self.headers.get( 'Content-Length' )
+
+        if length == None or not length.isdigit():
+            return self._send_error( 411, 'The spreadsheet must be sent with a Content-Length' )
+
+        length = int( length )
+
+        if length > self.server.max_upload:
+            return self._send_error( 413, 'Spreadsheets are limited to {0} bytes'.format( self.server.max_upload ) )
+
+        body = self.rfile.read( length )
+
+        if not body.startswith( JobServer.XLSX_SIGNATURE ):
+            return self._send_error( 400, 'The request body must be an .xlsx spreadsheet' )
+
+        job = Job( payperiod, self.server.directory )
+
+        with open( job.upload, 'wb' ) as handle:
+            handle.write( body )
+
+        try:
+            self.server.jobs.submit( job )
+        except JobQueueFull as error:
+            shutil.rmtree( job.directory, ignore_errors=True )
+            return self._send_error( 503, str( error ) )
+
+        self._send_json( 202, job.to_dict(), location='/jobs/{0}'.format( job.id ) )
+
+
+
+    #           #
+    # RESPONSES #
+    #           #
+    def _path( self ):
+        return [ part for part in urllib.parse.urlsplit( self.path ).path.split( '/' ) if part ]
+
+
+    def _send_json( self, status, value, location=None ):
+        body = json.dumps( value, indent=4 ).encode( 'utf-8' )
+
+        self.send_response( status )
+        self.send_header( 'Content-Type', 'application/json' )
+        self.send_header( 'Content-Length', str( len( body ) ) )
+
+        if not ( location == None ):
+            self.send_header( 'Location', location )
+
+        self.end_headers()
+        self.wfile.write( body )
+
+
+    def _send_error( self, status, message ):
+        self._send_json( status, { 'error': message } )
+
+
+    def _send_file( self, file, content_type ):
+        if not os.path.exists( file ):
+            return self._send_error( 404, 'File not found' )
+
+        self.send_response( 200 )
+        self.send_header( 'Content-Type', content_type )
+        self.send_header( 'Content-Length', str( os.path.getsize( file ) ) )
+        self.send_header( 'Content-Disposition', 'attachment; filename="{0}"'.format( os.path.basename( file ) ) )
+        self.end_headers()
+
+        with open( file, 'rb' ) as handle:
+            shutil.copyfileobj( handle, self.wfile )
+
+
+    def log_message( self, format, *args ):
+        # Requests are logged with the application, not written to stderr
+        logging.info( 'JobServer {0} {1}'.format( self.address_string(), format % args ) )
@@ -0,0 +1,65 @@
+import logging
+import os
+import pickle
+
+
+class IncrementalState( object ):
+    """
+    Stores the parsed state of previous runs by workbook, so reruns of the same
+    workbook only re-derive the employees which changed
+    """
+
+    def __init__( self, file ):
+        assert type( file ) == str, 'file must be a valid string path'
+
+        self.file = file
+
+        logging.info( 'IncrementalState opened at {0}'.format( file ) )
+
+
+    def load( self, key ):
+        """
+        load( '/sites/north.xlsx:Sheet1' )
+
+        Retrieves the state stored for a workbook, None when there is none or it is unreadable
+
+        :param key: str
+        :return: dict
+        """
+        states = self._read()
+
+        return states.get( key )
+
+
+    def save( self, key, state ):
+        """
+        save( '/sites/north.xlsx:Sheet1', { 'dates': ..., 'employees': ... } )
+
+        Stores the state of a workbook, replacing the previous one
+
+        :param key: str
+        :param state: dict
+        """
+        states      = self._read()
+        states[key] = state
+
+        # Written aside then swapped in, so an interrupted save keeps the last state
+        temporary = '{0}.tmp'.format( self.file )
+
+        with open( temporary, 'wb' ) as handle:
+            pickle.dump( states, handle, protocol=pickle.HIGHEST_PROTOCOL )
+
+        os.replace( temporary, self.file )
+
+
+    def _read( self ):
+        if not os.path.exists( self.file ):
+            return {}
+
+        try:
+            with open( self.file, 'rb' ) as handle:
+                return pickle.load( handle )
+
+        except ( OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError ) as error:
+            logging.warning( 'Ignoring unreadable incremental state {0}: {1}'.format( self.file, error ) )
+            return {}
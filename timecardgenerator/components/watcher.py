@@ -0,0 +1,129 @@
+import fnmatch
+import logging
+import os
+import time
+
+
+class FolderWatcher( object ):
+    """
+    Polls a directory for new or changed spreadsheets, reporting each one once it has
+    stopped changing so files still being saved are never picked up half written
+    """
+
+    def __init__( self, directory, pattern='*.xlsx', settle=2.0 ):
+        assert type( directory ) == str, 'directory must be a valid string path'
+
+        self.directory = directory
+        self.pattern   = pattern
+        self.settle    = settle
+
+        # Signatures of reported files, and of files waiting to settle with when they last changed
+        self._reported = {}
+        self._pending  = {}
+
+        os.makedirs( directory, exist_ok=True )
+
+        logging.info( 'FolderWatcher watching {0}'.format( directory ) )
+
+
+    def poll( self ):
+        """
+        poll() -> [ 'inbox/north.xlsx' ]
+
+        Returns the files new or changed since they were last reported, once unchanged for settle seconds
+
+        :return: list
+        """
+        now   = time.monotonic()
+        files = self._scan()
+        ready = []
+
+        for file, signature in sorted( files.items() ):
+            if self._reported.get( file ) == signature:
+                continue
+
+            pending = self._pending.get( file )
+
+            # Restarts settling whenever the file is still being written
+            if pending == None or not ( pending[0] == signature ):
+                self._pending[file] = ( signature, now )
+                continue
+
+            if now - pending[1] >= self.settle:
+                del self._pending[file]
+                self._reported[file] = signature
+                ready.append( file )
+
+        # Removed files are reported again should they reappear
+        for known in ( self._reported, self._pending ):
+            for file in [ file for file in known if not file in files ]:
+                del known[file]
+
+        return ready
+
+
+    def waiting( self ):
+        """
+        Returns if any files are still settling
+
+        :return: bool
+        """
+        return len( self._pending ) > 0
+
+
+    def forget( self, file ):
+        """
+        forget( 'inbox/north.xlsx' )
+
+        Forgets a reported file, so it is reported again once settled
+
+        :param file: str
+        """
+        self._reported.pop( file, None )
+        self._pending.pop( file, None )
+
+
+    def signature( self, file ):
+        """
+        signature( 'inbox/north.xlsx' ) -> ( 10240, 1508112000000000000 )
+
+        Returns the size and modification time of a file, None once it is removed
+
+        :param file: str
+        :return: tuple
+        """
+        try:
+            status = os.stat( file )
+        except FileNotFoundError:
+            return
+
+        return ( status.st_size, status.st_mtime_ns )
+
+
+
+    #       #
+    # FILES #
+    #       #
+    def _scan( self ):
+        files = {}
+
+        with os.scandir( self.directory ) as entries:
+            for entry in entries:
+                # Excel lock files sit next to open spreadsheets
+                if entry.name.startswith( '~$' ) or not fnmatch.fnmatch( entry.name.lower(), self.pattern ):
+                    continue
+
+                try:
+                    if not entry.is_file():
+                        continue
+
+                    status = entry.stat()
+
+                # Moved away between listing and reading it
+                except FileNotFoundError:
+                    continue
+
+                files[entry.path] = ( status.st_size, status.st_mtime_ns )
+
+        return files
+
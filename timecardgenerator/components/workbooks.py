@@ -0,0 +1,143 @@
+import hashlib
+import logging
+import os
+import pickle
+import tempfile
+import zlib
+
+
+class WorkbookCache( object ):
+    """
+    Stores parsed workbooks as compressed files keyed by content hash, evicting the
+    least recently used files once the cache grows past its size limit
+    """
+
+    # Parsed workbook files, named by key
+    EXTENSION = '.parsed'
+
+
+    def __init__( self, directory, max_size=256 * 1024 * 1024 ):
+        assert type( directory ) == str, 'directory must be a valid string path'
+
+        self.directory = directory
+        self.max_size  = max_size
+
+        os.makedirs( directory, exist_ok=True )
+
+        logging.info( 'WorkbookCache opened at {0}'.format( directory ) )
+
+
+    def key( self, file, *parts ):
+        """
+        key( 'hours.xlsx', 'Sheet1', 1 ) -> '3f0a...'
+
+        Returns the key of a workbook by its content, and anything else the parsed result depends on
+
+        :param file: str
+        :param parts: any
+        :return: str
+        """
+        digest = hashlib.sha256()
+
+        with open( file, 'rb' ) as handle:
+            for chunk in iter( lambda: handle.read( 1024 * 1024 ), b'' ):
+                digest.update( chunk )
+
+        digest.update( repr( parts ).encode( 'utf-8' ) )
+
+        return digest.hexdigest()
+
+
+
+    #         #
+    # ENTRIES #
+    #         #
+    def get( self, key ):
+        """
+        get( '3f0a...' )
+
+        Retrieves a parsed workbook, None when it is not cached or unreadable
+
+        :param key: str
+        :return: any
+        """
+        file = self._file( key )
+
+        try:
+            with open( file, 'rb' ) as handle:
+                value = pickle.loads( zlib.decompress( handle.read() ) )
+
+        except FileNotFoundError:
+            return
+
+        except ( OSError, zlib.error, pickle.UnpicklingError, EOFError, AttributeError, ImportError ) as error:
+            logging.warning( 'Ignoring unreadable parsed workbook {0}: {1}'.format( file, error ) )
+            return
+
+        # The modification time orders entries by last use
+        try:
+            os.utime( file )
+        except OSError:
+            pass
+
+        logging.info( 'Found parsed workbook {0} in cache'.format( key ) )
+
+        return value
+
+
+    def put( self, key, value ):
+        """
+        put( '3f0a...', { 'sheet_data': ... } )
+
+        Stores a parsed workbook, then evicts the least recently used entries past the size limit
+
+        :param key: str
+        :param value: any
+        """
+        data = zlib.compress( pickle.dumps( value, protocol=pickle.HIGHEST_PROTOCOL ) )
+
+        # Written aside then swapped in, so concurrent readers never see partial files
+        handle, temporary = tempfile.mkstemp( dir=self.directory )
+
+        with os.fdopen( handle, 'wb' ) as file:
+            file.write( data )
+
+        os.replace( temporary, self._file( key ) )
+
+        self._evict()
+
+
+    def _file( self, key ):
+        return os.path.join( self.directory, '{0}{1}'.format( key, self.EXTENSION ) )
+
+
+    def _evict( self ):
+        """
+        Removes the least recently used entries until the cache fits its size limit
+        """
+        entries = []
+
+        for name in os.listdir( self.directory ):
+            if not name.endswith( self.EXTENSION ):
+                continue
+
+            try:
+                status = os.stat( os.path.join( self.directory, name ) )
+            except FileNotFoundError:
+                continue
+
+            entries.append( ( status.st_mtime, status.st_size, name ) )
+
+        size = sum( [ entry[1] for entry in entries ] )
+
+        for _, entry_size, name in sorted( entries ):
+            if size <= self.max_size:
+                break
+
+            try:
+                os.remove( os.path.join( self.directory, name ) )
+            except FileNotFoundError:
+                pass
+
+            size -= entry_size
+            logging.info( 'Evicted parsed workbook {0}'.format( name ) )
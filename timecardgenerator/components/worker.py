@@ -0,0 +1,91 @@
+import logging
+import queue
+import threading
+
+
+class WorkerCancelled( Exception ):
+    """Raised inside a worker task once cancellation has been requested"""
+
+
+
+class Worker( object ):
+
+    def __init__( self, task ):
+        assert callable( task ), 'Task must be a callable'
+
+        self._task   = task
+        self._queue  = queue.Queue()
+        self._cancel = threading.Event()
+        self._thread = threading.Thread( target=self._run, daemon=True )
+
+        logging.info( 'Worker instantiated' )
+
+
+    def start( self ):
+        """
+        Runs the task on a background thread
+        """
+        self._thread.start()
+
+
+    def cancel( self ):
+        """
+        Requests the task stop at its next progress report
+        """
+        logging.info( 'Worker cancel requested' )
+        self._cancel.set()
+
+
+    def is_alive( self ):
+        """
+        Return if the task is still running
+
+        :return: bool
+        """
+        return self._thread.is_alive()
+
+
+
+    #          #
+    # MESSAGES #
+    #          #
+    def report( self, phase ):
+        """
+        report( 'hours' )
+
+        Called from the task to publish progress, raises WorkerCancelled when cancelled
+
+        :param phase: str
+        """
+        if self._cancel.is_set():
+            raise WorkerCancelled()
+
+        self._queue.put( ( 'progress', phase ) )
+
+
+    def messages( self ):
+        """
+        for kind, value in worker.messages(): ...
+
+        Drains queued ( kind, value ) messages without blocking, where kind is one of
+        'progress', 'done', 'cancelled' or 'error'
+
+        :return: generator
+        """
+        while True:
+            try:
+                yield self._queue.get_nowait()
+            except queue.Empty:
+                return
+
+
+    def _run( self ):
+        try:
+            result = self._task( self )
+        except WorkerCancelled:
+            self._queue.put( ( 'cancelled', None ) )
+        except Exception as error:
+            logging.exception( 'Worker task failed' )
+            self._queue.put( ( 'error', error ) )
+        else:
+            self._queue.put( ( 'done', result ) )
@@ -1,33 +1,110 @@
 import os
 import logging
+import collections
+import concurrent.futures
+import concurrent.futures.process
+import contextlib
 import configparser
 import tkinter
 import pyodbc
-import openpyxl.utils
 import arrow
+import bisect
 import datetime
+import hashlib
+import threading
+from tkinter import ttk
 
 # Utilities
-from timecardgenerator import components, models, helpers, tuples
+from timecardgenerator import components, models, classifier, helpers, tuples
+
+
+
+def parse_workbook( file, payperiod, sheet=None, engine='openpyxl' ):
+    """
+    parse_workbook( 'site-a.xlsx', 'PP01' )
+
+    Parses the employees and hours of a single worksheet, for use in worker processes
+
+    :param file: str
+    :param payperiod: str
+    :param sheet: str, defaults to the first worksheet
+    :param engine: str, the spreadsheet reader engine
+    :return: tuple( dict, list ) of employees and errors
+    """
+    app = TimecardGenerator()
+    app.payperiod   = payperiod
+    app.spreadsheet = models.Spreadsheet( file, sheet=sheet, engine=engine )
+
+    try:
+        app.parse_spreadsheet()
+    finally:
+        app.close_spreadsheet()
+
+    return app.employees, app.errors
 
 
 
 # Application Instance
 class TimecardGenerator( object ):
 
-    gui = components.GUI(
-        title   = 'Sage 300 Timecard Generator',
-        geometry= tuples.Geometry( width=320, height=256 ),
-        grid    = tuples.Grid( rows=2, columns=1 )
-    )
+    # Stays well below the SQL Server limit of 2100 parameters per query
+    QUERY_CHUNK_SIZE = 500
+
+    # Bumped whenever read_spreadsheet or the classifier change what they produce,
+    # invalidating parsed workbooks cached by older versions
+    PARSER_VERSION = 2
+
+    # Employee data columns filled from the database, in query order
+    DATABASE_COLUMNS = ( 'Y', 'E', 'F', 'BB', 'T', 'V' )
+
+    # Generation phases, in order, reported to the progress bar
+    PHASES = ( 'dates', 'employees', 'hours', 'database', 'write' )
 
 
     def __init__( self ):
         # Public Properties
         self.config      = None
+        self.db          = None
+        self.gui         = None
         self.spreadsheet = None
+        self.sheet_data  = None
+        self.payperiod   = ''
+        self.output      = 'GENERATED-TIMECARDS.xlsx'
         self.dates       = []
         self.employees   = {}
+        self.errors      = []
+        self.cache       = None
+        self.workbooks   = None
+        self.worker      = None
+        self.report      = components.RunReport( enabled=False )
+        self.profile     = False
+        self.profiler    = None
+        self.state       = None
+
+        # Database queries made by this instance, the connection pool may be shared
+        self.round_trips = 0
+
+        # Spreadsheet Indexes
+        self.id_column     = None
+        self.dates_index   = {}
+        self.employee_rows = {}
+        self.undated_rows  = set()
+
+        # Incremental Runs
+        self.fingerprints = {}
+        self.restored     = set()
+        self.saved_state  = None
+        self.stamp        = None
+
+        # Watch Folder, set to stop the daemon
+        self.watch_stop = threading.Event()
+
+        # Job Service, shut down to stop serving
+        self.server = None
+
+        # Job Service worker processes, restarted under the lock when one dies
+        self.parse_pool = None
+        self.parse_lock = threading.Lock()
 
 
     # __main__ #
@@ -37,6 +114,579 @@ class TimecardGenerator( object ):
         """
 
         # Read Configuration
+        self.load_config()
+
+        # Configure GUI
+        self.gui = components.GUI(
+            title   = 'Sage 300 Timecard Generator',
+            geometry= tuples.Geometry( width=320, height=256 ),
+            grid    = tuples.Grid( rows=2, columns=1 )
+        )
+        self._create_gui()
+
+        # Configure Database, connects on first query
+        self._db_configure()
+
+        logging.info( 'Sage 300 Timecard Generator initialized' )
+
+        # Initialize Tkinter Mainloop
+        self.gui.mainloop()
+
+
+    def run_headless( self, file, payperiod, output=None, sheets=None, profile=False ):
+        """
+        run_headless( 'hours.xlsx', 'PP01', 'PP01-TIMECARDS.xlsx' )
+
+        Application Entry Point for batch use, never creates the GUI.
+        Errors are collected on the instance instead of being shown.
+        Only the first worksheet is read unless sheets are given.
+
+        :param file: str
+        :param payperiod: str
+        :param output: str
+        :param sheets: list of worksheet titles, or 'all'
+        :param profile: bool, saves a profile of each phase next to the output
+        :return: bool
+        """
+        # Many worksheets are parsed in parallel
+        if not ( sheets == None ):
+            return self.run_batch( files=[ file ], payperiod=payperiod, output=output, sheets=sheets, profile=profile )
+
+        self.errors    = []
+        self.payperiod = payperiod
+        self.profile   = profile
+
+        if not ( output == None ):
+            self.output = output
+
+        # Read Configuration
+        self.load_config()
+
+        # Configure Database, connects on first query
+        self._db_configure()
+
+        logging.info( 'Opening spreadsheet file {0}'.format( file ) )
+
+        self.spreadsheet = models.Spreadsheet( file, engine=self._reader_engine() )
+
+        return self.generate()
+
+
+    def run_batch( self, files, payperiod, output=None, per_site=False, workers=None, sheets=None, profile=False ):
+        """
+        run_batch( [ 'site-a.xlsx', 'site-b.xlsx' ], 'PP01', 'PP01-TIMECARDS.xlsx' )
+
+        Parses many workbooks, or worksheets of workbooks, in parallel worker processes, then
+        queries the database once for all employees and writes a combined output, or one output
+        per site
+
+        :param files: list
+        :param payperiod: str
+        :param output: str
+        :param per_site: bool
+        :param workers: int, defaults to the number of processors
+        :param sheets: list of worksheet titles, or 'all', defaults to the first worksheet
+        :param profile: bool, saves a profile of each phase next to the output
+        :return: bool
+        """
+        self.errors    = []
+        self.payperiod = payperiod
+        self.profile   = profile
+
+        if not ( output == None ):
+            self.output = output
+
+        # Read Configuration
+        self.load_config()
+
+        # Configure Database, connects on first query
+        self._db_configure()
+
+        self.report = self._create_report()
+
+        with self._profiling():
+            # Parse each worksheet in its own process
+            self._phase( 'dates' )
+            sources = self._list_sources( files, sheets )
+            sites   = collections.OrderedDict()
+            engine  = self._reader_engine()
+
+            with concurrent.futures.ProcessPoolExecutor( max_workers=workers ) as pool:
+                futures = [ ( source, pool.submit( parse_workbook, source.file, payperiod, source.sheet, engine ) ) for source in sources ]
+
+                for source, future in futures:
+                    site = self._site_name( source )
+
+                    try:
+                        employees, errors = future.result()
+                    except Exception as error:
+                        self.show_error( title='Parse Error!', message='{0}: {1}'.format( site, error ) )
+                        continue
+
+                    for error in errors:
+                        self.errors.append( '{0}: {1}'.format( site, error ) )
+
+                    sites[source] = employees
+                    self.report.count( 'employees', len( employees ) )
+
+            # Retrieve Employee Database data for every site at once
+            logging.info( 'Retrieving Employee database data...' )
+            self._phase( 'database' )
+            round_trips = self.round_trips
+            self.query_employee_data( [ employee for employees in sites.values() for employee in employees.values() ] )
+            self.report.count( 'database_round_trips', self.round_trips - round_trips )
+
+            # Generate Timesheets
+            self._phase( 'write' )
+
+            if per_site:
+                for source, employees in sites.items():
+                    output = self._create_output( self._site_output( source ) )
+                    models.write_timecards( employees=employees, output=output )
+                    self._count_output( output )
+            else:
+                self.employees = self._merge_employees( sites.values() )
+                output         = self._create_output()
+                models.write_timecards( employees=self.employees, output=output )
+                self._count_output( output )
+
+        self.report.save( self._report_file() )
+
+        return len( sites ) == len( sources )
+
+
+    def _list_sources( self, files, sheets=None ):
+        """
+        Lists the worksheets to parse in each workbook, once each even when given more than once
+
+        :param files: list
+        :param sheets: list of worksheet titles, or 'all', defaults to the first worksheet
+        :return: list of tuples.Source
+        """
+        sources = []
+        listed  = set()
+
+        for file in files:
+
+            titles = [ None ]
+            if sheets == 'all':
+                titles = models.sheet_titles( file )
+            elif not ( sheets == None ):
+                titles = sheets
+
+            for title in titles:
+                # The same workbook may be matched by several paths or globs
+                key = ( os.path.normcase( os.path.abspath( file ) ), title )
+
+                if key in listed:
+                    continue
+
+                listed.add( key )
+                sources.append( tuples.Source( file=file, sheet=title ) )
+
+        return sources
+
+
+    def _site_name( self, source ):
+        """
+        _site_name( Source( file='sites/north.xlsx', sheet='Kitchen' ) ) -> 'north.xlsx [Kitchen]'
+
+        :param source: tuples.Source
+        :return: str
+        """
+        if source.sheet == None:
+            return os.path.basename( source.file )
+
+        return '{0} [{1}]'.format( os.path.basename( source.file ), source.sheet )
+
+
+    def _merge_employees( self, sites ):
+        """
+        Merges employees of many sites, appending the hours of employees found at more than one,
+        ids being matched as the database compares them
+
+        :param sites: iterable of dict
+        :return: dict
+        """
+        merged = collections.OrderedDict()
+        ids    = {}
+
+        for employees in sites:
+            for id, employee in employees.items():
+                key = self._employee_key( id )
+
+                # Keyed by the id first seen
+                if not key in ids:
+                    ids[key]   = id
+                    merged[id] = employee
+                    continue
+
+                for date, minutes in employee.get_shifts():
+                    merged[ids[key]].add_hours( date.toordinal(), minutes )
+
+        return merged
+
+
+    def _site_output( self, source ):
+        """
+        _site_output( Source( file='sites/north.xlsx', sheet=None ) ) -> 'GENERATED-TIMECARDS-north.xlsx'
+
+        Returns the output file of a single site in batch runs, suffixed by worksheet when given
+
+        :param source: tuples.Source
+        :return: str
+        """
+        base, extension = os.path.splitext( self.output )
+        site            = os.path.splitext( os.path.basename( source.file ) )[0]
+
+        if not ( source.sheet == None ):
+            site = '{0}-{1}'.format( site, source.sheet )
+
+        return '{0}-{1}{2}'.format( base, site, extension )
+
+
+
+    #              #
+    # WATCH FOLDER #
+    #              #
+    def run_watch( self, inbox, payperiod, outbox=None, failed=None, workers=None, interval=2.0, settle=2.0, once=False ):
+        """
+        run_watch( 'timesheets', 'PP01' )
+
+        Application Entry Point for the watch folder daemon. Spreadsheets saved to the inbox are
+        parsed by a bounded pool of worker processes, which stays warm between files along with
+        the database connection pool. Generated timecards and their spreadsheets are moved to the
+        outbox, spreadsheets which fail to the failed folder next to a file of their errors.
+
+        :param inbox: str
+        :param payperiod: str
+        :param outbox: str, defaults to an outbox folder in the inbox
+        :param failed: str, defaults to a failed folder in the inbox
+        :param workers: int, defaults to the number of processors
+        :param interval: float, seconds between inbox polls
+        :param settle: float, seconds a spreadsheet must stay unchanged before it is processed
+        :param once: bool, returns once the inbox is empty instead of watching until stopped
+        :return: bool, if every spreadsheet was generated
+        """
+        self.payperiod = payperiod
+        outbox         = outbox or os.path.join( inbox, 'outbox' )
+        failed         = failed or os.path.join( inbox, 'failed' )
+        workers        = workers or os.cpu_count() or 1
+
+        for directory in ( outbox, failed ):
+            os.makedirs( directory, exist_ok=True )
+
+        # Read Configuration
+        self.load_config()
+
+        # Configure Database, connects on first query and stays connected between files
+        self._db_configure()
+
+        watcher = components.FolderWatcher( inbox, settle=settle )
+        engine  = self._reader_engine()
+        queue   = collections.deque()
+        running = {}
+        success = True
+
+        # Spreadsheets in flight when a worker process died, parsed again alone to find the one which killed it
+        suspects = set()
+
+        self.watch_stop.clear()
+
+        logging.info( 'Watching {0} for spreadsheets with {1} workers'.format( inbox, workers ) )
+
+        pool = concurrent.futures.ProcessPoolExecutor( max_workers=workers )
+
+        try:
+            while not self.watch_stop.is_set():
+                # Spreadsheets saved again while running are checked once finished
+                for file in watcher.poll():
+                    if not ( file in queue ) and not ( file in [ source for source, _, _ in running.values() ] ):
+                        queue.append( file )
+
+                # Never more spreadsheets in flight than workers, nor any beside a suspect
+                while queue and len( running ) < workers:
+                    if ( queue[0] in suspects and running ) or any( [ source in suspects for source, _, _ in running.values() ] ):
+                        break
+
+                    file   = queue.popleft()
+                    future = pool.submit( parse_workbook, file, payperiod, None, engine )
+
+                    running[future] = ( file, watcher.signature( file ), pool )
+
+                if once and not ( queue or running or watcher.waiting() ):
+                    break
+
+                if not running:
+                    self.watch_stop.wait( interval )
+                    continue
+
+                done, _ = concurrent.futures.wait( list( running ), timeout=interval, return_when=concurrent.futures.FIRST_COMPLETED )
+
+                for future in done:
+                    file, signature, parsed_by = running.pop( future )
+
+                    # Saved again while parsing, processed again once it settles
+                    if not ( watcher.signature( file ) == signature ):
+                        logging.info( 'Spreadsheet {0} changed while processing, queued again'.format( file ) )
+                        watcher.forget( file )
+                        continue
+
+                    # A dead worker process breaks the pool and fails every spreadsheet in flight
+                    if isinstance( future.exception(), concurrent.futures.process.BrokenProcessPool ):
+                        if parsed_by is pool:
+                            logging.error( 'Worker process died, restarting the worker pool' )
+                            pool.shutdown( wait=False )
+                            pool = concurrent.futures.ProcessPoolExecutor( max_workers=workers )
+
+                        # Killed its worker while parsed alone, failed
+                        if not ( file in suspects ):
+                            logging.info( 'Spreadsheet {0} queued again after its worker process died'.format( file ) )
+                            suspects.add( file )
+                            queue.append( file )
+                            continue
+
+                    suspects.discard( file )
+
+                    try:
+                        success = self._finish_watched( file, future, outbox, failed ) and success
+
+                    # Locked by another program or on a share which went away, left in the inbox
+                    except OSError as error:
+                        logging.error( 'Could not move spreadsheet {0} out of the inbox: {1}'.format( file, error ) )
+                        success = False
+
+                        # Retried once it settles again, or on the next run
+                        if not once:
+                            watcher.forget( file )
+
+        finally:
+            pool.shutdown()
+
+        logging.info( 'Stopped watching {0}'.format( inbox ) )
+
+        return success
+
+
+    def stop_watch( self ):
+        """
+        Stops the watch folder daemon once its running spreadsheets are finished
+        """
+        self.watch_stop.set()
+
+
+    def _finish_watched( self, file, future, outbox, failed ):
+        """
+        Queries the database for a parsed spreadsheet and writes its timecards to the outbox,
+        moving the spreadsheet to the outbox, or to the failed folder when it could not be generated.
+        Raises OSError when the spreadsheet cannot be moved, leaving it in the inbox.
+
+        :param file: str
+        :param future: concurrent.futures.Future of parse_workbook
+        :param outbox: str
+        :param failed: str
+        :return: bool
+        """
+        name        = os.path.splitext( os.path.basename( file ) )[0]
+        self.errors = []
+        self.output = self._unique_file( outbox, '{0}-TIMECARDS.xlsx'.format( name ) )
+
+        try:
+            self.report = self._create_report()
+            self._write_parsed( *future.result() )
+
+        except Exception as error:
+            logging.exception( 'Failed to generate timecards for {0}'.format( file ) )
+
+            self.errors.append( 'Generate Error! {0}'.format( error ) )
+            self._move_watched( file, failed, self.errors )
+            return False
+
+        self._move_watched( file, outbox, self.errors )
+        logging.info( 'Generated {0} from {1}'.format( self.output, file ) )
+
+        return True
+
+
+    def _write_parsed( self, employees, errors ):
+        """
+        Queries the database for employees parsed in a worker process and writes their
+        timecards to the output, saving the run report next to it
+
+        :param employees: dict of parsed employees
+        :param errors: list of parse errors
+        """
+        self.errors.extend( errors )
+        self.report.count( 'employees', len( employees ) )
+
+        # Retrieve Employee Database data
+        self._phase( 'database' )
+        round_trips = self.round_trips
+        self.query_employee_data( list( employees.values() ) )
+        self.report.count( 'database_round_trips', self.round_trips - round_trips )
+
+        # Generate Timesheet
+        self._phase( 'write' )
+        output = self._create_output()
+        models.write_timecards( employees=employees, output=output )
+        self._count_output( output )
+
+        self.report.save( self._report_file() )
+
+
+    def _move_watched( self, file, directory, errors ):
+        """
+        Moves a processed spreadsheet out of the inbox, writing its errors next to it
+
+        :param file: str
+        :param directory: str
+        :param errors: list
+        """
+        destination = self._unique_file( directory, os.path.basename( file ) )
+        os.replace( file, destination )
+
+        if errors:
+            with open( '{0}-errors.txt'.format( os.path.splitext( destination )[0] ), 'w' ) as handle:
+                handle.write( '\n'.join( errors ) + '\n' )
+
+
+    def _unique_file( self, directory, name ):
+        """
+        _unique_file( 'outbox', 'north.xlsx' ) -> 'outbox/north-2.xlsx'
+
+        Returns a path in a directory which does not exist yet, numbering the name when taken
+
+        :param directory: str
+        :param name: str
+        :return: str
+        """
+        base, extension = os.path.splitext( name )
+        file            = os.path.join( directory, name )
+        count           = 1
+
+        while os.path.exists( file ):
+            count += 1
+            file   = os.path.join( directory, '{0}-{1}{2}'.format( base, count, extension ) )
+
+        return file
+
+
+    #             #
+    # JOB SERVICE #
+    #             #
+    def run_service( self, host='127.0.0.1', port=8300, workers=None, max_queued=16, directory='jobs' ):
+        """
+        run_service( port=8300 )
+
+        Application Entry Point for the HTTP job service. Spreadsheets uploaded with a payperiod are
+        queued as jobs and parsed by a bounded pool of worker processes, which stays warm between
+        jobs along with the database connection pool. Each job is polled for its status, then its
+        generated timecards and run report are downloaded. Serves until stopped.
+
+        :param host: str, localhost unless the service is shared on the network
+        :param port: int
+        :param workers: int, jobs generated at once, defaults to the number of processors
+        :param max_queued: int, jobs waiting before uploads are refused
+        :param directory: str, where each job keeps its files
+        """
+        workers = workers or os.cpu_count() or 1
+
+        # Read Configuration
+        self.load_config()
+
+        # Configure Database, connects on first query and stays connected between jobs
+        self._db_configure()
+
+        engine = self._reader_engine()
+
+        self.parse_pool = concurrent.futures.ProcessPoolExecutor( max_workers=workers )
+
+        try:
+            jobs = components.JobQueue( lambda job: self._run_job( engine, workers, job ), workers=workers, max_queued=max_queued )
+
+            try:
+                self.server = components.JobServer( jobs, directory, host=host, port=port )
+
+                try:
+                    self.server.serve_forever()
+                finally:
+                    self.server.server_close()
+            finally:
+                jobs.stop()
+        finally:
+            self.parse_pool.shutdown()
+
+        logging.info( 'Stopped the job service' )
+
+
+    def stop_service( self ):
+        """
+        Stops the HTTP job service once its running jobs are finished, from another thread
+        """
+        if not ( self.server == None ):
+            self.server.shutdown()
+
+
+    def _run_job( self, engine, workers, job ):
+        """
+        Generates the timecards of a job, parsing its spreadsheet in the worker pool. Jobs run at
+        once, so each is generated by its own instance sharing the configuration and database.
+
+        :param engine: str, the spreadsheet reader engine
+        :param workers: int, worker processes of the pool
+        :param job: components.Job
+        """
+        app = TimecardGenerator()
+        app.config    = self.config
+        app.db        = self.db
+        app.payperiod = job.payperiod
+        app.output    = job.output
+        app.worker    = job
+
+        # Every job serves its run report
+        app.report = components.RunReport( enabled=True )
+
+        try:
+            app._phase( 'dates' )
+            pool = self.parse_pool
+
+            try:
+                parsed = pool.submit( parse_workbook, job.upload, job.payperiod, None, engine ).result()
+
+            # Fails the jobs in flight, later jobs are parsed by a new pool
+            except concurrent.futures.process.BrokenProcessPool:
+                self._restart_parse_pool( pool, workers )
+                raise
+
+            app._write_parsed( *parsed )
+        finally:
+            job.errors.extend( app.errors )
+
+            if not ( app.cache == None ):
+                app.cache.close()
+
+
+    def _restart_parse_pool( self, broken, workers ):
+        """
+        Replaces the job service worker pool after a worker process died, once however many jobs failed with it
+
+        :param broken: concurrent.futures.ProcessPoolExecutor
+        :param workers: int
+        """
+        with self.parse_lock:
+            if not ( self.parse_pool is broken ):
+                return
+
+            logging.error( 'Worker process died, restarting the worker pool' )
+
+            broken.shutdown( wait=False )
+            self.parse_pool = concurrent.futures.ProcessPoolExecutor( max_workers=workers )
+
+
+    def load_config( self ):
+        """
+        Reads the user-settings.ini configuration file
+        """
         self.config = configparser.ConfigParser()
 
         config_file = helpers.resource_path( 'user-settings.ini' )
@@ -44,66 +694,368 @@ class TimecardGenerator( object ):
 
         logging.info( 'Opened configuration file {0}'.format( config_file ) )
 
-        # Configure GUI
-        self._create_gui()
 
-        # Connect to Database
-        self._db_connect()
 
-        logging.info( 'Sage 300 Timecard Generator initialized' )
+    def generate( self, output=None ):
+        """
+        Generate the importable spreadsheet template
 
-        # Initialize Tkinter Mainloop
-        self.gui.mainloop()
+        :param output: components.Output, defaults to one chosen by the output file extension
+        :return: bool
+        """
+
+        # Ensure Spreadsheet is set
+        if self.spreadsheet == None:
+            self.show_error(
+                title='Run Error!',
+                message='No spreadsheet set before running application!\nUse file->Open Spreadsheet'
+            )
+            return False
+
+        self.report = self._create_report()
+
+        # Each phase is profiled separately when enabled
+        with self._profiling():
+            # Retrieve Spreadsheet Data
+            self.parse_spreadsheet()
+
+
+            # Retrieve Employee Database data
+            logging.info( 'Retrieving Employee database data...' )
+            self._phase( 'database' )
+            round_trips = self.round_trips
+            self.query_employee_data( self._restore_employee_data() )
+            self.report.count( 'database_round_trips', self.round_trips - round_trips )
+
+
+            # Generate Timesheet
+            logging.info( 'Generating Timecard \'{0}\''.format( self.get_payperiod() ) )
+            self._phase( 'write' )
+            output = output or self._create_output()
+            models.write_timecards( employees=self.employees, output=output )
+            self._count_output( output )
+
+            self._save_state()
+
+        self.report.save( self._report_file() )
+
+        # Complete
+        self.show_alert(
+            title='Done!',
+            message=self._done_message()
+        )
+
+        return True
+
+
+    def parse_spreadsheet( self ):
+        """
+        Retrieves dates, employees and employee hours from the spreadsheet,
+        keeping only employees with hours this pay-period
+        """
+        # Dates, Employees, Employee Hours etc...
+        logging.info( 'Retrieving spreadsheet data...' )
+        self._phase( 'dates' )
+        self.read_spreadsheet()
+        self.get_dates()
+
+        self._phase( 'employees' )
+        self.get_employees()
+        self._restore_employees()
+
+        self._phase( 'hours' )
+        self.get_hours()
+
+
+        # Remove employees without hours
+        logging.info( 'Ignoring employees without hours this pay-period...' )
+        no_hours = []
+        for id, employee in self.employees.items():
+            if ( employee.get_shift_count() == 0 ):
+                no_hours.append( id )
+
+        # Formatting is skipped unless the message would be logged
+        verbose = logging.getLogger().isEnabledFor( logging.INFO )
+
+        for id in no_hours:
+            if verbose:
+                logging.info( 'Removing employee with id \'{0}\' without hours'.format( id ) )
+
+            del self.employees[id]
+
+        self.report.count( 'cells_scanned', self.spreadsheet.cells_scanned )
+        self.report.count( 'cells_skipped_empty', self.spreadsheet.cells_empty )
+        self.report.count( 'time_cells_classified', len( self.sheet_data.hours ) )
+        self.report.count( 'employees', len( self.employees ) )
+        self.report.count( 'employees_reused', len( self.restored ) )
+
+
+    def _create_output( self, file=None ):
+        """
+        Creates the output backend for the output file, csv files when it ends in .csv,
+        streamed xlsx files when the WRITER section selects the native engine
+
+        :param file: str, defaults to the instance output
+        :return: components.Output
+        """
+        file = file or self.output
+
+        if file.lower().endswith( '.csv' ):
+            return components.CsvOutput( file )
+
+        # Import templates are streamed straight into the archive unless openpyxl is configured
+        if not ( self.config == None ) and self.config.get( 'WRITER', 'ENGINE', fallback='openpyxl' ).strip().lower() == 'native':
+            return components.StreamingXlsxOutput( file )
+
+        return components.XlsxOutput( file )
+
+
+    def _reader_engine( self ):
+        """
+        Returns the spreadsheet reader engine configured in the READER section
+
+        :return: str
+        """
+        if self.config == None:
+            return 'openpyxl'
+
+        engine = self.config.get( 'READER', 'ENGINE', fallback='openpyxl' ).strip().lower()
+
+        if not engine in models.ENGINES:
+            logging.warning( 'Unknown reader engine {0}, reading with openpyxl'.format( engine ) )
+            return 'openpyxl'
+
+        return engine
+
+
+    @contextlib.contextmanager
+    def _profiling( self ):
+        """
+        with self._profiling(): ...
+
+        Profiles the phases run within, when profiling is enabled, saving a .pstats file
+        per phase and a summary of the slowest functions next to the output
+        """
+        if not self.profile:
+            yield
+            return
+
+        self.profiler = components.PhaseProfiler( '{0}-profile'.format( os.path.splitext( self.output )[0] ) )
+
+        try:
+            yield
+        finally:
+            self.profiler.save()
+            self.profiler = None
+
+
+    def _create_report( self ):
+        """
+        Creates the run report, enabled by the [REPORT] configuration
+
+        :return: components.RunReport
+        """
+        enabled = not ( self.config == None ) and self.config.getboolean( 'REPORT', 'ENABLED', fallback=False )
+
+        return components.RunReport( enabled=enabled )
+
+
+    def _report_file( self ):
+        """
+        _report_file() -> 'GENERATED-TIMECARDS-report.json'
+
+        Returns the run report file, saved next to the output
+
+        :return: str
+        """
+        return '{0}-report.json'.format( os.path.splitext( self.output )[0] )
+
+
+    def _count_output( self, output ):
+        """
+        Counts the rows and bytes written by an output backend
+
+        :param output: components.Output
+        """
+        self.report.count( 'rows_written', output.rows )
+        self.report.count( 'bytes_saved', output.size )
+
+
+    def _done_message( self ):
+        """
+        Returns the completion message, followed by the run report when enabled
+
+        :return: str
+        """
+        message = 'A new {0} can be found in Sage300 Timecard Generator directory.'.format( self.output )
+
+        if self.report.enabled:
+            message = '{0}\n\n{1}'.format( message, self.report.summary() )
+
+        return message
+
+
+    def start_generate( self ):
+        """
+        Runs generate on a background worker, leaving the GUI responsive
+        """
+        if not ( self.worker == None ):
+            return
+
+        # Tkinter is only read on the main thread
+        self.payperiod = self.get_payperiod()
+        self.profile   = self.gui.get_widget( 'toggle_profile' ).get()
+        self.errors    = []
+
+        self.worker = components.Worker( lambda worker: self.generate() )
+
+        progress = self.gui.get_widget( 'progress' )
+        progress.configure( value=0, maximum=len( self.PHASES ) )
+
+        self._set_running( True )
+
+        self.worker.start()
+        self.gui.after( 100, self._poll_worker )
+
+
+    def cancel_generate( self ):
+        """
+        Requests the running worker stop at its next phase
+        """
+        if self.worker == None:
+            return
+
+        self.gui.get_widget( 'label_status' ).configure( text='Cancelling...' )
+        self.worker.cancel()
+
+
+    def _set_running( self, running ):
+        """
+        Toggles the controls which may not be used while a worker runs generate
+
+        :param running: bool
+        """
+        idle = tkinter.DISABLED if running else tkinter.NORMAL
+
+        self.gui.get_widget( 'button_run' ).configure( state=idle )
+        self.gui.get_widget( 'button_cancel' ).configure( state=tkinter.NORMAL if running else tkinter.DISABLED )
+
+        # The running generate reads the open spreadsheet
+        file_menu = self.gui.get_widget( 'file_menu' )
+        for label in ( 'Open Spreadsheet', 'Close Spreadsheet', 'Run' ):
+            file_menu.entryconfigure( label, state=idle )
+
+
+    def _poll_worker( self ):
+        """
+        Delivers worker progress and results on the tkinter mainloop
+        """
+        for kind, value in self.worker.messages():
+
+            if kind == 'progress':
+                self.gui.get_widget( 'progress' ).configure( value=self.PHASES.index( value ) )
+                self.gui.get_widget( 'label_status' ).configure( text='{0}...'.format( value.capitalize() ) )
+                continue
+
+            self.worker = None
+
+            # Released between runs, so the spreadsheet can be fixed and saved before running again
+            if not ( self.spreadsheet == None ):
+                self.spreadsheet.close()
+
+            self.gui.get_widget( 'progress' ).configure( value=0 )
+            self.gui.get_widget( 'label_status' ).configure( text='' )
+            self._set_running( False )
+
+            # Errors collected by the worker thread
+            errors      = self.errors
+            self.errors = []
+
+            if kind == 'error':
+                errors.append( 'Run Error! {0}'.format( value ) )
+
+            if errors:
+                self.show_error( title='Run Errors!', message='\n\n'.join( errors ) )
+
+            if kind == 'done' and value:
+                self.show_alert(
+                    title='Done!',
+                    message=self._done_message()
+                )
+
+            if kind == 'cancelled':
+                self.show_alert( title='Cancelled', message='Timecard generation was cancelled.' )
+
+            return
+
+        self.gui.after( 100, self._poll_worker )
+
+
+    def _phase( self, phase ):
+        """
+        Reports a generation phase to the run report, profiler and running worker, stopping if it was cancelled
+
+        :param phase: str
+        """
+        logging.info( 'Starting phase \'{0}\''.format( phase ) )
+        self.report.start( phase )
+
+        if not ( self.profiler == None ):
+            self.profiler.start( phase )
+
+        if not ( self.worker == None ):
+            self.worker.report( phase )
+
+
+    def _is_gui_thread( self ):
+        """
+        Return if a GUI exists and tkinter may be used from the current thread
 
+        :return: bool
+        """
+        return not ( self.gui == None ) and ( threading.current_thread() is threading.main_thread() )
 
 
-    def generate( self ):
+    def get_payperiod( self ):
         """
-        Generate the importable spreadsheet template
+        Retrieves the payperiod from the GUI field, or the instance when headless
+
+        :return: str
         """
+        if not self._is_gui_thread():
+            return self.payperiod
 
-        # Ensure Spreadsheet is set
-        if self.spreadsheet == None:
-            self.gui.show_error(
-                title='Run Error!',
-                message='No spreadsheet set before running application!\nUse file->Open Spreadsheet'
-            )
-            return
+        return self.gui.get_widget( 'field_timecard' ).get()
 
-        # Retrieve Spreadsheet Data
-        # Dates, Employees, Employee Hours etc...
-        logging.info( 'Retrieving spreadsheet data...' )
-        self.get_dates()
-        self.get_employees()
-        self.get_hours()
 
+    def show_alert( self, title='Alert', message='' ):
+        """
+        Shows an alert in the GUI, or logs it when headless
 
-        # Remove employees without hours
-        logging.info( 'Ignoring employees without hours this pay-period...' )
-        no_hours = []
-        for id, employee in self.employees.items():
-            if ( len( employee.hours ) == 0 ):
-                no_hours.append( id )
+        :param title: str
+        :param message: str
+        """
+        if not self._is_gui_thread():
+            logging.info( '{0} {1}'.format( title, message ) )
+            return
 
-        for id in no_hours:
-            logging.info( 'Removing employee with id \'{0}\' without hours'.format( id ) )
-            del self.employees[id]
+        self.gui.show_alert( title=title, message=message )
 
 
-        # Retrieve Employee Database data
-        logging.info( 'Retrieving Employee database data...' )
-        self.query_employee_data()
+    def show_error( self, title='Error', message='' ):
+        """
+        Shows an error in the GUI, or collects it in errors when headless
 
+        :param title: str
+        :param message: str
+        """
+        logging.error( '{0} {1}'.format( title, message ) )
 
-        # Generate Timesheet
-        logging.info( 'Generating Timecard \'{0}\''.format( self.gui.get_widget( 'field_timecard' ).get() ) )
-        self.spreadsheet.generate( employees=self.employees )
+        if not self._is_gui_thread():
+            self.errors.append( '{0} {1}'.format( title, message ) )
+            return
 
-        # Complete
-        self.gui.show_alert(
-            title='Done!',
-            message='A new GENERATED-TIMECARDS.xlsx can be found in Sage300 Timecard Generator directory.'
-        )
+        self.gui.show_error( title=title, message=message )
 
 
 
@@ -114,6 +1066,8 @@ class TimecardGenerator( object ):
         """
         Opens the file dialog prompt to select a spreadsheet
         """
+        if not ( self.worker == None ):
+            return
 
         # Ensures no active spreadsheet is set
         if not ( self.spreadsheet == None ): self.close_spreadsheet()
@@ -133,18 +1087,20 @@ class TimecardGenerator( object ):
 
         logging.info( 'Opening spreadsheet file {0}'.format( file ) )
 
-        self.spreadsheet = models.Spreadsheet( file )
+        self.spreadsheet = models.Spreadsheet( file, engine=self._reader_engine() )
 
 
     def close_spreadsheet( self ):
         """
-        Clears the currently active spreadsheet
+        Clears the currently active spreadsheet, unless a worker is running generate on it
         """
-        if ( self.spreadsheet == None ): return
+        if ( self.spreadsheet == None ) or not ( self.worker == None ): return
 
         logging.info( 'Closing file {0}'.format( self.spreadsheet.file ) )
 
+        self.spreadsheet.close()
         self.spreadsheet = None
+        self.sheet_data  = None
 
 
     def _create_gui( self ):
@@ -156,10 +1112,12 @@ class TimecardGenerator( object ):
         # Create File Menu #
         menu = self.gui.get_menu()
 
-        file_menu = tkinter.Menu( menu, tearoff=0 )
+        file_menu = self.gui.add_widget( 'file_menu', tkinter.Menu( menu, tearoff=0 ) )
         file_menu.add_command( label='Open Spreadsheet',  command=self.open_spreadsheet )
         file_menu.add_command( label='Close Spreadsheet', command=self.close_spreadsheet )
-        file_menu.add_command( label='Run',               command=self.generate )
+        file_menu.add_command( label='Run',               command=self.start_generate )
+        file_menu.add_command( label='Cancel Run',        command=self.cancel_generate )
+        file_menu.add_checkbutton( label='Profile Runs',  variable=self.gui.add_widget( 'toggle_profile', tkinter.BooleanVar( value=False ) ) )
         file_menu.add_separator()
         file_menu.add_command( label='Quit',              command=self.gui.get_root().quit )
 
@@ -180,8 +1138,8 @@ class TimecardGenerator( object ):
         )
 
         # Configure Responsive Containers
-        self.gui.configure_grid( frame=body, grid=tuples.Grid( rows=1, columns=2 ) )
-        self.gui.configure_grid( frame=footer )
+        self.gui.configure_grid( frame=body, grid=tuples.Grid( rows=2, columns=2 ) )
+        self.gui.configure_grid( frame=footer, grid=tuples.Grid( rows=1, columns=2 ) )
 
 
         # Add Inputs #
@@ -195,10 +1153,26 @@ class TimecardGenerator( object ):
             self._create_styled_entry( body )
         )
 
+        label_status = self.gui.add_widget(
+            'label_status',
+            self._create_styled_label( body, text='' )
+        )
+
+        progress = self.gui.add_widget(
+            'progress',
+            ttk.Progressbar( body, orient=tkinter.HORIZONTAL, mode='determinate', maximum=len( self.PHASES ) )
+        )
+
         button_run = self.gui.add_widget(
             'button_run',
-            self._create_styled_button( footer, text='Run', command=self.generate )
+            self._create_styled_button( footer, text='Run', command=self.start_generate )
+        )
+
+        button_cancel = self.gui.add_widget(
+            'button_cancel',
+            self._create_styled_button( footer, text='Cancel', command=self.cancel_generate )
         )
+        button_cancel.configure( state=tkinter.DISABLED )
 
 
         # Configure Grid #
@@ -217,8 +1191,11 @@ class TimecardGenerator( object ):
         }
         field_timecard_label.grid( row=0, column=0, sticky='new', **pad )
         field_timecard.grid( row=0, column=1, sticky='new', **ipad )
+        label_status.grid( row=1, column=0, sticky='ew', **pad )
+        progress.grid( row=1, column=1, sticky='ew', **pad )
 
         button_run.grid( row=0, column=0, sticky='nsew', **ipad )
+        button_cancel.grid( row=0, column=1, sticky='nsew', **ipad )
 
 
     def _create_styled_label( self, frame, text ):
@@ -266,12 +1243,12 @@ class TimecardGenerator( object ):
     #          #
     # Database #
     #          #
-    def _db_connect( self ):
+    def _db_configure( self ):
         """
-        Connects to the available database in config
+        Configures the database connection pool from config, without connecting
         """
-
-        logging.info( 'Connecting to Database...' )
+        if not ( self.db == None ):
+            return
 
         driver   = self.config.get( 'DB', 'DRIVER' )
         server   = self.config.get( 'DB', 'SERVER' )
@@ -279,25 +1256,110 @@ class TimecardGenerator( object ):
         username = self.config.get( 'DB', 'UID' )
         password = self.config.get( 'DB', 'PWD' )
 
-        # Database Connection
-        self._dbConnect = pyodbc.connect( 'DRIVER={0};SERVER={1};DATABASE={2};UID={3};PWD={4}'.format(
-            driver,
-            server,
-            database,
-            username,
-            password
-            )
+        # Database Connection Pool
+        self.db = components.ConnectionPool(
+            'DRIVER={0};SERVER={1};DATABASE={2};UID={3};PWD={4}'.format(
+                driver,
+                server,
+                database,
+                username,
+                password
+            ),
+            size=self.config.getint( 'DB', 'POOL_SIZE', fallback=4 ),
+            retries=self.config.getint( 'DB', 'RETRIES', fallback=3 )
         )
-        self._db = self._dbConnect.cursor()
 
 
-    def query_employee_data( self ):
+    def _query( self, sql, *params ):
+        """
+        _query( 'SELECT * FROM CPEMPL WHERE EMPLOYEE = ?', 'EMP01' )
+
+        Executes a query through the connection pool, counting the round trips of this instance
 
-        for id, employee in self.employees.items():
+        :param sql: str
+        :param params: any
+        :return: list
+        """
+        self.round_trips += 1
+
+        return self.db.query( sql, *params )
+
+
+    def query_employee_data( self, employees=None ):
+        """
+        Retrieves database data for all employees, from the employee cache where possible
+
+        :param employees: iterable of models.Employee, defaults to the instance employees
+        """
+        if employees == None:
+            employees = self.employees.values()
+
+        # Employee ids are matched as the database compares them,
+        # the same id may appear once per site in batch runs
+        employees_by_key = {}
+        for employee in employees:
+            employees_by_key.setdefault( self._employee_key( employee.get_id() ), [] ).append( employee )
+
+        employees = employees_by_key
+
+        keys  = list( employees.keys() )
+        rows  = {}
+        cache = self._get_cache()
+
+        try:
+            if not ( cache == None ):
+                if self.config.getboolean( 'CACHE', 'CHANGE_DETECTION', fallback=True ):
+                    self._check_cache_stamp( cache )
+
+                rows = cache.get_many( keys, chunk_size=self.QUERY_CHUNK_SIZE )
+
+            queried = self._query_employee_rows( [ key for key in keys if not key in rows ] )
+            rows.update( queried )
+
+            if not ( cache == None ):
+                cache.put_many( queried )
+
+        except pyodbc.Error as error:
+            if cache == None:
+                raise
+
+            # Keep working from expired entries while the database is unreachable
+            logging.warning( 'Database unreachable, using cached employee data: {0}'.format( error ) )
+            rows.update( cache.get_many( [ key for key in keys if not key in rows ], stale=True, chunk_size=self.QUERY_CHUNK_SIZE ) )
+
+        for key in keys:
+            if key in rows:
+                for employee in employees[key]:
+                    self._add_employee_data( employee, rows[key] )
+
+        missing = [ str( employees[key][0].get_id() ) for key in keys if not key in rows ]
 
-            # Retrieves database data for employees by their id
-            self._db.execute("""
+        if missing:
+            self.show_error(
+                title='Database Query Error!',
+                message='Could not locate employees with ids \'{0}\' in DB\n\n Will skip employees to continue...'.format( '\', \''.join( missing ) )
+            )
+
+
+    def _query_employee_rows( self, keys ):
+        """
+        Retrieves database rows for employee keys in chunked batches
+
+        :param keys: list
+        :return: dict
+        """
+        rows = {}
+
+        for i in range( 0, len( keys ), self.QUERY_CHUNK_SIZE ):
+            chunk  = keys[i:i + self.QUERY_CHUNK_SIZE]
+            wanted = set( chunk )
+
+            logging.info( 'Querying database data for {0} employees'.format( len( chunk ) ) )
+
+            # Retrieves database data for employees by their ids
+            found = self._query("""
             SELECT
+                employee.EMPLOYEE,
                 employee.OTSCHED,
                 detail.CATEGORY,
                 dist.EARNDED,
@@ -310,143 +1372,299 @@ class TimecardGenerator( object ):
             AND dist.DISTCODE		= detail.DISTCODE
             AND dist.AUDTUSER		= employee.AUDTUSER
             AND dist.EARNDED		= ?
-            AND employee.EMPLOYEE	= ?
-            """,
+            AND employee.EMPLOYEE	IN ( {0} )
+            """.format( ', '.join( [ '?' ] * len( chunk ) ) ),
             'HRLY',
-            id )
+            *chunk )
 
-            data = self._db.fetchone()
+            for row in found:
+                key = self._employee_key( row[0] )
 
-            if ( data == None ):
-                self.gui.show_error(
-                    title='Database Query Error!',
-                    message='Could not locate employee with id \'{0}\' in DB\n\n Will skip employee to continue...'.format( id )
-                )
-                continue
+                # Only the first distribution found is used for an employee
+                if ( key in rows ) or ( not key in wanted ):
+                    continue
 
-            coordinates = [ 'Y',        'E',       'F',       'BB',       'T',       'V'  ]
-            keys        = [ 'OTSCHED', 'CATEGORY', 'EARNDED', 'DISTCODE', 'EXPACCT', 'OTACCT' ]
-
-            for i, value in enumerate( data ):
-                # Strip whitespace
-                if ( type( value ) == str ):
-                    value = value.replace( ' ', '' )
-                    value = value.replace( '-', '' )
-
-                # Add Employee data
-                employee.data.add(
-                    coordinates[i],
-                    {
-                        'key': keys[i],
-                        'value': value
-                    }
-                )
+                rows[key] = tuple( row[1:] )
 
+        return rows
 
 
-    #             #
-    # SPREADSHEET #
-    #             #
-    def _get_employee_coordinate( self, coordinate ):
+    def _get_cache( self ):
         """
-        Return possible coordinate of employee given a coordinate row to check
-        
-        :param coordinate: tuples.Coordinate
-        :return: tuples.Coordinate
+        Opens the employee cache configured in the CACHE section, if enabled
+
+        :return: components.EmployeeCache
         """
-        sheet_min = openpyxl.utils.coordinate_from_string( self.spreadsheet.min_coordinate() )
-        sheet_min = tuples.Coordinate( column=sheet_min[0], row=sheet_min[1] )
+        if not ( self.cache == None ):
+            return self.cache
+
+        if not self.config.getboolean( 'CACHE', 'ENABLED', fallback=False ):
+            return
+
+        self.cache = components.EmployeeCache(
+            file=helpers.resource_path( self.config.get( 'CACHE', 'FILE', fallback='employee-cache.sqlite' ) ),
+            ttl=self.config.getint( 'CACHE', 'TTL', fallback=86400 )
+        )
 
-        return tuples.Coordinate( column=sheet_min.column, row=coordinate.row )
+        return self.cache
 
 
-    def _get_employee_from_coordinate( self, coordinate ):
+    def _get_workbooks( self ):
         """
-        Return employee found at given coordinate
-        
-        :param coordinate: tuples.Coordinate
-        :return: models.Employee
+        Opens the parsed workbook cache configured in the WORKBOOK_CACHE section, if enabled
+
+        :return: components.WorkbookCache
         """
-        coord = self._get_employee_coordinate( coordinate )
-        key   = self.spreadsheet.get_cell( '{0}{1}'.format( coord.column, coord.row ) )
+        if not ( self.workbooks == None ):
+            return self.workbooks
 
-        if not key in self.employees:
+        if self.config == None or not self.config.getboolean( 'WORKBOOK_CACHE', 'ENABLED', fallback=False ):
             return
 
-        return self.employees[key]
+        self.workbooks = components.WorkbookCache(
+            directory=helpers.resource_path( self.config.get( 'WORKBOOK_CACHE', 'DIRECTORY', fallback='workbook-cache' ) ),
+            max_size=self.config.getint( 'WORKBOOK_CACHE', 'MAX_SIZE', fallback=256 ) * 1024 * 1024
+        )
+
+        return self.workbooks
 
 
-    def _is_datetime( self, data ):
+    def _check_cache_stamp( self, cache ):
         """
-        Return if passed data is datetime object
-        
-        :param data: any
-        :return: boolean
+        Clears the employee cache when the Sage audit columns show employee changes
+
+        :param cache: components.EmployeeCache
         """
-        # Datetime object
-        if ( not type( data ) == datetime.datetime ):
-            return False
+        # Incremental runs have already read the stamp this run
+        stamp = self.stamp
 
-        # Datetime string
-        if ( type( data ) == str ):
-            try:
-                datetime.datetime.strptime( data, '%x' )
-            except:
-                return False
+        if stamp == None:
+            stamp = self._database_stamp()
 
-        return True
+        if not ( cache.get_stamp() == stamp ):
+            cache.clear()
+            cache.set_stamp( stamp )
 
 
-    def _is_time( self, data ):
+    def _database_stamp( self ):
         """
-        Return if passed data is time object
-        
-        :param data: data
-        :return: boolean
+        Returns a stamp of the Sage audit columns, which changes with any employee change
+
+        :return: str
         """
-        # Type Checking
-        if data == None or type( data ) == int or type( data ) == bool:
-            return False
+        audit = self._query("""
+        SELECT
+            ( SELECT MAX( CAST( AUDTDATE AS BIGINT ) * 100000000 + AUDTTIME ) FROM CPEMPL ),
+            ( SELECT COUNT( * ) FROM CPEMPL ),
+            ( SELECT MAX( CAST( AUDTDATE AS BIGINT ) * 100000000 + AUDTTIME ) FROM CPEMPD ),
+            ( SELECT COUNT( * ) FROM CPEMPD ),
+            ( SELECT MAX( CAST( AUDTDATE AS BIGINT ) * 100000000 + AUDTTIME ) FROM CPDIST ),
+            ( SELECT COUNT( * ) FROM CPDIST )
+        """)
 
-        # string or datetime object
-        if type( data ) == str or type( data ) == datetime.datetime:
-            try:
-                date = arrow.get( data )
-            except:
-                return False
+        return ':'.join( [ str( value ) for value in audit[0] ] )
 
-            excel = arrow.get( 1899, 12, 31 )
 
-            if date > excel:
-                return False
+    def _add_employee_data( self, employee, data ):
+        """
+        Adds a database row to the employee's data
 
-        return True
+        :param employee: models.Employee
+        :param data: tuple
+        """
+        coordinates = self.DATABASE_COLUMNS
+        keys        = [ 'OTSCHED', 'CATEGORY', 'EARNDED', 'DISTCODE', 'EXPACCT', 'OTACCT' ]
+
+        for i, value in enumerate( data ):
+            # Strip whitespace
+            if ( type( value ) == str ):
+                value = value.replace( ' ', '' )
+                value = value.replace( '-', '' )
+
+            # Add Employee data
+            employee.data.add(
+                coordinates[i],
+                {
+                    'key': keys[i],
+                    'value': value
+                }
+            )
 
 
-    def _is_greater_than_zero_time( self, data ):
+    def _employee_key( self, id ):
         """
-        Return if passed data is time greater than 00:00
+        Return an employee id as compared by the database, ignoring padding and case
 
-        :param data: data
-        :return: boolean
+        :param id: any
+        :return: str
         """
-        # Type Checking
-        if data == None or type( data ) == int or type( data ) == bool:
-            return False
+        return str( id ).strip().upper()
 
-        # string or datetime object
-        if type( data ) == str or type( data ) == datetime.datetime or type( data ) == datetime.time:
-            try:
-                date = arrow.get( data )
-            except:
-                date = arrow.get( datetime.time.strftime( data, '%Y-%m-%d %H:%M:%S' ) )
 
-            zero = arrow.get( 1899, 12, 30 )
 
-            if date <= zero:
-                return False
+    #                  #
+    # INCREMENTAL RUNS #
+    #                  #
+    def _get_state( self ):
+        """
+        Opens the incremental state configured in the INCREMENTAL section, if enabled
+
+        :return: components.IncrementalState
+        """
+        if not ( self.state == None ):
+            return self.state
+
+        if self.config == None or not self.config.getboolean( 'INCREMENTAL', 'ENABLED', fallback=False ):
+            return
+
+        self.state = components.IncrementalState(
+            file=helpers.resource_path( self.config.get( 'INCREMENTAL', 'FILE', fallback='incremental-state.pickle' ) )
+        )
+
+        return self.state
+
+
+    def _state_key( self ):
+        """
+        _state_key() -> 'C:\\Payroll\\hours.xlsx:Kitchen'
+
+        Returns the key of a workbook's state, empty after the colon for the first worksheet
+
+        :return: str
+        """
+        return '{0}:{1}'.format( os.path.abspath( self.spreadsheet.file ), self.spreadsheet.sheet_name or '' )
+
+
+    def _fingerprint( self, value ):
+        """
+        Returns a digest of a value built from cell values
+
+        :param value: any
+        :return: str
+        """
+        return hashlib.sha1( repr( value ).encode( 'utf-8' ) ).hexdigest()
+
+
+    def _restore_employees( self ):
+        """
+        Fingerprints the rows of each employee, restoring the shifts of employees whose rows
+        and date headers are unchanged since the previous run of the same workbook
+        """
+        self.restored    = set()
+        self.saved_state = None
+
+        state = self._get_state()
+        if state == None:
+            return
+
+        # Row numbers are included, moving rows may move them under other dates
+        rows = self.sheet_data.rows
+        self.fingerprints = dict( [
+            ( id, self._fingerprint( [ ( row, rows.get( row ) ) for row in sorted( [ coordinate.row for coordinate in employee.coordinates ] ) ] ) )
+            for id, employee in self.employees.items()
+        ] )
+
+        saved = state.load( self._state_key() )
+
+        if saved == None or not ( saved['dates'] == self._fingerprint( self.sheet_data.dates ) ):
+            return
+
+        self.saved_state = saved
+
+        for id, employee in self.employees.items():
+            found = saved['employees'].get( id )
+
+            if found == None or not ( found['fingerprint'] == self.fingerprints[id] ):
+                continue
+
+            for ordinal, minutes in found['shifts']:
+                employee.add_hours( ordinal, minutes )
+
+            self.restored.add( id )
+
+        logging.info( 'Restored {0} of {1} employees from the previous run'.format( len( self.restored ), len( self.employees ) ) )
+
+
+    def _restore_employee_data( self ):
+        """
+        Restores the database data of restored employees while Sage reports no employee changes
+
+        :return: list of models.Employee still to query, None for all employees
+        """
+        self.stamp = None
+
+        if self._get_state() == None:
+            return
+
+        try:
+            self.stamp = self._database_stamp()
+        except pyodbc.Error:
+            self.stamp = None
+
+        if self.saved_state == None or self.stamp == None or not ( self.saved_state['stamp'] == self.stamp ):
+            return
+
+        pending = []
+
+        for id, employee in self.employees.items():
+
+            # Employees missing from the database are queried again, to report them again
+            if id in self.restored and not ( self.saved_state['employees'][id]['data'] == None ):
+                for column, value in zip( self.DATABASE_COLUMNS, self.saved_state['employees'][id]['data'] ):
+                    employee.data.set( column, value )
+                continue
+
+            pending.append( employee )
+
+        return pending
+
+
+    def _save_state( self ):
+        """
+        Stores the fingerprint, shifts and database data of each employee for the next run
+        """
+        state = self._get_state()
+        if state == None:
+            return
+
+        employees = {}
+
+        for id, employee in self.employees.items():
+
+            # Undated hours are reported by parsing the employee again
+            if any( [ coordinate.row in self.undated_rows for coordinate in employee.coordinates ] ):
+                continue
+
+            data = None
+            if employee.data.data_exists( self.DATABASE_COLUMNS[0] ):
+                data = [ employee.data.get_value( column ) for column in self.DATABASE_COLUMNS ]
+
+            employees[id] = {
+                'fingerprint': self.fingerprints[id],
+                'shifts': [ ( date.toordinal(), minutes ) for date, minutes in employee.get_shifts() ],
+                'data': data
+            }
+
+        state.save( self._state_key(), {
+            'dates': self._fingerprint( self.sheet_data.dates ),
+            'stamp': self.stamp,
+            'employees': employees
+        } )
+
+
+
+    #             #
+    # SPREADSHEET #
+    #             #
+    def _get_employee_from_coordinate( self, coordinate ):
+        """
+        Return employee found at given coordinate
+
+        :param coordinate: tuples.Coordinate
+        :return: models.Employee
+        """
+        return self.employee_rows.get( coordinate.row )
 
-        return True
 
     def _is_end_of_week( self, week: dict, weekday: arrow ):
         """
@@ -462,62 +1680,108 @@ class TimecardGenerator( object ):
         return True
 
 
-    def _is_employee_row( self, coordinate ):
+    def read_spreadsheet( self ):
         """
-        Return if given coordinate exists within employees coordinates list
-        
-        :param coordinate: tuples.Coordinate
-        :return: boolean
+        Classifies date headers, employee ids and time cells in a single pass over the spreadsheet
         """
-        sheet_coordinate = self.spreadsheet.min_coordinate()
-        coord            = tuples.Coordinate( column=sheet_coordinate[0], row=coordinate.row )
-        employee         = self._get_employee_from_coordinate( coord )
+        assert not ( self.spreadsheet == None ), 'Spreadsheet must be set before it can be read'
 
-        if not employee:
-            return False
+        # Unchanged workbooks are restored without opening them
+        workbooks = self._get_workbooks()
+        key       = None
 
-        if not coord in employee.coordinates:
-            return False
+        if not ( workbooks == None ):
+            key    = workbooks.key( self.spreadsheet.file, self.spreadsheet.sheet_name, self.spreadsheet.engine, self.PARSER_VERSION )
+            parsed = workbooks.get( key )
 
-        return True
+            # Employee rows are only kept when parsed for incremental runs
+            if not ( parsed == None ) and ( not ( parsed['sheet_data'].rows == None ) or self._get_state() == None ):
+                self.id_column  = parsed['id_column']
+                self.sheet_data = parsed['sheet_data']
+                self.spreadsheet.cells_scanned = parsed['cells_scanned']
+                self.spreadsheet.cells_empty   = parsed['cells_empty']
+                return
+
+        logging.info( 'Reading spreadsheet...' )
+
+        dates = []
+        ids   = {}
+        hours = []
+
+        # Cells of employee rows are only kept to fingerprint them for incremental runs
+        rows = {} if not ( self._get_state() == None ) else None
+
+        # Sheet bounds are computed once per run
+        self.id_column = self.spreadsheet.first_column()
+        epoch          = self.spreadsheet.epoch
+
+        for coordinate, value, style in self.spreadsheet.stream_cells():
+
+            # Employee ids are held in the first column
+            if coordinate.column == self.id_column:
+                ids[coordinate.row] = value
+
+            if not ( rows == None ) and ( coordinate.row in ids ):
+                rows.setdefault( coordinate.row, [] ).append( ( coordinate.column, value ) )
+
+            # Dates as ordinals, times greater than 00:00 as minutes, serials by their cell format
+            if style == classifier.NONE:
+                kind, value = classifier.classify( value )
+            else:
+                kind, value = classifier.classify_serial( value, style, epoch )
+
+                # Serials are fingerprinted by what they read as, resaving a workbook may write them differently
+                if not ( rows == None ) and ( coordinate.row in ids ):
+                    rows[coordinate.row][-1] = ( coordinate.column, kind, value )
+
+            if kind == classifier.DATE:
+                dates.append( ( coordinate, value ) )
+
+            elif kind == classifier.DURATION:
+                hours.append( ( coordinate, value ) )
+
+        logging.info( 'Read spreadsheet' )
+
+        self.sheet_data = tuples.SheetData( dates=dates, ids=ids, hours=hours, rows=rows )
+
+        if not ( workbooks == None ):
+            workbooks.put( key, {
+                'id_column': self.id_column,
+                'sheet_data': self.sheet_data,
+                'cells_scanned': self.spreadsheet.cells_scanned,
+                'cells_empty': self.spreadsheet.cells_empty
+            } )
 
 
     def get_dates( self ):
         """
         Retrieves dates from the spreadsheet
         """
-        assert not ( self.spreadsheet == None ), 'Spreadsheet must be set before employees can be retrieved'
+        assert not ( self.sheet_data == None ), 'Spreadsheet must be read before dates can be retrieved'
 
         logging.info( 'Retrieving Dates...' )
 
         weeks = [{}]
 
-        def loop( cell, coordinate ):
-
-            # Data is datetime and not datetime.time
-            if self._is_datetime( cell.value ) and ( not self._is_time( cell.value ) ):
+        for coordinate, ordinal in self.sheet_data.dates:
 
-                day     = arrow.get( cell.value )
-                weekday = day.format( 'dddd' )
+            day     = datetime.date.fromordinal( ordinal )
+            weekday = classifier.WEEKDAYS[day.weekday()]
+            day     = arrow.get( day )
 
-                # Creates a new week when an existing day has been found in the latest week
-                if self._is_end_of_week( weeks[-1], weekday ):
-                    weeks.append({})
+            # Creates a new week when an existing day has been found in the latest week
+            if self._is_end_of_week( weeks[-1], weekday ):
+                weeks.append({})
 
-                # Append new weekday to week dict
-                weeks[-1][weekday] = tuples.WeekDay( date=day, coordinate=coordinate )
-
-        self.spreadsheet.loop_sheet(
-            tuples.Coordinates( start=self.spreadsheet.min_coordinate(), end=self.spreadsheet.max_coordinate() ),
-            loop
-        )
+            # Append new weekday to week dict
+            weeks[-1][weekday] = tuples.WeekDay( date=day, coordinate=coordinate )
 
         # Extracts the weeks into namedtuples
         for i, week in enumerate( weeks ):
             try:
                 weeks[i] = tuples.SheetDates( **week )
             except:
-                self.gui.show_error(
+                self.show_error(
                     title='Date Registration Error!',
                     message='Partial weeks cannot be generated ( less than 7 days ).'
                 )
@@ -525,27 +1789,73 @@ class TimecardGenerator( object ):
         logging.info( 'Retrieved workdays from spreadsheet' )
 
         self.dates = weeks
+        self._index_dates()
+
+
+    def _index_dates( self ):
+        """
+        Indexes the retrieved dates by column into row sorted lists for bisect lookups
+        """
+        index = {}
+
+        for week in self.dates:
+            # Partial weeks were not registered
+            if not type( week ) == tuples.SheetDates:
+                continue
+
+            for day in week:
+                index.setdefault( day.coordinate.column, [] ).append( ( day.coordinate.row, day.date.date().toordinal() ) )
+
+        for column, days in index.items():
+            days.sort()
+            index[column] = ( [ row for row, _ in days ], [ ordinal for _, ordinal in days ] )
+
+        self.dates_index = index
+
+
+    def _get_date_from_coordinate( self, coordinate ):
+        """
+        Return the nearest date above the given coordinate in the same column
+
+        :param coordinate: tuples.Coordinate
+        :return: int ordinal date
+        """
+        if not coordinate.column in self.dates_index:
+            return
+
+        rows, days = self.dates_index[coordinate.column]
+        i          = bisect.bisect_left( rows, coordinate.row )
+
+        if i == 0:
+            return
+
+        return days[i - 1]
 
 
     def get_employees( self ):
         """
         Retrieves employees from spreadsheet
         """
-        assert not ( self.spreadsheet == None ), 'Spreadsheet must be set before employees can be retrieved'
+        assert not ( self.sheet_data == None ), 'Spreadsheet must be read before employees can be retrieved'
 
         logging.info( 'Retrieving Employees...' )
 
         employees = {}
         periodend = self.dates[-1][-1].date.date()
-        payperiod = self.gui.get_widget( 'field_timecard' ).get()
+        payperiod = self.get_payperiod()
+
+        employee_rows = {}
+
+        for row, id in sorted( self.sheet_data.ids.items() ):
 
-        def loop( cell, coordinate ):
-            if not cell.value in employees:
+            coordinate = tuples.Coordinate( column=self.id_column, row=row )
 
-                new_employee = models.Employee( id=cell.value, coordinates=coordinate )
+            if not id in employees:
+
+                new_employee = models.Employee( id=id, coordinates=coordinate )
                 new_employee.data.add( 'A', {
                         'key': 'id',
-                        'value': cell.value
+                        'value': id
                     }
                 )
                 new_employee.data.add( 'B', {
@@ -558,25 +1868,16 @@ class TimecardGenerator( object ):
                         'value': payperiod.upper()
                     }
                 )
-                employees[cell.value] = new_employee
+                employees[id] = new_employee
             else:
-                employees[cell.value].coordinates.append( coordinate )
-
-        # Get starting coordinate of loop
-        start = self.spreadsheet.min_coordinate()
+                employees[id].coordinates.add( coordinate )
 
-        # Modify end to encompass only the first column
-        end = openpyxl.utils.coordinate_from_string( self.spreadsheet.max_coordinate() )
-        end = '{0}{1}'.format( start[0], end[1] )
-
-        self.spreadsheet.loop_sheet(
-            tuples.Coordinates( start=start, end=end ),
-            loop
-        )
+            employee_rows[row] = employees[id]
 
         logging.info( 'Retreived employees from Spreadsheet' )
 
-        self.employees = employees
+        self.employees     = employees
+        self.employee_rows = employee_rows
 
 
     def get_hours( self ):
@@ -585,27 +1886,33 @@ class TimecardGenerator( object ):
         """
         logging.info( 'Retrieving Employee Hours...' )
 
-        def loop( cell, coordinate ):
+        undated  = []
+        restored = self.restored
 
-            if self._is_time( cell.value ) and self._is_greater_than_zero_time( cell.value ) and self._is_employee_row( coordinate ):
-                # Get Date
-                date     = None
-                employee = self._get_employee_from_coordinate( coordinate )
+        for coordinate, value in self.sheet_data.hours:
 
-                # Loop weeks
-                for week in self.dates:
-                    # Loop days of week
-                    for day in week:
-                        # Ensure same column and find the oldest parental row of dates
-                        if ( day.coordinate.column == coordinate.column ) and ( day.coordinate.row < coordinate.row ):
-                            date = day
+            employee = self._get_employee_from_coordinate( coordinate )
 
-                # Append new hours to employee
-                employee.add_hours( date, cell.value )
+            # Skip cells outside of employee rows, and of employees restored from a previous run
+            if employee == None or employee.get_id() in restored:
+                continue
 
-        self.spreadsheet.loop_sheet(
-            tuples.Coordinates( start=self.spreadsheet.min_coordinate(), end=self.spreadsheet.max_coordinate() ),
-            loop
-        )
+            # Find the nearest parental row of dates
+            date = self._get_date_from_coordinate( coordinate )
+
+            if date == None:
+                undated.append( coordinate )
+                continue
+
+            # Append new hours to employee
+            employee.add_hours( date, value )
+
+        self.undated_rows = set( [ coordinate.row for coordinate in undated ] )
+
+        if undated:
+            self.show_error(
+                title='Date Registration Error!',
+                message='Hours without a date above them were skipped at {0}.'.format( ', '.join( [ '{0}{1}'.format( coordinate.column, coordinate.row ) for coordinate in undated ] ) )
+            )
 
         logging.info( 'Retrieved employee hours' )
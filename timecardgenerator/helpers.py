@@ -1,5 +1,6 @@
 import os
 import sys
+import glob
 
 # Return the relative path or a resource
 def resource_path( relative_path ):
@@ -11,3 +12,14 @@ def resource_path( relative_path ):
         base_path = os.path.abspath(".")
 
     return os.path.join( base_path, relative_path )
+
+
+# Return the workbooks in a directory or matching a glob
+def find_workbooks( path ):
+    """ Get sorted .xlsx paths from a directory or glob pattern, skipping Excel lock files """
+    if os.path.isdir( path ):
+        path = os.path.join( path, '*.xlsx' )
+
+    files = [ file for file in glob.glob( path ) if not os.path.basename( file ).startswith( '~$' ) ]
+
+    return sorted( files )
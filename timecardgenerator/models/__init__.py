@@ -1,2 +1,3 @@
 from .employee import Employee
-from .spreadsheet import Spreadsheet
+from .spreadsheet import ENGINES, Spreadsheet, sheet_titles, write_timecards
+from .xlsx import XlsxReader
@@ -1,53 +1,64 @@
-import logging
+import array
+import datetime
 
-from timecardgenerator import components
+from timecardgenerator import components, classifier
 
 
 class Employee( object ):
 
+    __slots__ = ( '_id', 'coordinates', 'data', '_dates', '_minutes', '_total' )
+
+
     def __init__( self, id, coordinates ):
 
         self._id = id
 
-        self.coordinates = []
-        self.coordinates.append( coordinates )
-        self.hours = []
+        self.coordinates = set()
+        self.coordinates.add( coordinates )
         self.data = components.Data()
 
-        self._set_default_data()
+        # Shifts are held in parallel columns of ordinal dates and minutes
+        self._dates   = array.array( 'l' )
+        self._minutes = array.array( 'l' )
+        self._total   = 0
 
-        logging.info( 'Employee \'{0}\' instantiated'.format( self._id ) )
+        self._set_default_data()
 
 
     def add_hours( self, date, duration ):
         """
         Appends new hours to the employee
 
-        :param date: datetime.date
-        :param duration: int
+        :param date: int ordinal date
+        :param duration: int minutes
         """
-        self.hours.append({
-            'date': date,
-            'hours': duration
-        })
+        self._dates.append( date )
+        self._minutes.append( duration )
+        self._total += duration
 
 
-    def get_hours_sum( self ):
-        sum = 0
+    def get_shifts( self ):
+        """
+        for date, minutes in employee.get_shifts(): ...
+
+        Yields each shift's date and duration in minutes
 
-        for shift in self.hours:
-            sum += self.get_shift_sum(shift['hours'])
+        :return: generator of tuple( datetime.date, int )
+        """
+        for date, minutes in zip( self._dates, self._minutes ):
+            yield datetime.date.fromordinal( date ), minutes
 
-        return sum
+
+    def get_hours_sum( self ):
+        return classifier.minutes_to_hours( self._total )
 
 
     def get_shift_sum( self, hours ):
-        ( h, m, s ) = hours.strftime( "%H:%M:%S" ).split( ':' )
-        return int( h ) + ( int( m ) / 60 )
+        return classifier.minutes_to_hours( hours )
 
 
     def get_shift_count( self ):
-        return len( self.hours )
+        return len( self._minutes )
 
 
     def get_id( self ):
@@ -66,4 +77,4 @@ class Employee( object ):
                 'key': 'DAYS',
                 'value': 1
             }
-        )
\ No newline at end of file
+        )
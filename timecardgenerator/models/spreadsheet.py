@@ -3,119 +3,231 @@ import openpyxl
 import openpyxl.utils as utils
 
 # Application Utilities
-from timecardgenerator import tuples
+from timecardgenerator import classifier, components, tuples
+from .xlsx import XlsxReader
+
+
+# Sage 300 Timecard import columns
+HEADER_COLUMNS = [
+    'EMPLOYEE', 'PEREND', 'TIMECARD', 'TCARDDESC', 'TIMESLATE',
+    'REUSECARD', 'ACTIVE', 'SEPARATECK', 'PROCESSED', 'CREGHRS',
+    'CSHIFTHRS', 'CVACHRSP', 'CVACHRSA', 'CSICKHRSP', 'CSICKHRSP',
+    'CCOMPHRSP', 'CCOMPHRSA', 'CVACAMTP', 'CVACAMTA', 'CSICKAMTP',
+    'CSICKAMTA', 'CCOMPAMTP', 'CCOMPAMTA', 'CDISIHRSP', 'CDISIHRSA',
+    'CDISIAMTP', 'CDISIAMTA', 'LASTNAME', 'FIRSTNAME', 'MIDDLENAME',
+    'GREGHRS', 'GSHIFTHRS', 'GVACHRSP', 'GVACHRSA', 'GSICKHRSP',
+    'GSICKHRSA', 'GCOMPHRSP', 'GCOMPHRSA', 'GVACAMTP', 'GVACAMTA',
+    'GSICKAMTP', 'GSICKAMTA', 'GCOMPAMTP', 'GCOMPAMTA', 'KEYACTION',
+    'GDISIHRSP', 'GDISIHRSA', 'GDISIAMTP', 'GDISIAMTA', 'HIREDATE',
+    'FIREDATE', 'PARTTIME', 'PAYFREQ', 'OTSCHED', 'COMPTIME',
+    'SHIFTSCHED', 'SHIFTNUM', 'WORKPROV', 'STATUS', 'INACTDATE',
+    'PROCESSCMD', 'GOTHOURS', 'OTCALCTYPE', 'HRSPERDAY', 'WORKCODE',
+    'TOTALJOBS', 'USERSEC', 'WKLYFLSA', 'VALUES', 'OTOVERRIDE',
+    'COTHOURS', 'TCDLINES', 'SWJOB', 'SRCEAPPL'
+]
+
+DETAIL_COLUMNS = [
+    'EMPLOYEE', 'PEREND', 'TIMECARD', 'LINENUM', 'CATEGORY',
+    'EARNDED', 'EARDEDTYPE', 'EARDEDDATE', 'STARTTIME', 'STOPTIME',
+    'GLSEG1', 'GLSEG2', 'GLSEG3', 'HOURS', 'CALCMETH', 'LIMITBASE',
+    'CNTBASE', 'RATE', 'PAYORACCR', 'EXPACCT', 'LIABACCT', 'OTACCT',
+    'SHIFTACCT', 'ASSETACCT', 'OTSCHED', 'SHIFTSCHED', 'SHIFTNUM',
+    'WCC', 'TAXWEEKS', 'TAXANNLIZ', 'WEEKLYNTRY', 'ENTRYTYPE',
+    'POOLEDTIPS', 'DESC', 'GLSEGID1', 'GLSEGDESC1', 'GLSEGID2',
+    'GLSEGDESC2', 'GLSEGID3', 'GLSEGDESC3', 'KEYACTION', 'WORKPROV',
+    'PROCESSCMD', 'NKEMPLOYEE', 'NKPEREND', 'NKTIMECARD', 'NKLINENUM',
+    'DAYS', 'WCCGROUP', 'VALUES', 'OTHOURS', 'OTRATE', 'SWFLSA',
+    'DISTCODE', 'REXPACCT', 'RLIABACCT', 'SWALLOCJOB', 'JOBS',
+    'WORKCODE', 'JOBHOURS', 'JOBBASE', 'RCALCMETH', 'RLIMITBASE',
+    'RRATEOVER', 'RRATE', 'DEFRRATE'
+]
+
+# Spreadsheet reader engines
+ENGINES = ( 'openpyxl', 'native' )
+
+# Detail row indices written per shift
+_DETAIL_D = 3
+_DETAIL_H = 7
+_DETAIL_N = 13
+
+def sheet_titles( file ):
+    """
+    sheet_titles( 'hours.xlsx' ) -> [ 'Kitchen', 'Front' ]
+
+    Returns the worksheet titles of a workbook, without reading the worksheets
+
+    :param file: str
+    :return: list
+    """
+    wb = openpyxl.load_workbook( filename=file, read_only=True )
+
+    try:
+        return list( wb.sheetnames )
+    finally:
+        wb.close()
+
+
+def write_timecards( employees, output=None ):
+    """
+    write_timecards( employees, components.CsvOutput( 'timecards.csv' ) )
+
+    Writes the Timecard_Header and Timecard_Detail rows of employees through an output backend
+
+    :param employees: dict
+    :param output: components.Output
+    """
+    if output == None:
+        output = components.XlsxOutput()
+
+    output.write( header_rows( employees ), detail_rows( employees ) )
+    logging.info( 'DONE!' )
+
+
+def header_rows( employees ):
+    """
+    Yields the Timecard_Header rows, starting with the column headings
+
+    :param employees: dict
+    :return: generator of lists
+    """
+    yield HEADER_COLUMNS
+
+    for id, employee in employees.items():
+
+        yield [
+            employee.data.get_value( 'A' ), # ID
+            employee.data.get_value( 'B' ), # Period End
+            employee.data.get_value( 'C' )  # PayPeriod Title
+        ]
+
+
+def detail_rows( employees ):
+    """
+    Yields the Timecard_Detail rows, starting with the column headings
+
+    :param employees: dict
+    :return: generator of lists
+    """
+    yield DETAIL_COLUMNS
+
+    for id, employee in employees.items():
+
+        # Constant employee properties are shared by every shift row
+        base = employee.data.get_row( _DETAIL_N + 1 )
+
+        for line, ( date, minutes ) in enumerate( employee.get_shifts(), 1 ):
+
+            row = list( base )
+            row[_DETAIL_D] = line * 1000 # LINENUM
+            row[_DETAIL_H] = date # EARNDEDDATE
+            row[_DETAIL_N] = employee.get_shift_sum( minutes ) # HOURS
+
+            yield row
+
 
 
 class Spreadsheet( object ):
 
-    def __init__( self, file ):
+    def __init__( self, file, sheet=None, engine='openpyxl' ):
         assert type( file ) == str, 'file must be a valid string path'
+        assert engine in ENGINES, 'engine must be one of {0}, instead got {1}'.format( ENGINES, engine )
+
+        self.file       = file
+        self.sheet_name = sheet
+        self.engine     = engine
+
+        # Loaded on first use, parsed workbook caches may never need it
+        self._wb     = None
+        self._sheet  = None
+        self._reader = None
 
-        self.file = file
-        self.wb = openpyxl.load_workbook( filename=file, data_only=True )
-        self.sheet = self.wb.worksheets[0]
+        # Counted by stream_sheet
+        self.cells_scanned = 0
+        self.cells_empty   = 0
 
         logging.info( 'Spreadsheet instantiated' )
 
 
+    def generate( self, employees, output=None ):
+        """
+        Create template spreadsheet through an output backend, leaving the source workbook untouched
 
-    def generate( self, employees ):
+        :param employees: dict
+        :param output: components.Output
         """
-        Create template spreadsheet
+        write_timecards( employees, output )
+
+
+
+    def close( self ):
         """
-        # Create blank workbook
-        self.wb = openpyxl.Workbook()
-        self.wb.create_sheet()
+        Closes the workbook, releasing the file handle held in read-only mode
+        """
+        if not ( self._reader == None ):
+            self._reader.close()
+            self._reader = None
 
-        self.sheet = self.wb.worksheets[0]
-        # Set worksheet titles
-        self.wb.worksheets[0].title = 'Timecard_Header'
-        self.wb.worksheets[1].title = 'Timecard_Detail'
+        if self._wb == None:
+            return
 
-        def write_headers( sheet, headers ):
-            for key, value in enumerate( headers ):
-                index = utils.get_column_letter( key + 1 ) + str( 1 )
-                sheet[index] = value
+        self._wb.close()
+        self._wb    = None
+        self._sheet = None
 
-        # Set Worksheet Column Headings
-        logging.info( 'Setting Worksheet Column Headings' )
-        write_headers( self.wb.worksheets[0], [
-            'EMPLOYEE', 'PEREND', 'TIMECARD', 'TCARDDESC', 'TIMESLATE',
-            'REUSECARD', 'ACTIVE', 'SEPARATECK', 'PROCESSED', 'CREGHRS',
-            'CSHIFTHRS', 'CVACHRSP', 'CVACHRSA', 'CSICKHRSP', 'CSICKHRSP',
-            'CCOMPHRSP', 'CCOMPHRSA', 'CVACAMTP', 'CVACAMTA', 'CSICKAMTP',
-            'CSICKAMTA', 'CCOMPAMTP', 'CCOMPAMTA', 'CDISIHRSP', 'CDISIHRSA',
-            'CDISIAMTP', 'CDISIAMTA', 'LASTNAME', 'FIRSTNAME', 'MIDDLENAME',
-            'GREGHRS', 'GSHIFTHRS', 'GVACHRSP', 'GVACHRSA', 'GSICKHRSP',
-            'GSICKHRSA', 'GCOMPHRSP', 'GCOMPHRSA', 'GVACAMTP', 'GVACAMTA',
-            'GSICKAMTP', 'GSICKAMTA', 'GCOMPAMTP', 'GCOMPAMTA', 'KEYACTION',
-            'GDISIHRSP', 'GDISIHRSA', 'GDISIAMTP', 'GDISIAMTA', 'HIREDATE',
-            'FIREDATE', 'PARTTIME', 'PAYFREQ', 'OTSCHED', 'COMPTIME',
-            'SHIFTSCHED', 'SHIFTNUM', 'WORKPROV', 'STATUS', 'INACTDATE',
-            'PROCESSCMD', 'GOTHOURS', 'OTCALCTYPE', 'HRSPERDAY', 'WORKCODE',
-            'TOTALJOBS', 'USERSEC', 'WKLYFLSA', 'VALUES', 'OTOVERRIDE',
-            'COTHOURS', 'TCDLINES', 'SWJOB', 'SRCEAPPL'
-        ])
 
-        write_headers( self.wb.worksheets[1], [
-            'EMPLOYEE', 'PEREND', 'TIMECARD', 'LINENUM', 'CATEGORY',
-            'EARNDED', 'EARDEDTYPE', 'EARDEDDATE', 'STARTTIME', 'STOPTIME',
-            'GLSEG1', 'GLSEG2', 'GLSEG3', 'HOURS', 'CALCMETH', 'LIMITBASE',
-            'CNTBASE', 'RATE', 'PAYORACCR', 'EXPACCT', 'LIABACCT', 'OTACCT',
-            'SHIFTACCT', 'ASSETACCT', 'OTSCHED', 'SHIFTSCHED', 'SHIFTNUM',
-            'WCC', 'TAXWEEKS', 'TAXANNLIZ', 'WEEKLYNTRY', 'ENTRYTYPE',
-            'POOLEDTIPS', 'DESC', 'GLSEGID1', 'GLSEGDESC1', 'GLSEGID2',
-            'GLSEGDESC2', 'GLSEGID3', 'GLSEGDESC3', 'KEYACTION', 'WORKPROV',
-            'PROCESSCMD', 'NKEMPLOYEE', 'NKPEREND', 'NKTIMECARD', 'NKLINENUM',
-            'DAYS', 'WCCGROUP', 'VALUES', 'OTHOURS', 'OTRATE', 'SWFLSA',
-            'DISTCODE', 'REXPACCT', 'RLIABACCT', 'SWALLOCJOB', 'JOBS',
-            'WORKCODE', 'JOBHOURS', 'JOBBASE', 'RCALCMETH', 'RLIMITBASE',
-            'RRATEOVER', 'RRATE', 'DEFRRATE'
-        ])
+    @property
+    def wb( self ):
+        """
+        The read-only workbook, loaded on first use
 
-        # Fill Timecard_Headers
-        key = 2
-        for id, employee in employees.items():
+        :return: openpyxl.Workbook
+        """
+        if self._wb == None:
+            self._wb = openpyxl.load_workbook( filename=self.file, read_only=True, data_only=True )
 
-            self.write_ws( 0, ( 'A', key ), employee.data.get( 'A' )['value'] ) # ID
-            self.write_ws( 0, ( 'B', key ), employee.data.get( 'B' )['value'] ) # Period End
-            self.write_ws( 0, ( 'C', key ), employee.data.get( 'C' )['value'] ) # PayPeriod Title
+        return self._wb
 
-            # Update Key
-            key += 1
 
-        self.wb.create_named_range( name='Timecard_Header', worksheet=self.sheet, value='{0}:{1}'.format( self.min_coordinate(), self.max_coordinate() ) )
+    @property
+    def sheet( self ):
+        """
+        The worksheet read, the first worksheet unless a sheet name was given
 
-        # Fill Timecard_Detail
-        key = 2
-        self.sheet = self.wb.worksheets[1]
+        :return: openpyxl worksheet
+        """
+        if self._sheet == None:
+            if self.sheet_name == None:
+                self._sheet = self.wb.worksheets[0]
+            else:
+                self._sheet = self.wb[self.sheet_name]
 
-        for id, employee in employees.items():
+        return self._sheet
 
-            line = 1
 
-            for shift in employee.hours:
+    @property
+    def reader( self ):
+        """
+        The native reader of the worksheet, opened on first use
 
-                data       = employee.data.get_all()
-                linenumber = line * 1000
+        :return: models.XlsxReader
+        """
+        if self._reader == None:
+            self._reader = XlsxReader( self.file, sheet=self.sheet_name )
 
-                # Dynamically Set constant employee properties
-                for column, prop in data.items():
-                    self.write_ws( 1, ( column, key ), prop['value'] )
+        return self._reader
 
-                self.write_ws( 1, ( 'D', key ), linenumber ) # LINENUM
-                self.write_ws( 1, ( 'H', key ), shift['date'].date.date() ) # EARNDEDDATE
-                self.write_ws( 1, ( 'N', key ), employee.get_shift_sum( shift['hours'] ) ) # HOURS
 
-                # Update Index and line
-                key += 1
-                line += 1
+    @property
+    def epoch( self ):
+        """
+        The date epoch of the workbook, which serials read by the native engine count from
 
-        self.wb.create_named_range( name='Timecard_Detail', worksheet=self.sheet, value='{0}:{1}'.format( self.min_coordinate(), self.max_coordinate() ) )
+        :return: datetime.datetime
+        """
+        if self.engine == 'native':
+            return self.reader.epoch
 
-        # Save Generated Spreadsheet
-        self.wb.save( 'GENERATED-TIMECARDS.xlsx' )
-        logging.info( 'DONE!' )
+        return self.wb.epoch
 
 
 
@@ -132,50 +244,80 @@ class Spreadsheet( object ):
         return self.sheet[coordinate].value
 
 
-    def min_coordinate( self ):
+    def first_column( self ):
         """
-        Returns the minimum coordinate found on the active spreadsheet
+        Returns the column letter of the first column of the active spreadsheet
 
-        :return: str 
+        :return: str
         """
-        return '{0}{1}'.format( utils.get_column_letter( self.sheet.min_column ), self.sheet.min_row )
+        if self.engine == 'native':
+            return utils.get_column_letter( self.reader.min_column )
 
+        return utils.get_column_letter( self.sheet.min_column )
 
-    def max_coordinate( self ):
+
+    def stream_sheet( self ):
         """
-        Returns the maximum coordinate found on the active spreadsheet
+        for coordinate, value in stream_sheet(): print( coordinate, value )
+
+        Streams the populated cells of the active sheet in a single row by row pass,
+        without creating cell objects
 
-        :return: str 
+        :return: generator of ( tuples.Coordinate, any )
         """
-        return '{0}{1}'.format( utils.get_column_letter( self.sheet.max_column ), self.sheet.max_row )
+        min_row    = self.sheet.min_row
+        min_column = self.sheet.min_column
+        letters    = {}
+
+        logging.info( 'Streaming sheet {0}'.format( self.sheet.title ) )
+
+        scanned = 0
+        empty   = 0
 
+        for row, values in enumerate( self.sheet.iter_rows( min_row=min_row, min_col=min_column, values_only=True ), min_row ):
+            scanned += len( values )
+
+            for column, value in enumerate( values, min_column ):
+                # Skip Empty Cells
+                if value == None:
+                    empty += 1
+                    continue
 
-    def loop_sheet( self, loop, callback ):
+                if not column in letters:
+                    letters[column] = utils.get_column_letter( column )
+
+                yield tuples.Coordinate( column=letters[column], row=row ), value
+
+        self.cells_scanned = scanned
+        self.cells_empty   = empty
+
+
+    def stream_cells( self ):
         """
-        loop_sheets( ( start='A1', end='B2' ), lambda coordinate: print( coordinate ) )
+        for coordinate, value, style in stream_cells(): print( coordinate, value, style )
 
-        Loops over the given namedtuple coordinates and runs callback on each cell
+        Streams the populated cells of the active sheet through the reader engine. The native
+        engine leaves date and time formatted numbers as serials, styled classifier.DATE or
+        DURATION, every other value is styled classifier.NONE
 
-        :param loop: namedtuple
-        :param callback: callable
+        :return: generator of ( tuples.Coordinate, any, int )
         """
-        assert type( loop ) == tuples.Coordinates, 'Loop coordinates must be of type {0}, instead got {1}'.format( tuples.Coordinates, type( loop ) )
-        assert callable( callback ), 'Callback function must be a callable'
+        if not ( self.engine == 'native' ):
+            for coordinate, value in self.stream_sheet():
+                yield coordinate, value, classifier.NONE
 
-        logging.info( 'Looping coordinates {0} : {1}'.format( loop.start, loop.end ) )
+            return
 
-        for row in self.sheet[loop.start: loop.end]:
+        reader  = self.reader
+        letters = {}
 
-            for cell in row:
-                # Skip Empty Cells
-                if cell.value == None:
-                    continue
+        logging.info( 'Streaming sheet {0}'.format( reader.title ) )
 
-                coordinate = utils.coordinate_from_string( cell.coordinate )
-                coordinate = tuples.Coordinate( column=coordinate[0], row=coordinate[1] )
-                callback( cell, coordinate )
+        for row, column, value, style in reader.cells():
+            if not column in letters:
+                letters[column] = utils.get_column_letter( column )
 
+            yield tuples.Coordinate( column=letters[column], row=row ), value, style
 
-    def write_ws( self, ws, key, value ):
-        key = '{0}{1}'.format( key[0], key[1] )
-        self.wb.worksheets[ws][key] = value
+        self.cells_scanned = reader.cells_scanned
+        self.cells_empty   = reader.cells_empty
@@ -0,0 +1,324 @@
+import datetime
+import posixpath
+import zipfile
+from xml.etree import ElementTree
+from openpyxl.styles import numbers
+from openpyxl.utils import range_boundaries
+from openpyxl.utils.datetime import from_ISO8601
+
+from timecardgenerator import classifier
+
+
+# Spreadsheet XML namespaces
+MAIN          = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+RELATIONSHIPS = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}'
+PACKAGE       = '{http://schemas.openxmlformats.org/package/2006/relationships}'
+
+_CELL   = MAIN + 'c'
+_ROW    = MAIN + 'row'
+_VALUE  = MAIN + 'v'
+_INLINE = MAIN + 'is'
+_TEXT   = MAIN + 't'
+_RUN    = MAIN + 'r'
+
+_DIMENSION  = MAIN + 'dimension'
+_SHEET_DATA = MAIN + 'sheetData'
+
+MAC_EPOCH = datetime.datetime( 1904, 1, 1 )
+
+_column_indices = {}
+
+
+
+def _split_reference( reference ):
+    """
+    _split_reference( 'AB12' ) -> ( 12, 28 )
+
+    :param reference: str
+    :return: tuple( int row, int column )
+    """
+    letters = reference.rstrip( '0123456789' )
+
+    if not letters in _column_indices:
+        index = 0
+        for letter in letters:
+            index = index * 26 + ( ord( letter ) - 64 )
+
+        _column_indices[letters] = index
+
+    return int( reference[len( letters ):] ), _column_indices[letters]
+
+
+def _number( text ):
+    # Numbers are read as openpyxl reads them, floats only when written as one
+    if '.' in text or 'E' in text or 'e' in text:
+        return float( text )
+
+    return int( text )
+
+
+def _text( element ):
+    """
+    Returns the text of a string item, joining rich text runs and skipping phonetic runs
+    """
+    text = element.findtext( _TEXT )
+
+    if text == None:
+        text = ''.join( [ run.findtext( _TEXT ) or '' for run in element.findall( _RUN ) ] )
+
+    return text
+
+
+
+class XlsxReader( object ):
+    """
+    Streams the populated cells of a worksheet straight from the xlsx archive,
+    without building workbook or cell objects
+    """
+
+    def __init__( self, file, sheet=None ):
+        self.file    = file
+        self.archive = zipfile.ZipFile( file )
+
+        workbook = ElementTree.fromstring( self.archive.read( 'xl/workbook.xml' ) )
+        targets  = self._relationships( 'xl/_rels/workbook.xml.rels' )
+
+        properties = workbook.find( MAIN + 'workbookPr' )
+        self.epoch = classifier.EXCEL_EPOCH
+
+        if not ( properties == None ) and properties.get( 'date1904' ) in ( '1', 'true' ):
+            self.epoch = MAC_EPOCH
+
+        # Worksheet titles and their archive paths, in workbook order
+        self.sheets = [
+            ( element.get( 'name' ), targets[element.get( RELATIONSHIPS + 'id' )] )
+            for element in workbook.iter( MAIN + 'sheet' )
+        ]
+
+        if sheet == None:
+            self.title, self.path = self.sheets[0]
+        else:
+            found = [ path for title, path in self.sheets if title == sheet ]
+
+            if not found:
+                raise KeyError( 'Worksheet {0} does not exist.'.format( sheet ) )
+
+            self.title, self.path = sheet, found[0]
+
+        # Sheet bounds, from the dimension element when the sheet has one
+        self.min_row    = 1
+        self.min_column = 1
+        self.max_row    = None
+        self.max_column = None
+
+        self._read_bounds()
+
+        # Counted by cells
+        self.cells_scanned = 0
+        self.cells_empty   = 0
+
+        self._strings = None
+        self._styles  = None
+
+
+    def close( self ):
+        """
+        Closes the archive
+        """
+        self.archive.close()
+
+
+    def _relationships( self, path ):
+        """
+        Returns relationship targets by id, as archive paths
+
+        :param path: str
+        :return: dict
+        """
+        if not path in self.archive.namelist():
+            return {}
+
+        base = posixpath.dirname( posixpath.dirname( path ) )
+        tree = ElementTree.fromstring( self.archive.read( path ) )
+
+        targets = {}
+        for relationship in tree.iter( PACKAGE + 'Relationship' ):
+            target = relationship.get( 'Target' )
+
+            if target.startswith( '/' ):
+                target = target[1:]
+            else:
+                target = posixpath.normpath( posixpath.join( base, target ) )
+
+            targets[relationship.get( 'Id' )] = target
+
+        return targets
+
+
+
+    #        #
+    # STYLES #
+    #        #
+    def _shared_strings( self ):
+        if self._strings == None:
+            self._strings = []
+
+            if 'xl/sharedStrings.xml' in self.archive.namelist():
+                with self.archive.open( 'xl/sharedStrings.xml' ) as source:
+                    for _, element in ElementTree.iterparse( source ):
+                        if element.tag == MAIN + 'si':
+                            self._strings.append( _text( element ) )
+                            element.clear()
+
+        return self._strings
+
+
+    def _date_styles( self ):
+        """
+        Returns the style indices formatted as dates or times, and as elapsed times
+
+        :return: tuple( set, set )
+        """
+        if self._styles == None:
+            dates     = set()
+            durations = set()
+
+            if 'xl/styles.xml' in self.archive.namelist():
+                tree   = ElementTree.fromstring( self.archive.read( 'xl/styles.xml' ) )
+                custom = dict( [ ( int( element.get( 'numFmtId' ) ), element.get( 'formatCode' ) ) for element in tree.iter( MAIN + 'numFmt' ) ] )
+                styles = tree.find( MAIN + 'cellXfs' )
+
+                for index, style in enumerate( [] if styles == None else styles.findall( MAIN + 'xf' ) ):
+                    format_id = int( style.get( 'numFmtId', 0 ) )
+                    code      = custom.get( format_id ) or numbers.builtin_format_code( format_id )
+
+                    if numbers.is_date_format( code ):
+                        dates.add( index )
+
+                        # Elapsed time formats such as [h]:mm are read as durations
+                        if numbers.is_timedelta_format( code ):
+                            durations.add( index )
+
+            self._styles = ( dates, durations )
+
+        return self._styles
+
+
+
+    #       #
+    # CELLS #
+    #       #
+    def cells( self ):
+        """
+        for row, column, value, style in reader.cells(): ...
+
+        Yields the populated cells within the sheet bounds in a single pass, with numbers left
+        as Excel serials and style one of classifier.NONE, DATE for dates and times or
+        DURATION for elapsed times
+
+        :return: generator of tuple( int, int, any, int )
+        """
+        strings          = self._shared_strings()
+        dates, durations = self._date_styles()
+
+        min_column = self.min_column
+        max_column = self.max_column
+
+        # Rows are padded to the sheet width, or to their last cell when the sheet is unsized
+        padding = 0 if max_column == None else max( 0, max_column + 1 - min_column )
+
+        scanned = 0
+        found   = 0
+        row     = 0
+        counter = self.min_row
+
+        with self.archive.open( self.path ) as source:
+            for _, element in ElementTree.iterparse( source ):
+                if not ( element.tag == _ROW ):
+                    continue
+
+                reference = element.get( 'r' )
+                row       = row + 1 if reference == None else int( reference )
+
+                if not ( self.max_row == None ) and row > self.max_row:
+                    break
+
+                # Rows above the sheet bounds, or out of order
+                if row < counter:
+                    element.clear()
+                    continue
+
+                scanned += ( row - counter ) * padding
+                counter  = row + 1
+
+                column = 0
+
+                for cell in element:
+                    if not ( cell.tag == _CELL ):
+                        continue
+
+                    reference = cell.get( 'r' )
+                    column    = column + 1 if reference == None else _split_reference( reference )[1]
+
+                    if column < min_column or ( not ( max_column == None ) and column > max_column ):
+                        continue
+
+                    kind = cell.get( 't', 'n' )
+
+                    if kind == 'inlineStr':
+                        inline = cell.find( _INLINE )
+                        value  = None if inline == None else _text( inline )
+                    else:
+                        value = cell.findtext( _VALUE ) or None
+
+                    if value == None:
+                        continue
+
+                    style = classifier.NONE
+
+                    if kind == 'n':
+                        value = _number( value )
+                        index = int( cell.get( 's', 0 ) )
+
+                        if index in dates:
+                            style = classifier.DURATION if index in durations else classifier.DATE
+
+                    elif kind == 's':
+                        value = strings[int( value )]
+
+                    elif kind == 'b':
+                        value = bool( int( value ) )
+
+                    elif kind == 'd':
+                        value = from_ISO8601( value )
+
+                    found += 1
+                    yield row, column, value, style
+
+                scanned += padding if not ( max_column == None ) else max( 0, column + 1 - min_column )
+                element.clear()
+
+        self.cells_scanned = scanned
+        self.cells_empty   = scanned - found
+
+
+    def _read_bounds( self ):
+        """
+        Reads the sheet bounds from the dimension element, which precedes the cells
+        """
+        with self.archive.open( self.path ) as source:
+            for _, element in ElementTree.iterparse( source, events=( 'start', ) ):
+                if element.tag == _DIMENSION:
+                    reference = element.get( 'ref' )
+                    break
+
+                if element.tag == _SHEET_DATA:
+                    return
+
+            else:
+                return
+
+        if reference == None:
+            return
+
+        self.min_column, self.min_row, self.max_column, self.max_row = range_boundaries( reference )
@@ -11,3 +11,6 @@ SheetDates  = namedtuple( 'SheetWeek', 'Sunday Monday Tuesday Wednesday Thursday
 WeekDay     = namedtuple( 'WeekDay', 'date coordinate' )
 Coordinate  = namedtuple( 'Coordinate', 'column row' )
 Coordinates = namedtuple( 'Coordinates', 'start end' )
+
+SheetData   = namedtuple( 'SheetData', 'dates ids hours rows' )
+Source      = namedtuple( 'Source', 'file sheet' )